@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Fri Oct 16 10:05:52 2026
+- Deskin - Orange Labs - Lannion - France
+
+.. module:: libasync
+    :platform: UNIX/Linux
+    :synopsis: Non blocking sentence retrieval for serving workloads
+
+.. moduleauthor:: Munshi Asadullah <munshi.asadullah@orange.com>
+
+*The module to serve sentence lookups, batch reads, iterations and any other
+work on the sentences (e.g. vectorization) from an event loop without ever
+blocking it. The calls return at once with a pending result while a bounded
+pool of threads does the reads, so many concurrent requests are served from
+one process with a bounded number of reads in flight.*
+"""
+
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+import libconll as conll
+import libutilities as utils
+import libexceptions as exp
+
+ASYNC_WORKERS = 8
+""" Default maximum number of sentence reads in flight
+"""
+
+#=====================
+
+# CLASS:: non blocking facade of a CoNLL reader -------------------------------
+# =============================================================================
+class CoNLLAsyncReader:
+    """ *The non blocking facade of a CoNLL file (or corpus) reader. Each call
+    is queued for a pool of worker threads and returns an AsyncResult object
+    at once: ready() and get(timeout) give its state and value (or raise the
+    error of the call) and the optional callback is called with the value by
+    the worker that produced it.*
+
+    :param base.fileReader file_reader: The reader (CoNLLFileReader or CoNLLCorpusReader).
+    :param int max_in_flight: The number of worker threads *i.e.* the maximum number of reads in flight.
+    :return: Nothing.
+    :raise noneValueError: If the file reader is None.
+    :raise TypeError: If the file reader is not a CoNLL file or corpus reader.
+    :raise smallerValueError: If the number of reads in flight is smaller than 1.
+
+    .. Note::
+        The reads use the stateless methods of the reader (get_sentence and
+        read_sentences), the current sentence of the reader is never used.
+        The requests exceeding the bound wait in the queue of the pool, not
+        in the caller.
+
+    .. Note::
+        A callback runs in a worker thread, an event loop shall be woken up
+        from it with its own thread safe call (*e.g.* add_callback of a
+        Tornado IOLoop), as asyncio is not available in Python 2.
+    """
+    def __init__(self, file_reader=None, max_in_flight=ASYNC_WORKERS):
+        if file_reader == None:
+            raise exp.noneValueError('File reader cannot be "None"')
+        elif not isinstance(file_reader, (conll.CoNLLFileReader, conll.CoNLLCorpusReader)):
+            raise TypeError('File reader must be a CoNLL file or corpus reader.\nFound: <{}>'.format(type(file_reader)))
+        elif max_in_flight == None or max_in_flight < 1:
+            raise exp.smallerValueError('Number of reads in flight cannot be smaller than 1.\nFound: {}'.format(max_in_flight))
+        self.file_reader = file_reader
+        self.max_in_flight = max_in_flight
+        self.pool = ThreadPool(processes=max_in_flight)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def __submit(self, function=None, arguments=(), callback=None):
+        with self.lock:
+            if self.closed:
+                raise ValueError('Operation on a closed reader.')
+            return self.pool.apply_async(function, arguments, callback=callback)
+
+    def submit(self, function=None, arguments=(), callback=None):
+        """ *Queues any call (e.g. the vectorization of a sentence) to the
+        worker threads.*
+
+        :param function function: The function to be called.
+        :param tuple arguments: The arguments of the call.
+        :param function callback: The function called with the result (optional).
+        :return: The pending result.
+        :rtype: multiprocessing.pool.AsyncResult
+        :raise noneValueError: If the function is None.
+        :raise ValueError: If the reader is closed.
+        """
+        if function == None:
+            raise exp.noneValueError('Function cannot be "None"')
+        return self.__submit(function=function, arguments=arguments, callback=callback)
+
+    def get_sentence(self, sentence_id=None, callback=None):
+        """ *Queues the read of one sentence (see CoNLLFileReader.get_sentence).*
+
+        :param int sentence_id: The ID of the sentence.
+        :param function callback: The function called with the sentence (optional).
+        :return: The pending sentence.
+        :rtype: multiprocessing.pool.AsyncResult
+        :raise noneValueError: If the sentence ID is None.
+        :raise ValueError: If the reader is closed.
+        """
+        if sentence_id == None:
+            raise exp.noneValueError('Sentence ID cannot be "None"')
+        return self.__submit(function=self.file_reader.get_sentence, arguments=(sentence_id,), callback=callback)
+
+    def read_sentences(self, sentence_ids=None, callback=None):
+        """ *Queues the read of a batch of sentences as a single call, the
+        byte ranges are merged as by CoNLLFileReader.read_sentences.*
+
+        :param list sentence_ids: The IDs of the sentences.
+        :param function callback: The function called with the sentences (optional).
+        :return: The pending list of sentences, in the order of the given IDs.
+        :rtype: multiprocessing.pool.AsyncResult
+        :raise noneValueError: If the sentence ID list is None.
+        :raise ValueError: If the reader is closed.
+        """
+        if sentence_ids == None:
+            raise exp.noneValueError('Sentence ID list cannot be "None"')
+        return self.__submit(function=self.file_reader.read_sentences, arguments=(list(sentence_ids),), callback=callback)
+
+    def iterate_batches(self, first_sentence=1, batch_size=utils.ITERATION_BATCHSIZE, read_ahead=None):
+        """ *Generator over the pending batches of (sentence ID, sentence)
+        pairs in file order. At most read_ahead batches after the yielded one
+        are queued, hence the generator itself never blocks and the memory
+        stays bounded.*
+
+        :param int first_sentence: The ID of the first sentence.
+        :param int batch_size: The number of sentences of a batch.
+        :param int read_ahead: The number of batches queued in advance (None for the number of reads in flight).
+        :return: The pending batches.
+        :rtype: generator(multiprocessing.pool.AsyncResult)
+        :raise smallerValueError: If the batch size or the read ahead is smaller than 1.
+
+        >>> for pending in reader.iterate_batches():
+        ...     for sentenceID, sentence in pending.get():
+        ...         pass
+        """
+        if batch_size == None or batch_size < 1:
+            raise exp.smallerValueError('Batch size cannot be smaller than 1.\nFound: {}'.format(batch_size))
+        if read_ahead == None:
+            read_ahead = self.max_in_flight
+        elif read_ahead < 1:
+            raise exp.smallerValueError('Read ahead cannot be smaller than 1.\nFound: {}'.format(read_ahead))
+        sentenceCount = self.file_reader.metadata.get_sentence_count()
+        pending = []
+        for start in range(first_sentence, sentenceCount+1, batch_size):
+            pending.append(self.__submit_batch(start, min(start+batch_size, sentenceCount+1)))
+            if len(pending) > read_ahead:
+                yield pending.pop(0)
+        while len(pending):
+            yield pending.pop(0)
+
+    def __submit_batch(self, start=1, end=1):
+        ids = range(start, end)
+        return self.__submit(function=lambda: zip(ids, self.file_reader.read_sentences(sentence_ids=ids)))
+
+    def close(self):
+        """ *Waits for the queued calls and stops the worker threads. The
+        underlying reader is not closed.*
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+# CLASS:: END =================================================================
@@ -19,13 +19,20 @@ import libexceptions as exp
 # CLASS *********************
 class fileReader:
     
-    file_pointer = None
-    current_sentence = 1        
-    sentence_buffer = []
+    def __init__(self):
+        # navigation state ... per instance, never shared between readers ----
+        self.current_sentence = 1
+        self.sentence_buffer = []
     
     def get_key_elements(self, key=None):
         raise exp.implimentationError('Class method not initialized yet.')
     
+    def get_vocabulary(self, key=None):
+        raise exp.implimentationError('Class method not initialized yet.')
+    
+    def reset(self):
+        raise exp.implimentationError('Class method not initialized yet.')
+    
     def get_current_sentence_id(self):
         return self.current_sentence
     
@@ -37,6 +44,20 @@ class fileReader:
     
     def get_previous_sentence(self):
         raise exp.implimentationError('Class method not initialized yet.')
+    
+    def __iter__(self):
+        """ *Generic sequential traversal over (sentence ID, sentence) pairs 
+        built on the navigation methods, readers may override it with a 
+        stateless one.*
+        """
+        self.reset()
+        sentence = self.get_current_sentence()
+        while True:
+            yield self.get_current_sentence_id(), sentence
+            try:
+                sentence = self.get_next_sentence()
+            except exp.lastElementWarning:
+                return
 
 # CLASS *********************
 class vectorReader:
@@ -44,9 +65,39 @@ class vectorReader:
     def get_vector(self):
         raise exp.implimentationError('Class method not initialized yet.')
     
+    def get_vectors(self, keys=None):
+        """ *Generic batch lookup, one vector per key in order, readers may 
+        override it with a single allocation.*
+        """
+        return [self.get_vector(k) for k in keys]
+    
+    def get_sparse_vector(self, key=None):
+        """ *Generic sparse lookup, the (indices, values) pair of the non zero
+        elements of the dense vector, readers may override it without the 
+        dense vector.*
+        """
+        vector = self.get_vector(key)
+        indices = vector.nonzero()[0]
+        return indices, vector[indices]
+    
+    def get_sparse_vectors(self, keys=None):
+        return [self.get_sparse_vector(k) for k in keys]
+    
+    def get_fingerprint(self):
+        """ *The hash value of everything the vectors depend on, readers 
+        without one cannot be cached.*
+        """
+        raise exp.implimentationError('Class method not initialized yet.')
+    
     def get_null_vector(self):
         raise exp.implimentationError('Class method not initialized yet.')
     
+    def get_dimension(self):
+        """ *Generic vector dimension, the length of the null vector, readers 
+        may override it without allocating the null vector.*
+        """
+        return len(self.get_null_vector())
+    
     def updateReader(self):
         raise exp.implimentationError('Class method not initialized yet.')
 
@@ -72,8 +123,9 @@ class fileVectorReader:
         raise exp.implimentationError('Class method not initialized yet.')
 
 # CLASS *********************
-class annotatedString:
+class annotatedString(object):
     
+    __slots__ = () # ---------------------------------------------------------- allows compact, slotted subclasses
     annotation_map = {}
     
     def getAnnotationKeyList(self):
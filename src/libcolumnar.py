@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Wed Oct 14 09:47:15 2026
+- Deskin - Orange Labs - Lannion - France
+
+.. module:: libcolumnar
+    :platform: UNIX/Linux
+    :synopsis: Columnar, NumPy backed store of a CoNLL format corpus
+
+.. moduleauthor:: Munshi Asadullah <munshi.asadullah@orange.com>
+
+*The module to keep a whole treebank as parallel integer columns (one value
+per token) and a sentence pointer array, so a sentence is a slice of the
+columns and whole corpus operations can be vectorized with NumPy.*
+"""
+
+import os
+
+from array import array
+
+from numpy import array as nparray
+from numpy import frombuffer as npfrombuffer
+from numpy import save as npsave
+from numpy import load as npload
+
+import libbase as base
+import libutilities as utils
+import libexceptions as exp
+
+STORE_COLUMNS = [utils.TID, utils.TOKEN, utils.LEMMA, utils.GPOS, utils.POS, utils.RELATION_HEAD, utils.RELATION]
+""" The token annotations kept as columns, in order
+"""
+
+ENCODED_COLUMNS = [utils.TOKEN, utils.LEMMA, utils.GPOS, utils.POS, utils.RELATION]
+""" The columns holding vocabulary IDs, the other ones hold integer values
+"""
+
+COLUMN_NAMES = {utils.TID:           'tid',
+                utils.TOKEN:         'form',
+                utils.LEMMA:         'lemma',
+                utils.GPOS:          'gpos',
+                utils.POS:           'pos',
+                utils.RELATION_HEAD: 'head',
+                utils.RELATION:      'relation'}
+""" The file names of the columns in a store directory
+"""
+
+STORE_HEADER = 'store.json'
+""" The file name of the store header (fingerprint of the corpus and counts)
+"""
+
+#=====================
+
+# CLASS:: columnar store of a CoNLL format corpus -----------------------------
+# =============================================================================
+class CoNLLColumnStore:
+    """ *The columnar representation of a corpus read by a CoNLL file (or
+    corpus) reader. Each token annotation of STORE_COLUMNS is a 32 bit integer
+    column over all the tokens of the corpus (vocabulary IDs for the string
+    annotations) and the sentence pointers locate the tokens of each sentence,
+    like the row pointers of a CSR matrix.*
+
+    :param base.fileReader file_reader: The reader of the corpus (CoNLLFileReader or CoNLLCorpusReader).
+    :param str store_dir: The directory to save the store to or load it from (None for no saving).
+    :param bool memory_map: Whether a saved store is loaded with memory mapping.
+    :return: Nothing.
+    :raise noneValueError: If the file reader is None.
+    :raise TypeError: If the file reader is not a fileReader object.
+
+    .. Note::
+        The tokens of sentence *i* (starting with 1) are the rows from
+        sentence_pointers[i-1] up to sentence_pointers[i] of every column, in
+        file order. The vocabulary IDs are the ones of the interned
+        vocabularies of the metadata, an unknown string is encoded as NULL.
+
+    .. Note::
+        If the store directory holds a store of the same corpus (same
+        fingerprint of the metadata), it is loaded instead of being built,
+        otherwise the new store is saved in it. Each column is a separate
+        .npy file, hence a memory mapped store costs no loading time.
+
+    .. Note::
+        The morphological features are not part of the store.
+    """
+    def __init__(self, file_reader=None, store_dir=None, memory_map=True):
+        if file_reader == None:
+            raise exp.noneValueError('File reader cannot be "None"')
+        elif not isinstance(file_reader, base.fileReader):
+            raise TypeError('File reader must be a fileReader object.\nFound: <{}>'.format(type(file_reader)))
+        self.fingerprint = utils.get_corpus_fingerprint(metadata=file_reader.metadata)
+        self.columns = {} #---------------------------------------------------- annotation key to column
+        self.sentence_pointers = None #---------------------------------------- first token row of each sentence followed by the token count
+        self.vocabularies = {} #----------------------------------------------- annotation key to list of strings (position is the ID)
+        utils.load_or_build_store(store_dir=store_dir, header_file=STORE_HEADER, name='column store',
+                                  load=lambda: self.load_store(store_dir=store_dir, memory_map=memory_map),
+                                  build=lambda: self.build_store(file_reader=file_reader),
+                                  save=lambda: self.save_store(store_dir=store_dir))
+
+    def build_store(self, file_reader=None):
+        """ *Builds the columns with one sequential pass over the reader.*
+
+        :param base.fileReader file_reader: The reader of the corpus.
+        :return: Nothing.
+        """
+        metadata = file_reader.metadata
+        self.vocabularies = {k:metadata.get_vocabulary(key=k) for k in ENCODED_COLUMNS}
+        idMaps = {k:metadata.get_vocabulary_index(key=k) for k in ENCODED_COLUMNS}
+        columns = [array('i') for k in STORE_COLUMNS]
+        pointers = [0]
+        for sentenceID, sentence in file_reader:
+            for tok in sentence:
+                for key, column in zip(STORE_COLUMNS, columns):
+                    value = tok.getValue(key)
+                    column.append(idMaps[key].get(value, utils.NULL) if key in idMaps and not isinstance(value, int) else value) # encoded tokens hold the IDs already
+            pointers.append(pointers[-1] + len(sentence))
+        self.columns = {k:npfrombuffer(c, dtype='int32') if len(c) else nparray([], dtype='int32') for k, c in zip(STORE_COLUMNS, columns)}
+        self.sentence_pointers = nparray(pointers, dtype='int64')
+
+    def save_store(self, store_dir=None):
+        """ *Saves the columns, the sentence pointers and the vocabularies as
+        .npy files and the header as JSON in the given directory.*
+
+        :param str store_dir: The directory to save the store to (created if needed).
+        :return: Nothing.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        """
+        utils.prepare_store(store_dir=store_dir, header_file=STORE_HEADER)
+        for key in STORE_COLUMNS:
+            npsave(os.path.join(store_dir, COLUMN_NAMES[key] + '.npy'), self.columns[key])
+        npsave(os.path.join(store_dir, 'sentence_pointers.npy'), self.sentence_pointers)
+        for key in ENCODED_COLUMNS:
+            npsave(os.path.join(store_dir, COLUMN_NAMES[key] + '_vocabulary.npy'), nparray(self.vocabularies[key], dtype=unicode))
+        utils.write_store_header(store_dir=store_dir, header_file=STORE_HEADER, header={utils.FILE_HASH_VALUE: self.fingerprint,
+                                                                                        'sentence_count':      self.get_sentence_count(),
+                                                                                        'token_count':         self.get_token_count()})
+
+    def load_store(self, store_dir=None, memory_map=True):
+        """ *Loads a store saved by **save_store** if it belongs to the same
+        corpus.*
+
+        :param str store_dir: The directory of the store.
+        :param bool memory_map: Whether the arrays are memory mapped (read only) instead of read.
+        :return: Nothing.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        :raise unequalValueError: If the store belongs to another corpus or is inconsistent.
+        """
+        header = utils.read_store_header(store_dir=store_dir, header_file=STORE_HEADER, fingerprint={str(utils.FILE_HASH_VALUE): self.fingerprint})
+        mode = 'r' if memory_map else None
+        columns = {k:npload(os.path.join(store_dir, COLUMN_NAMES[k] + '.npy'), mmap_mode=mode) for k in STORE_COLUMNS}
+        pointers = npload(os.path.join(store_dir, 'sentence_pointers.npy'), mmap_mode=mode)
+        if len(pointers) != header.get('sentence_count') + 1 or any([len(c) != header.get('token_count') for c in columns.values()]):
+            raise exp.unequalValueError('The column store is inconsistent.')
+        self.columns = columns
+        self.sentence_pointers = pointers
+        self.vocabularies = {k:npload(os.path.join(store_dir, COLUMN_NAMES[k] + '_vocabulary.npy')).tolist() for k in ENCODED_COLUMNS}
+
+    def get_sentence_count(self):
+        return len(self.sentence_pointers) - 1
+
+    def get_token_count(self):
+        return int(self.sentence_pointers[-1])
+
+    def get_column(self, key=None):
+        """ *Returns the whole corpus column of the given annotation key.*
+
+        :param int key: The annotation key (see STORE_COLUMNS).
+        :return: The column.
+        :rtype: numpy.ndarray
+        :raise KeyError: If the key is not a column of the store.
+        """
+        if key not in self.columns:
+            raise KeyError('The provided key is not a column.\nFound: {}'.format(key))
+        return self.columns[key]
+
+    def get_sentence_pointers(self):
+        return self.sentence_pointers
+
+    def get_sentence_range(self, sentence_id=None):
+        """ *Returns the first and the last (excluded) token row of a sentence.*
+
+        :param int sentence_id: The sentence ID (starting with 1).
+        :return: The token row range of the sentence.
+        :rtype: tuple(int, int)
+        :raise ValueError: If the sentence ID is out of range.
+        """
+        if sentence_id == None:
+            raise exp.noneValueError('Sentence ID cannot be "None"')
+        elif not 1 <= sentence_id <= self.get_sentence_count():
+            raise ValueError('Sentence ID must be between {} and {}.\nFound: {}'.format(1, self.get_sentence_count(), sentence_id))
+        return int(self.sentence_pointers[sentence_id-1]), int(self.sentence_pointers[sentence_id])
+
+    def get_sentence(self, sentence_id=None):
+        """ *Returns the columns of one sentence, as slices (views) of the
+        corpus columns.*
+
+        :param int sentence_id: The sentence ID (starting with 1).
+        :return: The annotation key to column slice map.
+        :rtype: dict(int, numpy.ndarray)
+        :raise ValueError: If the sentence ID is out of range.
+        """
+        start, end = self.get_sentence_range(sentence_id=sentence_id)
+        return {k:c[start:end] for k, c in self.columns.items()}
+
+    def get_vocabulary(self, key=None):
+        """ *Returns the vocabulary of an encoded column, the position of a
+        string is its ID.*
+
+        :param int key: The annotation key (see ENCODED_COLUMNS).
+        :return: The vocabulary.
+        :rtype: list[str]
+        :raise KeyError: If the column is not encoded.
+        """
+        if key not in self.vocabularies:
+            raise KeyError('The provided key is not an encoded column.\nFound: {}'.format(key))
+        return self.vocabularies[key]
+
+    def decode(self, key=None, ids=None):
+        """ *Returns the strings of the given IDs of an encoded column.*
+
+        :param int key: The annotation key (see ENCODED_COLUMNS).
+        :param ids: The IDs *e.g.* a sentence slice of the column.
+        :return: The strings (None for NULL).
+        :rtype: list[str]
+        """
+        vocabulary = self.get_vocabulary(key=key)
+        return [vocabulary[i] if i != utils.NULL else None for i in ids]
+# CLASS:: END =================================================================
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Tue Oct 13 10:12:41 2026
+- Deskin - Orange Labs - Lannion - France
+
+.. module:: libcompressed
+    :platform: UNIX/Linux
+    :synopsis: Seekable reading of compressed (gzip, xz) input files
+
+.. moduleauthor:: Munshi Asadullah <munshi.asadullah@orange.com>
+
+*The file like object to read the decompressed content of a gzip or xz file
+with random access. A restart index (decompressor states at known positions)
+is built while the content is decompressed, so seeking decompresses only the
+block between the nearest restart point and the wanted position. The member
+or stream boundaries of the index can be saved next to the metadata of the
+file and loaded by a later process.*
+"""
+
+import os
+import zlib
+import json
+import bisect
+import threading
+
+from collections import OrderedDict
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+import libexceptions as exp
+
+GZIP_FORMAT = 51
+""" gzip compressed file (single or multiple members)
+"""
+
+XZ_FORMAT = 52
+""" xz compressed file (single or multiple streams)
+"""
+
+GZIP_MAGIC = '\x1f\x8b'
+XZ_MAGIC = '\xfd7zXZ\x00'
+""" Leading bytes of the compressed file formats
+"""
+
+RESTART_INTERVAL = 4194304
+""" Minimum number of decompressed bytes between two restart points
+"""
+
+COMPRESSED_BLOCKSIZE = 65536
+""" Number of compressed bytes decompressed at once
+"""
+
+RESTART_INDEX_VERSION = 1
+""" Version of the saved restart index format
+"""
+
+RESTART_INDEX_LIMIT = 8
+""" Maximum number of restart indexes kept in memory, the least recently used
+one is dropped first
+"""
+
+RESTART_INDEX_REGISTRY = OrderedDict()
+""" Restart indexes of the files opened recently, shared by all the readers of
+the same (unchanged) file in the process
+"""
+
+REGISTRY_LOCK = threading.Lock()
+""" Lock of the restart index registry
+"""
+
+#=====================
+
+def detect_format(source_file=None): # - DEF::START ---------------------------
+    """ Method to detect the compression format of the given input file
+    (*source_file*) from its leading bytes.
+
+    :param str source_file: The full path of the file.
+    :return: GZIP_FORMAT, XZ_FORMAT or None for an uncompressed file.
+    :rtype: int
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+
+    >>> detect_format(source_file='/my/own/path/fakedata.conll.gz')
+    51
+    """
+    with open(source_file, 'rb') as sFile:
+        magic = sFile.read(len(XZ_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return GZIP_FORMAT
+    elif magic.startswith(XZ_MAGIC):
+        return XZ_FORMAT
+    return None
+# ----------------------------------------------------------------- DEF:: END -
+
+def get_restart_index(source_file=None): # - DEF::START -----------------------
+    """ Method to get the restart index of the given compressed file
+    (*source_file*) from the registry of the process, a new (empty) index is
+    registered for a new or changed file. At most RESTART_INDEX_LIMIT indexes
+    are kept.
+
+    :param str source_file: The full path of the compressed file.
+    :return: The restart index of the file.
+    :rtype: restartIndex
+    :raise OSError: If the file does not exist.
+    """
+    fileStat = os.stat(source_file)
+    key = (os.path.abspath(source_file), fileStat.st_size, fileStat.st_mtime)
+    with REGISTRY_LOCK:
+        index = RESTART_INDEX_REGISTRY.pop(key, None)
+        if index is None:
+            index = restartIndex()
+        RESTART_INDEX_REGISTRY[key] = index
+        while len(RESTART_INDEX_REGISTRY) > RESTART_INDEX_LIMIT:
+            RESTART_INDEX_REGISTRY.popitem(last=False)
+    return index
+# ----------------------------------------------------------------- DEF:: END -
+
+def save_restart_index(source_file=None, index_file=None): # - DEF::START -----
+    """ Method to save the member (gzip) or stream (xz) boundaries found in the
+    restart index of the given compressed file (*source_file*), with the size
+    and the modification time of the file, to the index file (*index_file*).
+
+    :param str source_file: The full path of the compressed file.
+    :param str index_file: The file to save the boundaries to.
+    :return: Nothing.
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+
+    .. Note::
+        A decompressor state cannot be saved, hence only the boundaries (where
+        a new decompressor starts) are kept. A file compressed in several
+        members or streams (e.g. bgzip, pigz -i, pixz) is thus randomly
+        accessible right after loading the index, a single member file is
+        decompressed once per process to rebuild the restart points.
+    """
+    fileStat = os.stat(source_file)
+    index = get_restart_index(source_file=source_file)
+    with open(index_file + '.tmp', 'w') as fp:
+        json.dump({'version':    RESTART_INDEX_VERSION,
+                   'statistics': [fileStat.st_size, fileStat.st_mtime],
+                   'boundaries': index.get_boundaries()}, fp)
+    os.rename(index_file + '.tmp', index_file)
+# ----------------------------------------------------------------- DEF:: END -
+
+def load_restart_index(source_file=None, index_file=None): # - DEF::START -----
+    """ Method to add the boundaries saved by **save_restart_index** to the
+    restart index of the given compressed file (*source_file*).
+
+    :param str source_file: The full path of the compressed file.
+    :param str index_file: The saved index file.
+    :return: Nothing.
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+    :raise unequalValueError: If the index has another version or belongs to another version of the file.
+    """
+    fileStat = os.stat(source_file)
+    with open(index_file, 'r') as fp:
+        saved = json.load(fp)
+    if saved.get('version') != RESTART_INDEX_VERSION or saved.get('statistics') != [fileStat.st_size, fileStat.st_mtime]:
+        raise exp.unequalValueError('The restart index does not match the compressed file.')
+    index = get_restart_index(source_file=source_file)
+    for offset, compressedOffset in saved.get('boundaries'):
+        index.add_point(offset, compressedOffset, boundary=True)
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: restart points of a compressed file ---------------------------------
+# =============================================================================
+class restartIndex:
+    """ *The sorted list of restart points of a compressed file. Each point is
+    the decompressed offset, the compressed offset and the decompressor state
+    at that position (None for the start of a gzip member or an xz stream,
+    where a new decompressor is used).*
+
+    :param int restart_interval: Minimum decompressed bytes between two points.
+    :return: Nothing.
+    """
+    def __init__(self, restart_interval=RESTART_INTERVAL):
+        self.restart_interval = restart_interval
+        self.offsets = [0]
+        self.points = [(0, 0, None)]
+        self.lock = threading.Lock() #----------------------------------------- the index may be shared by readers of different threads
+
+    def add_point(self, offset=0, compressed_offset=0, decompressor=None, boundary=False):
+        """ *Adds a restart point in offset order. A decompressor state is
+        only copied if the point is far enough from the previous one, member
+        or stream boundaries are always added.*
+        """
+        with self.lock:
+            i = bisect.bisect_left(self.offsets, offset)
+            if i < len(self.offsets) and self.offsets[i] == offset:
+                return
+            elif boundary: # -------------------------------------------------- loaded boundaries may come first
+                self.offsets.insert(i, offset)
+                self.points.insert(i, (offset, compressed_offset, None))
+            elif offset - self.offsets[i-1] >= self.restart_interval and hasattr(decompressor, 'copy'):
+                self.offsets.insert(i, offset)
+                self.points.insert(i, (offset, compressed_offset, decompressor.copy()))
+
+    def find_point(self, offset=0):
+        """ *Returns the last restart point at or before the given offset.*
+        """
+        with self.lock:
+            return self.points[bisect.bisect_right(self.offsets, offset) - 1]
+
+    def get_point_count(self):
+        return len(self.points)
+
+    def get_boundaries(self):
+        """ *Returns the decompressed and compressed offsets of the member or
+        stream boundaries (the points without a decompressor state).*
+        """
+        with self.lock:
+            return [[o, c] for o, c, d in self.points[1:] if d is None]
+# CLASS:: END =================================================================
+
+# CLASS:: seekable reader of a compressed file --------------------------------
+# =============================================================================
+class compressedFile:
+    """ *The read only, binary file like object (read, readline, seek, tell,
+    iteration and context manager) over the decompressed content of a gzip
+    or an xz file.*
+
+    :param str source_file: The full path of the compressed file.
+    :return: Nothing.
+    :raise undefinedTypeError: If the file is not gzip or xz compressed.
+    :raise initializationError: If xz support (lzma) is not available.
+
+    .. Note::
+        gzip decompressor states can be copied, hence restart points are added
+        every RESTART_INTERVAL bytes. The lzma module does not allow that,
+        hence an xz file can only be restarted at the start of each stream
+        and seeking backwards in a single stream file decompresses it from
+        the start. The restart index lives in memory and is shared by all the
+        readers of the same file in the process (see get_restart_index), its
+        boundaries can be saved for a later process (see save_restart_index).
+    """
+    def __init__(self, source_file=None):
+        self.format = detect_format(source_file=source_file)
+        if self.format == None:
+            raise exp.undefinedTypeError('Not a gzip or xz file.\nFound: {}'.format(source_file))
+        elif self.format == XZ_FORMAT and lzma == None:
+            raise exp.initializationError('The lzma module is needed to read xz files.')
+        self.index = get_restart_index(source_file=source_file)
+        self.raw = open(source_file, 'rb')
+        self.closed = False
+        self.__restart(self.index.find_point(0))
+
+    def __new_decompressor(self):
+        if self.format == GZIP_FORMAT:
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return lzma.LZMADecompressor()
+
+    def __restart(self, point=None):
+        """ *Restarts the decompression from the given restart point.*
+        """
+        offset, compressedOffset, decompressor = point
+        self.decompressor = decompressor.copy() if decompressor != None else self.__new_decompressor()
+        self.raw.seek(compressedOffset)
+        self.buffer = '' #----------------------------------------------------- decompressed bytes
+        self.buffer_offset = offset #------------------------------------------ decompressed offset of the buffer
+        self.cursor = 0 #------------------------------------------------------ read position in the buffer
+        self.eof = False
+
+    def __fill(self):
+        """ *Decompresses the next compressed block into the buffer and updates
+        the restart index.*
+
+        :return: False at the end of the file.
+        :rtype: bool
+        """
+        if self.eof:
+            return False
+        chunk = self.raw.read(COMPRESSED_BLOCKSIZE)
+        if not len(chunk):
+            self.eof = True
+            return False
+        data = [self.decompressor.decompress(chunk)]
+        produced = self.buffer_offset + len(self.buffer) + len(data[0])
+        # a member (gzip) or a stream (xz) may end inside the block -----------
+        unused = self.decompressor.unused_data
+        while len(unused) and len(unused.strip('\0')):
+            self.index.add_point(produced, self.raw.tell() - len(unused), boundary=True)
+            self.decompressor = self.__new_decompressor()
+            data.append(self.decompressor.decompress(unused))
+            produced += len(data[-1])
+            unused = self.decompressor.unused_data
+        self.index.add_point(produced, self.raw.tell(), self.decompressor)
+        # drop the consumed part of the buffer --------------------------------
+        if self.cursor:
+            self.buffer = self.buffer[self.cursor:]
+            self.buffer_offset += self.cursor
+            self.cursor = 0
+        self.buffer += ''.join(data)
+        return True
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        while (size < 0 or len(self.buffer) - self.cursor < size) and self.__fill():
+            pass
+        end = len(self.buffer) if size < 0 else self.cursor + size
+        data = self.buffer[self.cursor:end]
+        self.cursor += len(data)
+        return data
+
+    def readline(self, size=-1):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        while True:
+            end = self.buffer.find('\n', self.cursor)
+            if end >= 0:
+                end += 1
+                break
+            elif not self.__fill():
+                end = len(self.buffer)
+                break
+        if size >= 0:
+            end = min(end, self.cursor + size)
+        data = self.buffer[self.cursor:end]
+        self.cursor += len(data)
+        return data
+
+    def seek(self, offset=0, whence=0):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        if whence == 1:
+            offset += self.tell()
+        elif whence == 2:
+            while self.__fill():
+                pass
+            offset += self.buffer_offset + len(self.buffer)
+        elif whence != 0:
+            raise ValueError('Invalid whence value.\nFound: {}'.format(whence))
+        if offset < 0:
+            raise ValueError('Negative seek position.\nFound: {}'.format(offset))
+        # restart from the nearest point if it is not reachable forward -------
+        point = self.index.find_point(offset)
+        if offset < self.buffer_offset or point[0] > self.buffer_offset + len(self.buffer):
+            self.__restart(point)
+        # decompress forward, dropping the skipped bytes ----------------------
+        while self.buffer_offset + len(self.buffer) < offset:
+            self.cursor = len(self.buffer)
+            if not self.__fill():
+                break
+        self.cursor = min(offset - self.buffer_offset, len(self.buffer))
+
+    def tell(self):
+        return self.buffer_offset + self.cursor
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+            self.buffer = ''
+            self.closed = True
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        line = self.readline()
+        if not len(line):
+            raise StopIteration
+        return line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+# CLASS:: END =================================================================
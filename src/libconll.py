@@ -19,13 +19,223 @@ import libbase as base
 import os
 import sys
 
+import copy
 import json
+import bisect
+import mmap
+import struct
+import random
+import hashlib
+import threading
+import multiprocessing
 
 from codecs import open as utfOpen
+from collections import OrderedDict
+from Queue import Queue, Full
 
 import libutilities as utils
+import libcompressed as compressed
 import libexceptions as exp
 
+BINARY_HEADER = '<8sI40sQdQQQq40s28Q'
+""" Binary metadata header: magic, version, hash value, file size, file 
+modification time, sentence count, analyzed length, analyzed line count, 
+content length (-1 if unknown), analyzed prefix hash value and the (offset, 
+length) pairs of the 14 data sections
+"""
+
+LINE_SECTION = 0
+OFFSET_SECTION = 1
+TOKEN_POINTER_SECTION = 2
+TID_POINTER_SECTION = 3
+TOKEN_TYPE_SECTION = 4
+TID_SECTION = 5
+LENGTH_SECTION = 6
+DISTRIBUTION_SECTION = 7
+TOKEN_COUNT_SECTION = 13
+""" Binary metadata data sections, the 6 distribution sections follow the 
+order of the distribution keys in the utility module
+"""
+
+VOCABULARY_KEYS = [utils.TOKEN, utils.LEMMA, utils.GPOS, utils.POS, utils.MORPH, utils.RELATION]
+""" The annotations with an interned vocabulary, in the order of the 
+distribution sections
+"""
+
+DISTRIBUTION_MAPS = ['token_distribution_map', 'lemma_distribution_map', 'gpos_distribution_map', 
+                     'pos_distribution_map', 'morphology_distribution_map', 'relation_distribution_map']
+""" The attributes of the distribution maps, in the order of VOCABULARY_KEYS
+"""
+
+INDEX_KEYS = [utils.LEMMA, utils.GPOS, utils.POS, utils.RELATION]
+""" The annotations of the sentence index, in the order of its sections
+"""
+
+INDEX_HEADER = '<8sI40sQ16Q'
+""" Sentence index header: magic, version, hash value of the input file, 
+sentence count and, for each annotation of INDEX_KEYS, the offset of the 
+posting pointers, the vocabulary size, the offset of the postings and the 
+number of postings
+"""
+
+# CLASS:: lazy, memory mapped sentence configuration --------------------------
+# =============================================================================
+class mappedSentenceConfiguration:
+    """ *The read only, dict like view of the sentence configurations stored in 
+    a binary metadata file. Nothing is decoded until a sentence configuration 
+    is requested, hence the view is available right after mapping the file.*
+    
+    :param mmap.mmap memory_map: The memory mapped binary metadata file.
+    :param int sentence_count: The number of sentences in the file.
+    :param list sections: The (offset, length) pairs of the data sections.
+    :return: Nothing.
+    
+    .. Note::
+        The sentence IDs are always the consecutive integers starting from 1 
+        and each configuration is returned as [line, offset, length, 
+        [[tid, type], ...]] exactly as generated by the analysis.
+    """
+    def __init__(self, memory_map=None, sentence_count=0, sections=None):
+        if memory_map == None:
+            raise exp.noneValueError('Memory map cannot be "None"')
+        elif sections == None:
+            raise exp.noneValueError('Data sections cannot be "None"')
+        self.memory_map = memory_map
+        self.sentence_count = sentence_count
+        self.sections = sections
+    
+    def __len__(self):
+        return self.sentence_count
+    
+    def __contains__(self, sentence_number):
+        return isinstance(sentence_number, (int, long)) and 1 <= sentence_number <= self.sentence_count
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __getitem__(self, sentence_number):
+        if sentence_number not in self:
+            raise KeyError(sentence_number)
+        return self.get(sentence_number)
+    
+    def __read_value(self, section=None, index=0):
+        return struct.unpack_from('<Q', self.memory_map, self.sections[section][0]+8*index)[0]
+    
+    def get(self, sentence_number=None, default=None):
+        if sentence_number not in self:
+            return default
+        i = sentence_number - 1
+        initLine = self.__read_value(LINE_SECTION, i)
+        position = self.__read_value(OFFSET_SECTION, i)
+        length = self.__read_value(LENGTH_SECTION, i)
+        tokStart = self.sections[TOKEN_TYPE_SECTION][0] + self.__read_value(TOKEN_POINTER_SECTION, i)
+        tokEnd = self.sections[TOKEN_TYPE_SECTION][0] + self.__read_value(TOKEN_POINTER_SECTION, i+1)
+        tidStart = self.sections[TID_SECTION][0] + self.__read_value(TID_POINTER_SECTION, i)
+        tidEnd = self.sections[TID_SECTION][0] + self.__read_value(TID_POINTER_SECTION, i+1)
+        tokTypes = bytearray(self.memory_map[tokStart:tokEnd])
+        tids = self.memory_map[tidStart:tidEnd].decode('UTF-8').split()
+        return [initLine, position, length, [[tids[j], tokTypes[j]] for j in range(len(tokTypes))]]
+    
+    def get_token_counts(self):
+        """ *Returns the number of tokens of each sentence (sentence 1 first), 
+        read at once from the token count section.*
+        """
+        return struct.unpack_from('<{}I'.format(self.sentence_count), self.memory_map, self.sections[TOKEN_COUNT_SECTION][0])
+    
+    def keys(self):
+        return range(1, self.sentence_count+1)
+    
+    def values(self):
+        return [self.get(k) for k in self.keys()]
+    
+    def items(self):
+        return [(k, self.get(k)) for k in self.keys()]
+# CLASS:: END =================================================================
+
+# CLASS:: posting lists of sentence IDs ---------------------------------------
+# =============================================================================
+class sentenceIndex:
+    """ *The read only view of a sentence index (as built by 
+    CoNLLMetaData.build_sentence_index) over a memory mapped file or a byte 
+    string. Nothing is decoded until a posting list is requested.*
+    
+    :param buffer: The index data (mmap.mmap or str).
+    :return: Nothing.
+    :raise metadataValueError: If the data is not a sentence index of a supported version.
+    """
+    def __init__(self, buffer=None):
+        if buffer == None:
+            raise exp.noneValueError('Index data cannot be "None"')
+        header = struct.unpack_from(INDEX_HEADER, buffer, 0)
+        if header[0] != utils.INDEX_MAGIC or header[1] != utils.INDEX_VERSION:
+            raise exp.metadataValueError('Not a sentence index of a supported version.\nFound: {} {}'.format(repr(header[0]), header[1]))
+        self.buffer = buffer
+        self.file_hash_value = header[2].rstrip('\0')
+        self.sentence_count = header[3]
+        self.sections = {INDEX_KEYS[i]:header[4+4*i:8+4*i] for i in range(len(INDEX_KEYS))}
+    
+    def get_term_count(self, key=None):
+        return self.sections[key][1]
+    
+    def get_postings(self, key=None, term_id=None):
+        """ *Returns the sorted sentence IDs of a vocabulary ID of an annotation 
+        (empty for an unknown ID).*
+        """
+        pointerOffset, termCount, postingOffset, postingCount = self.sections[key]
+        if term_id < 0 or term_id >= termCount:
+            return ()
+        start, end = struct.unpack_from('<2Q', self.buffer, pointerOffset + 8*term_id)
+        return struct.unpack_from('<{}I'.format(end - start), self.buffer, postingOffset + 4*start)
+# CLASS:: END =================================================================
+
+def intersect_postings(postings=None): # - DEF::START -------------------------
+    """ Method to intersect sorted posting lists (*postings*), starting with 
+    the shortest one. A much longer list is searched by bisection instead of 
+    being scanned.
+    
+    :param list postings: The sorted posting lists.
+    :return: The sorted IDs found in all the lists.
+    :rtype: list[int]
+    
+    >>> intersect_postings(postings=[(1, 4, 7, 9), (4, 9), (2, 4, 9, 12)])
+    [4, 9]
+    """
+    if not len(postings):
+        return []
+    lists = sorted(postings, key=len)
+    result = list(lists[0])
+    for other in lists[1:]:
+        if not len(result):
+            break
+        elif len(result) * 16 < len(other):
+            kept = []
+            lo = 0
+            for e in result:
+                lo = bisect.bisect_left(other, e, lo)
+                if lo == len(other):
+                    break
+                elif other[lo] == e:
+                    kept.append(e)
+            result = kept
+        else:
+            otherSet = set(other)
+            result = [e for e in result if e in otherSet]
+    return result
+# ----------------------------------------------------------------- DEF:: END -
+
+def union_postings(postings=None): # - DEF::START -----------------------------
+    """ Method to merge posting lists (*postings*).
+    
+    :param list postings: The posting lists.
+    :return: The sorted IDs found in any of the lists.
+    :rtype: list[int]
+    
+    >>> union_postings(postings=[(1, 4), (4, 9)])
+    [1, 4, 9]
+    """
+    return sorted(set().union(*postings))
+# ----------------------------------------------------------------- DEF:: END -
+
 # CLASS:: data-structure for the metadata of a CoNLL format file --------------
 # =============================================================================
 class CoNLLMetaData:
@@ -36,6 +246,9 @@ class CoNLLMetaData:
         
     :param str input_file: The input file in CoNLL format
     :param str meta_file: The metadata file associated with the input_file
+    :param bool save_meta: Whether newly analyzed metadata shall be saved.
+    :param int processes: The number of processes used for the analysis (None for all the cores).
+    :param bool sentence_index: Whether the sentence index is loaded, or built and saved next to the metadata file (see find_sentences).
     :return: Nothing.
     :raise invalidFilePathException: If the input file path is invalid.
     
@@ -48,9 +261,21 @@ class CoNLLMetaData:
         length of the file is not zero.
         - Now we shall try to open the file.
         - Once opened we shall check if all the data keys are present.
-        - If so we shall retrieve the input hash value and compare it with the \
-        calculated input file hash value to determine if the input file is the \
-        actual input file associeated with the metadata.
+        - If so we shall compare the saved size and modification time of the \
+        input file with the current ones. If they are the same the metadata is \
+        used as is and no analysis is done, unless the modification time is \
+        within RACY_INTERVAL seconds of the saving time of the metadata (a \
+        same size change may not have changed it).
+        - Otherwise we shall retrieve the hash value of the analyzed prefix of \
+        the input file and compare it with the calculated hash value of the \
+        same prefix to determine if the input file is the actual input file \
+        associeated with the metadata or the same file with new sentences \
+        appended to it.
+        - If the metadata covers only a prefix of the input file (appended \
+        file or interrupted analysis) the analysis is resumed from the end of \
+        the prefix and the metadata is updated.
+        - If the file statistics were refreshed by a successful hash check \
+        the metadata is saved again, so the next run trusts the statistics.
         - Failiure at any of the previous steps will invoce the analysis method \
         thus genarating the metadata ans saving it.
         - If metadata file name provided exist the new metadata will be saved \
@@ -60,8 +285,14 @@ class CoNLLMetaData:
         saved in that directory.
         - For any other case the metafile will be generated in the same path \
         where the input file is.
+    
+    .. Warning::
+        Matching statistics are trusted without reading the input file, hence 
+        a change that keeps the size and restores the modification time (e.g. 
+        a copy preserving the timestamps) is not detected. Delete the metadata 
+        file to force the analysis in that case.
     """
-    def __init__(self, input_file=None, meta_file=None, save_meta=True): # DEF:: START --------
+    def __init__(self, input_file=None, meta_file=None, save_meta=True, processes=1, sentence_index=False): # DEF:: START --------
         # check input file path -----------------------------------------------
         try:        
             utils.doesTheFileExist(file_path=input_file)
@@ -73,6 +304,13 @@ class CoNLLMetaData:
         self.file_location = head #-------------------------------------------- input file path
         self.file_name, self.file_extension = os.path.splitext(tail) #--------- input file name and extension
         self.file_hash_value = None #------------------------------------------ hash value of the input file (for change in file monitoring)
+        self.file_statistics = None #------------------------------------------ size and modification time of the input file (for quick change monitoring)
+        self.statistics_refreshed = False #------------------------------------ whether the loaded file statistics were refreshed by a hash check (to be saved)
+        self.analyzed_length = 0 #--------------------------------------------- number of bytes covered by the metadata (always a sentence boundary when resumable)
+        self.analyzed_line_count = 0 #----------------------------------------- number of lines covered by the metadata
+        self.content_length = None #------------------------------------------- number of bytes of the (decompressed) content of the input file (None if unknown)
+        self.prefix_hash_value = None #---------------------------------------- hash value of the analyzed prefix (empty if the analysis cannot be resumed)
+        self.prefix_hasher = None #-------------------------------------------- hash object of the verified prefix (to be continued by a resumed analysis)
         self.sentence_configuration = {} #------------------------------------- sentence number to file pointer offset map (starting with sentence 0)
         self.token_distribution_map = {}
         self.lemma_distribution_map = {}
@@ -80,6 +318,17 @@ class CoNLLMetaData:
         self.pos_distribution_map = {}
         self.morphology_distribution_map = {}
         self.relation_distribution_map = {}
+        self.memory_map = None #----------------------------------------------- memory mapped binary metadata file (None if not loaded from one)
+        self.mapped_distributions = {} #--------------------------------------- annotation key to the offset of its distribution section not decoded yet
+        self.vocabularies = {} #----------------------------------------------- annotation key to frequency ordered list of strings (position is the ID)
+        self.vocabulary_indexes = {} #----------------------------------------- annotation key to map of string to ID
+        self.sentence_index = None #------------------------------------------- posting lists of sentence IDs (optional)
+        self.sentence_lengths = None #----------------------------------------- number of tokens of each sentence (generated when needed)
+        # check the save option -----------------------------------------------
+        if save_meta == None:
+            raise exp.noneValueError('save_meta option flag cnnot be "None"')
+        elif not isinstance(save_meta, bool):
+            raise TypeError('save_meta option flag must be bool type.\nFound: <{}>'.format(type(save_meta)))
         # slelct the metadata file ... either the provided path or local path -
         skip_loading = False
         try:
@@ -91,11 +340,27 @@ class CoNLLMetaData:
         except exp.pathTypeIOError:
             meta_file = meta_file + '/' + self.file_name + utils.META_EXTENSION
         # analyze or load metadata --------------------------------------------
+        resume = False
         try:
             if skip_loading:
                 raise exp.skipStepWarning
             # attempting to load metadata -------------------------------------
-            self.load_metadate(meta_file=meta_file, current_hash=utils.generate_hash(source_file=input_file))
+            self.load_metadate(meta_file=meta_file, input_file=input_file)
+            # valid metadata found ... nothing left to do ---------------------
+            if self.is_complete():
+                self.__init_restart_index(input_file=input_file, meta_file=meta_file, save_index=False)
+                if save_meta and self.statistics_refreshed:
+                    try:
+                        self.save_metadata(meta_file=meta_file)
+                    except Exception as e:
+                        print >> sys.stderr, 'WARNING: Metadata file not updated... the input file will be hashed again next time.'
+                        print >> sys.stderr, e
+                if sentence_index:
+                    self.__init_sentence_index(input_file=input_file, meta_file=meta_file, save_index=save_meta)
+                return
+            # valid metadata for a prefix of the input file -------------------
+            print >> sys.stderr, 'WARNING: resuming analysis from byte {} ...'.format(self.analyzed_length)
+            resume = True
         except Warning:
             print >> sys.stderr, 'WARNING: running analysis ...'
             print >> sys.stderr, 'Metadata: {}'.format(meta_file)
@@ -103,19 +368,200 @@ class CoNLLMetaData:
             print >> sys.stderr, 'WARNING: Failed loading metadata file ... running analysis.'
             print >> sys.stderr, e            
         # running analysis ----------------------------------------------------
-        self.analyze(in_file=input_file)
+        self.analyze(in_file=input_file, processes=processes, resume=resume, checkpoint_file=meta_file if save_meta else None)
         # saving metadata -----------------------------------------------------
-        if save_meta == None:
-            raise exp.noneValueError('save_meta option flag cnnot be "None"')
-        elif not isinstance(save_meta, bool):
-            raise TypeError('save_meta option flag must be bool type.\nFound: <{}>'.format(type(save_meta)))
-        elif save_meta:
+        if save_meta:
             try:
                 self.save_metadata(meta_file=meta_file)
             except Exception as e:
                 print >> sys.stderr, 'WARNING: Metadata file not saved... re-analysis will be needed next time.'
                 print >> sys.stderr, e
+        self.__init_restart_index(input_file=input_file, meta_file=meta_file, save_index=save_meta)
+        if sentence_index:
+            self.__init_sentence_index(input_file=input_file, meta_file=meta_file, save_index=save_meta)
+    
+    def __init_restart_index(self, input_file=None, meta_file=None, save_index=True):
+        """ *Loads the restart index of a compressed input file saved next to 
+        the metadata file (see libcompressed.save_restart_index), or saves the 
+        one built by the analysis.*
+        """
+        if not utils.is_compressed(source_file=input_file):
+            return
+        restart_file = os.path.splitext(meta_file)[0] + utils.RESTART_EXTENSION
+        try:
+            compressed.load_restart_index(source_file=input_file, index_file=restart_file)
+            return
+        except StandardError:
+            if not save_index:
+                return
+        try:
+            compressed.save_restart_index(source_file=input_file, index_file=restart_file)
+        except Exception as e:
+            print >> sys.stderr, 'WARNING: Restart index not saved... random access will decompress the file again.'
+            print >> sys.stderr, e
+    
+    def __init_sentence_index(self, input_file=None, meta_file=None, save_index=True):
+        """ *Loads the sentence index saved next to the metadata file, or builds 
+        it (and saves it) if it is missing or belongs to another version of the 
+        input file.*
+        """
+        index_file = os.path.splitext(meta_file)[0] + utils.INDEX_EXTENSION
+        try:
+            self.load_sentence_index(index_file=index_file)
+            return
+        except StandardError as e:
+            print >> sys.stderr, 'WARNING: Failed loading sentence index ... building it.'
+            print >> sys.stderr, e
+        self.build_sentence_index(input_file=input_file, index_file=index_file if save_index else None)
+    
+    def build_sentence_index(self, input_file=None, index_file=None):
+        """ *Builds the posting lists of the sentence IDs of each lemma, generic 
+        POS, POS and relation value with one pass over the input file.*
+        
+        :param str input_file: The input file described by the metadata.
+        :param str index_file: The file to save the index to (None for no saving).
+        :return: Nothing.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        
+        .. Note::
+            The values are the vocabulary IDs of the metadata, a posting list 
+            is the sorted list of the sentences containing the value at least 
+            once. The index is saved in the same format it is used from, hence 
+            a saved index is memory mapped and costs no loading time.
+        """
+        postings = {k:[[] for i in range(len(self.get_vocabulary(key=k)))] for k in INDEX_KEYS}
+        reader = CoNLLFileReader(input_file=input_file, metadata=self, encoded=True)
+        try:
+            for sid, sentence in reader:
+                for key in INDEX_KEYS:
+                    keyPostings = postings[key]
+                    for termID in set([t.getValue(key) for t in sentence]):
+                        if termID != utils.NULL:
+                            keyPostings[termID].append(sid)
+        finally:
+            reader.close()
+        # pointers and postings of each annotation (8 byte aligned) ----------
+        sections = []
+        position = struct.calcsize(INDEX_HEADER)
+        data = ['\0' * (-position % 8)]
+        position += len(data[0])
+        for key in INDEX_KEYS:
+            pointers = [0]
+            for p in postings[key]:
+                pointers.append(pointers[-1] + len(p))
+            flat = [sid for p in postings[key] for sid in p]
+            data.append(struct.pack('<{}Q'.format(len(pointers)), *pointers))
+            data.append(struct.pack('<{}I'.format(len(flat)), *flat))
+            data[-1] += '\0' * (-len(data[-1]) % 8)
+            sections.extend([position, len(postings[key]), position + len(data[-2]), len(flat)])
+            position += len(data[-2]) + len(data[-1])
+        buffer = struct.pack(INDEX_HEADER, utils.INDEX_MAGIC, utils.INDEX_VERSION, str(self.file_hash_value or ''), 
+                             self.get_sentence_count(), *sections) + ''.join(data)
+        if index_file != None:
+            # written aside and renamed, a loaded index may map the old file --
+            with open(index_file + '.tmp', 'wb') as fp:
+                fp.write(buffer)
+            os.rename(index_file + '.tmp', index_file)
+        self.sentence_index = sentenceIndex(buffer=buffer)
+    
+    def load_sentence_index(self, index_file=None):
+        """ *Maps a saved sentence index into memory.*
+        
+        :param str index_file: The sentence index file.
+        :return: Nothing.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        :raise metadataValueError: If the file is not a sentence index of a supported version.
+        :raise unequalValueError: If the index belongs to another version of the input file.
+        """
+        with open(index_file, 'rb') as fp:
+            memory_map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        index = sentenceIndex(buffer=memory_map)
+        if index.file_hash_value != self.file_hash_value or index.sentence_count != self.get_sentence_count():
+            raise exp.unequalValueError('The sentence index does not match the metadata.')
+        self.sentence_index = index
+    
+    def get_postings(self, key=None, value=None):
+        """ *Returns the sorted IDs of the sentences containing the given value 
+        of an annotation (e.g. the relation "obj").*
+        
+        :param int key: The annotation key (see INDEX_KEYS).
+        :param str value: The (case insensitive) value.
+        :return: The sorted sentence IDs (empty for an unknown value).
+        :rtype: tuple(int)
+        :raise initializationError: If the sentence index is not available.
+        :raise KeyError: If the annotation is not indexed.
+        """
+        if self.sentence_index == None:
+            raise exp.initializationError('Sentence index is not available (see sentence_index option).')
+        elif key not in INDEX_KEYS:
+            raise KeyError('Annotation is not indexed.\nFound: {}'.format(key))
+        termID = self.get_vocabulary_index(key=key).get(value.lower(), utils.NULL)
+        if termID == utils.NULL:
+            return ()
+        return self.sentence_index.get_postings(key=key, term_id=termID)
+    
+    def find_sentences(self, all_of=None, any_of=None):
+        """ *Returns the sentences containing all the values of all_of and at 
+        least one of the values of any_of, by intersection and union of the 
+        posting lists.*
+        
+        :param list all_of: The (annotation key, value) pairs to be all present (None for no condition).
+        :param list any_of: The (annotation key, value) pairs of which one must be present (None for no condition).
+        :return: The sorted sentence IDs.
+        :rtype: list[int]
+        :raise zeroLengthValueError: If no condition is given.
+        :raise initializationError: If the sentence index is not available.
+        
+        >>> metadata.find_sentences(all_of=[(utils.LEMMA, 'manger'), (utils.RELATION, 'obj')])
+        [12, 57, 803]
+        
+        .. Note::
+            The conditions hold for the sentence, not for one token *i.e.* the 
+            lemma and the tag of a query may be found on different tokens. 
+            The intersection starts with the shortest posting list and looks 
+            the remaining IDs up by bisection in the longer ones, hence the 
+            cost of a selective query depends on its rarest value.
+        """
+        all_of = all_of or []
+        any_of = any_of or []
+        if not len(all_of) and not len(any_of):
+            raise exp.zeroLengthValueError('At least one query condition is needed.')
+        lists = [self.get_postings(key=k, value=v) for k, v in all_of]
+        if len(any_of):
+            lists.append(union_postings(postings=[self.get_postings(key=k, value=v) for k, v in any_of]))
+        return intersect_postings(postings=lists)
 
+    def __getattr__(self, name):
+        # the distribution maps of a binary metadata file are decoded on first 
+        # access, they are missing from the instance until then --------------
+        mapped = self.__dict__.get('mapped_distributions', {})
+        if name in DISTRIBUTION_MAPS and VOCABULARY_KEYS[DISTRIBUTION_MAPS.index(name)] in mapped:
+            self.__decode_distribution(key=VOCABULARY_KEYS[DISTRIBUTION_MAPS.index(name)])
+            return self.__dict__[name]
+        raise AttributeError(name)
+    
+    def close(self):
+        """ *Closes the memory mapped metadata file and sentence index. The 
+        sentence configurations and the distribution maps not decoded yet 
+        cannot be read afterwards.*
+        
+        :return: Nothing.
+        """
+        self.__release_memory_map()
+        if self.sentence_index != None and isinstance(self.sentence_index.buffer, mmap.mmap):
+            self.sentence_index.buffer.close()
+            self.sentence_index = None
+    
+    def is_complete(self):
+        """ *Returns whether the metadata covers the whole (decompressed) 
+        content of the input file as it was when the file statistics were 
+        taken.*
+        
+        :return: True if no analysis is pending.
+        :rtype: bool
+        """
+        return self.content_length != None and self.analyzed_length >= self.content_length
+    
     def get_sentence_count(self):
         """ *Returns the number of sentences in the file.*
         
@@ -125,6 +571,63 @@ class CoNLLMetaData:
         """
         return len(self.sentence_configuration)
     
+    def get_sentence_lengths(self):
+        """ *Returns the length index i.e. the number of tokens (basic 10 slot 
+        lines) of each sentence, sentence 1 first.*
+        
+        :return: The sentence lengths.
+        :rtype: list[int]
+        
+        .. Note::
+            The lengths are stored by the binary metadata format and read at 
+            once, they are only counted from the sentence configurations for 
+            a newly analyzed or a JSON metadata.
+        """
+        if self.sentence_lengths == None:
+            if isinstance(self.sentence_configuration, mappedSentenceConfiguration):
+                self.sentence_lengths = self.sentence_configuration.get_token_counts()
+            else:
+                self.sentence_lengths = [len([t for t in self.sentence_configuration[sid][-1] if t[-1] == utils.BASIC_TEN_SLOT_TYPE]) for sid in range(1, self.get_sentence_count()+1)]
+        return self.sentence_lengths
+    
+    def get_sentences_by_length(self, min_length=1, max_length=None):
+        """ *Returns the IDs of the sentences whose length is in the given range, 
+        e.g. to isolate the long sentences.*
+        
+        :param int min_length: The minimum number of tokens.
+        :param int max_length: The maximum number of tokens (None for no limit).
+        :return: The sorted sentence IDs.
+        :rtype: list[int]
+        """
+        lengths = self.get_sentence_lengths()
+        if max_length == None:
+            return [i+1 for i in range(len(lengths)) if lengths[i] >= min_length]
+        return [i+1 for i in range(len(lengths)) if min_length <= lengths[i] <= max_length]
+    
+    def get_length_buckets(self, bucket_width=utils.BUCKET_WIDTH, min_length=1, max_length=None):
+        """ *Groups the sentences by length, each bucket holds the sentences of 
+        bucket_width consecutive lengths.*
+        
+        :param int bucket_width: The number of lengths of a bucket.
+        :param int min_length: The minimum number of tokens.
+        :param int max_length: The maximum number of tokens, longer sentences are left out (None for no limit).
+        :return: The pairs of the smallest length of a bucket and its sorted sentence IDs, shortest bucket first.
+        :rtype: list[tuple(int, list[int])]
+        :raise smallerValueError: If the bucket width is smaller than 1.
+        
+        >>> metadata.get_length_buckets(bucket_width=10, max_length=30)
+        [(0, [4, 9]), (10, [1, 2, 5, 7]), (20, [3, 6]), (30, [8])]
+        """
+        if bucket_width == None or bucket_width < 1:
+            raise exp.smallerValueError('Bucket width cannot be smaller than 1.\nFound: {}'.format(bucket_width))
+        lengths = self.get_sentence_lengths()
+        buckets = {}
+        for sid in self.get_sentences_by_length(min_length=min_length, max_length=max_length):
+            lower = lengths[sid-1] // bucket_width * bucket_width
+            buckets[lower] = buckets.get(lower, [])
+            buckets[lower].append(sid)
+        return sorted(buckets.items())
+    
     def get_sentence_configuration(self, sentence_number=None):
         """ *Returns the sentence configurations for the input file either all 
         the sentences or for a specific sentence. The formal way to get all 
@@ -132,12 +635,14 @@ class CoNLLMetaData:
         
         :param int sentence_number: The specific sentence configuaration to return.
         :return: One or all the sentence configurations.
-        :rtype: list(list(str, int)) or dict(int, list(list(str, int)))
+        :rtype: list or dict(int, list) or mappedSentenceConfiguration
         :raise KeyError: If the **sentence_number** does not exist.
         
         .. Note::
-            Sentence configuration is a list of tuples ... token ID as found 
-            followed by the type of token that was found.
+            Sentence configuration is the line number of the first line, the 
+            byte offset and the byte length of the sentence (without the 
+            terminating empty line) followed by the list of tuples ... token 
+            ID as found followed by the type of token that was found.
         """
         if sentence_number == None:
             return self.sentence_configuration
@@ -157,7 +662,7 @@ class CoNLLMetaData:
         :return: list of unique tokens.
         :rtype: list[str]
         """
-        return self.token_distribution_map.keys()
+        return list(self.get_vocabulary(key=utils.TOKEN))
         
     def get_token_distribution(self):
         """ *Map of token distribution i.e. map of token to its frequency.*
@@ -181,7 +686,7 @@ class CoNLLMetaData:
         :return: list of unique lemmas.
         :rtype: list[str]
         """
-        return self.lemma_distribution_map.keys()
+        return list(self.get_vocabulary(key=utils.LEMMA))
         
     def get_lemma_distribution(self):
         """ *Map of token distribution i.e. map of lemmas to its frequency.*
@@ -205,7 +710,7 @@ class CoNLLMetaData:
         :return: list of unique generic PoS.
         :rtype: list[str]
         """
-        return self.gpos_distribution_map.keys()
+        return list(self.get_vocabulary(key=utils.GPOS))
         
     def get_generic_pos_distribution(self):
         """ *Map of token distribution i.e. map of generic PoS to its frequency.*
@@ -229,7 +734,7 @@ class CoNLLMetaData:
         :return: list of unique fine-grained PoS.
         :rtype: list[str]
         """
-        return self.pos_distribution_map.keys()
+        return list(self.get_vocabulary(key=utils.POS))
         
     def get_pos_distribution(self):
         """ *Map of token distribution i.e. map of fine-grained PoS to its frequency.*
@@ -253,7 +758,7 @@ class CoNLLMetaData:
         :return: list of unique relation types.
         :rtype: list[str]
         """
-        return self.relation_distribution_map.keys()
+        return list(self.get_vocabulary(key=utils.RELATION))
         
     def get_relation_distribution(self):
         """ *Returns the map of token distribution i.e. map of relation types 
@@ -272,6 +777,72 @@ class CoNLLMetaData:
         """
         return {k:v.keys() for k,v in self.morphology_distribution_map.items()}
     
+    def get_distribution(self, key=None):
+        """ *Returns the distribution map of an annotation with a vocabulary. 
+        The morphological features are flattened to class=value strings.*
+        
+        :param int key: The annotation key (see VOCABULARY_KEYS).
+        :return: map of string to its frequency.
+        :rtype: dict[str, int]
+        :raise KeyError: If the annotation has no vocabulary.
+        """
+        if key == utils.TOKEN:
+            return self.token_distribution_map
+        elif key == utils.LEMMA:
+            return self.lemma_distribution_map
+        elif key == utils.GPOS:
+            return self.gpos_distribution_map
+        elif key == utils.POS:
+            return self.pos_distribution_map
+        elif key == utils.RELATION:
+            return self.relation_distribution_map
+        elif key == utils.MORPH:
+            return {c + u'=' + v:f for c, vmap in self.morphology_distribution_map.items() for v, f in vmap.items()}
+        raise KeyError('No vocabulary for the key.\nFound: {}'.format(key))
+    
+    def get_vocabulary(self, key=None):
+        """ *Returns the interned vocabulary of an annotation, the strings 
+        ordered by descending frequency. The position of a string is its 
+        integer ID.*
+        
+        :param int key: The annotation key (see VOCABULARY_KEYS).
+        :return: The frequency ordered strings.
+        :rtype: list[str]
+        :raise KeyError: If the annotation has no vocabulary.
+        
+        .. Note::
+            The vocabularies are stored in this order by the binary metadata 
+            format, hence loading them costs no sorting. Ties are ordered by 
+            the string itself, so the IDs only change if the frequencies do.
+        """
+        if key in self.mapped_distributions:
+            self.__decode_distribution(key=key)
+        if key not in self.vocabularies:
+            self.vocabularies[key] = utils.get_frequency_ordered_vocabulary(distribution_map=self.get_distribution(key=key))
+        return self.vocabularies[key]
+    
+    def get_vocabulary_index(self, key=None):
+        """ *Returns the map of string to integer ID of an annotation (see 
+        **get_vocabulary**).*
+        
+        :param int key: The annotation key (see VOCABULARY_KEYS).
+        :return: map of string to ID.
+        :rtype: dict[str, int]
+        :raise KeyError: If the annotation has no vocabulary.
+        """
+        if key not in self.vocabulary_indexes:
+            self.vocabulary_indexes[key] = {e:i for i, e in enumerate(self.get_vocabulary(key=key))}
+        return self.vocabulary_indexes[key]
+    
+    def get_vocabulary_indexes(self):
+        """ *Returns the string to integer ID maps of all the annotations with 
+        a vocabulary, keyed by the annotation key.*
+        
+        :return: map of annotation key to map of string to ID.
+        :rtype: dict[int, dict[str, int]]
+        """
+        return {k:self.get_vocabulary_index(key=k) for k in VOCABULARY_KEYS}
+    
     def detect_token_type(self, tok=None):
         """ *Detects and returns the type of token as defined in the utility 
         module.* 
@@ -308,25 +879,38 @@ class CoNLLMetaData:
         # =====================================================================
         return None
     
-    def save_metadata(self, meta_file=None):
+    def save_metadata(self, meta_file=None, meta_format=utils.BINARY_FORMAT):
         """ *Save the extracted metadata into the provided metadata file.*
         
         :param str meta_file: The metafile path to save the data.
+        :param int meta_format: The metadata format, binary (default) or JSON.
         :return: Nothing
         :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
         :raise ValueError: By `unicode file access <https://docs.python.org/2/library/codecs.html#codecs.open>`_.
         :raise ValueError: By `JSON dump <https://docs.python.org/2/library/json.html#json.dump>`_.
         :raise OverflowError: By `JSON dump <https://docs.python.org/2/library/json.html#json.dump>`_.
         :raise TypeError: By `JSON dump <https://docs.python.org/2/library/json.html#json.dump>`_.
+        :raise ValueError: If the metadata format is unknown.
         
         .. Note::
             The default value of **meta_file** is a sheer formality because of
             the structure of the class. This function should only be called by 
             the initialization method and that shall raise exceptions if there 
             is some sort of anomaly in the file name or in the file path.
+        
+        .. Note::
+            The JSON format is kept as an export option, both formats are 
+            detected and loaded by the **load_metadate** method.
         """
+        if meta_format == utils.BINARY_FORMAT:
+            self.__write_binary_metadata(meta_file=meta_file)
+            return
+        elif meta_format != utils.JSON_FORMAT:
+            raise ValueError('Unknown metadata format.\nFound: {}'.format(meta_format))
         json_data = {utils.FILE_HASH_VALUE:         self.file_hash_value,
-                     utils.SENTENCE_CONFIGURATION:  self.sentence_configuration,
+                     utils.FILE_STATISTICS:         self.file_statistics,
+                     utils.ANALYSIS_STATE:          [self.analyzed_length, self.analyzed_line_count, self.prefix_hash_value, self.content_length],
+                     utils.SENTENCE_CONFIGURATION:  {k:v for k,v in self.sentence_configuration.items()},
                      utils.TOKEN_DISTRIBUTION:      self.token_distribution_map,
                      utils.LEMMA_DISTRIBUTION:      self.lemma_distribution_map,
                      utils.GPOS_DISTRIBUTION:       self.gpos_distribution_map,
@@ -335,19 +919,224 @@ class CoNLLMetaData:
                      utils.RELATION_DISTRIBUTION:   self.relation_distribution_map }
         with utfOpen(meta_file, mode='w', encoding='UTF-8') as fp:
             json.dump(json_data, fp)
+    
+    def __pack_distribution(self, distribution_map=None, keys=None):
+        """ *Packs a distribution map as the element count, the string table 
+        length, the frequencies as fixed width integers and finally the new 
+        line separated UTF-8 string table. The elements are packed in the 
+        order of the given keys (the vocabulary).*
+        """
+        stringTable = u'\n'.join(keys).encode('UTF-8')
+        return struct.pack('<QQ', len(keys), len(stringTable)) + struct.pack('<{}Q'.format(len(keys)), *[distribution_map.get(k) for k in keys]) + stringTable
+    
+    def __unpack_distribution(self, memory_map=None, offset=0):
+        """ *Unpacks a distribution map packed by **__pack_distribution**.*
+        """
+        count, length = struct.unpack_from('<QQ', memory_map, offset)
+        if not count:
+            return {}, []
+        frequencies = struct.unpack_from('<{}Q'.format(count), memory_map, offset+16)
+        offset += 16 + 8*count
+        keys = memory_map[offset:offset+length].decode('UTF-8').split(u'\n')
+        return dict(zip(keys, frequencies)), keys
+    
+    def __decode_distribution(self, key=None):
+        """ *Decodes the distribution map and the vocabulary of an annotation 
+        from the mapped binary metadata file.*
+        """
+        distribution_map, vocabulary = self.__unpack_distribution(memory_map=self.memory_map, offset=self.mapped_distributions.get(key))
+        if key == utils.MORPH:
+            # morphology map is stored flattened to class<TAB>value ----------
+            vocabulary = [e.replace(u'\t', u'=', 1) for e in vocabulary]
+            morphology_map = {}
+            for k, f in distribution_map.items():
+                c, v = k.split(u'\t')
+                morphology_map[c] = morphology_map.get(c, {})
+                morphology_map[c][v] = f
+            distribution_map = morphology_map
+        self.__dict__[DISTRIBUTION_MAPS[VOCABULARY_KEYS.index(key)]] = distribution_map
+        self.vocabularies[key] = vocabulary
+        del self.mapped_distributions[key]
+    
+    def __release_memory_map(self):
+        """ *Closes the mapped binary metadata file, if any. The distribution 
+        maps not decoded yet are dropped as well.*
+        """
+        if self.memory_map != None:
+            self.memory_map.close()
+        self.memory_map = None
+        self.mapped_distributions = {}
+    
+    def __write_binary_metadata(self, meta_file=None):
+        """ *Writes the metadata in the compact binary format. The sentence 
+        configurations are stored as fixed width arrays (line numbers, offsets 
+        and pointers to the packed token tables) and the distribution maps as 
+        frequency arrays followed by string tables.*
+        
+        :param str meta_file: The metafile path to save the data.
+        :return: Nothing
+        :raise metadataValueError: If the sentence IDs are not consecutive.
+        """
+        lines, offsets, lengths, tokPointers, tidPointers = [], [], [], [0], [0]
+        tokenCounts = self.get_sentence_lengths()
+        tokTypes = bytearray()
+        tidTable = []
+        tidLength = 0
+        for sid in range(1, self.get_sentence_count()+1):
+            if sid not in self.sentence_configuration:
+                raise exp.metadataValueError('Sentence configuration missing for the ID: {}'.format(sid))
+            initLine, position, length, config = self.sentence_configuration.get(sid)
+            lines.append(initLine)
+            offsets.append(position)
+            lengths.append(length)
+            tokTypes.extend([t for tid, t in config])
+            tids = u' '.join([tid for tid, t in config]).encode('UTF-8')
+            tidTable.append(tids)
+            tidLength += len(tids)
+            tokPointers.append(len(tokTypes))
+            tidPointers.append(tidLength)
+        # morphology map is flattened to class<TAB>value ----------------------
+        morphology_map = {}
+        for c, vmap in self.morphology_distribution_map.items():
+            for v, f in vmap.items():
+                morphology_map[c + u'\t' + v] = f
+        vocabularies = [self.get_vocabulary(key=k) for k in VOCABULARY_KEYS]
+        vocabularies[4] = [e.replace(u'=', u'\t', 1) for e in vocabularies[4]]
+        sections = [struct.pack('<{}Q'.format(len(lines)), *lines),
+                    struct.pack('<{}Q'.format(len(offsets)), *offsets),
+                    struct.pack('<{}Q'.format(len(tokPointers)), *tokPointers),
+                    struct.pack('<{}Q'.format(len(tidPointers)), *tidPointers),
+                    str(tokTypes),
+                    ''.join(tidTable),
+                    struct.pack('<{}Q'.format(len(lengths)), *lengths)]
+        sections.extend([self.__pack_distribution(distribution_map=m, keys=v) for m, v in zip([self.token_distribution_map, 
+                                                                                                self.lemma_distribution_map, 
+                                                                                                self.gpos_distribution_map, 
+                                                                                                self.pos_distribution_map, 
+                                                                                                morphology_map, 
+                                                                                                self.relation_distribution_map], vocabularies)])
+        sections.append(struct.pack('<{}I'.format(len(tokenCounts)), *tokenCounts))
+        # section positions (8 byte aligned) ----------------------------------
+        sectionTable = []
+        position = struct.calcsize(BINARY_HEADER)
+        for e in sections:
+            sectionTable.extend([position, len(e)])
+            position += len(e) + (-len(e) % 8)
+        fileSize, fileTime = self.file_statistics if self.file_statistics != None else [0, 0.0]
+        # written aside and renamed, the loaded metadata may map the old file -
+        with open(meta_file + '.tmp', 'wb') as fp:
+            fp.write(struct.pack(BINARY_HEADER, utils.META_MAGIC, utils.META_VERSION, 
+                                 str(self.file_hash_value or ''), fileSize, fileTime, 
+                                 len(lines), self.analyzed_length, self.analyzed_line_count, 
+                                 utils.NULL if self.content_length == None else self.content_length, 
+                                 str(self.prefix_hash_value or ''), *sectionTable))
+            for e in sections:
+                fp.write(e)
+                fp.write('\0' * (-len(e) % 8))
+        os.rename(meta_file + '.tmp', meta_file)
+    
+    def __read_binary_metadata(self, meta_file=None):
+        """ *Maps a binary metadata file into memory. Only the header is 
+        decoded, the sentence configurations are read lazily through a 
+        mappedSentenceConfiguration object and the distribution maps (with 
+        the vocabularies) on first access. The mapping is owned by the object 
+        from now on, it is closed by a new analysis or by **close**.*
+        
+        :param str meta_file: The metafile path.
+        :return: The metadata keyed by the metadata data structure keys, the distribution maps are None.
+        :rtype: dict
+        :raise metadataValueError: If the format version is not supported.
+        """
+        with open(meta_file, 'rb') as fp:
+            memory_map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from('<8sI', memory_map, 0)
+        if version != utils.META_VERSION:
+            memory_map.close()
+            raise exp.metadataValueError('Unsupported metadata format version.\nFound: {}'.format(version))
+        header = struct.unpack_from(BINARY_HEADER, memory_map, 0)
+        hashValue, fileSize, fileTime, sentenceCount, analyzedLength, analyzedLineCount, contentLength, prefixHashValue = header[2:10]
+        sections = [(header[i], header[i+1]) for i in range(10, len(header), 2)]
+        self.__release_memory_map()
+        self.memory_map = memory_map
+        self.mapped_distributions = {k:sections[DISTRIBUTION_SECTION+i][0] for i, k in enumerate(VOCABULARY_KEYS)}
+        return {utils.FILE_HASH_VALUE:         hashValue.rstrip('\0'),
+                utils.FILE_STATISTICS:         [fileSize, fileTime],
+                utils.ANALYSIS_STATE:          [analyzedLength, analyzedLineCount, prefixHashValue.rstrip('\0'), None if contentLength == utils.NULL else contentLength],
+                utils.SENTENCE_CONFIGURATION:  mappedSentenceConfiguration(memory_map, sentenceCount, sections),
+                utils.TOKEN_DISTRIBUTION:      None,
+                utils.LEMMA_DISTRIBUTION:      None,
+                utils.GPOS_DISTRIBUTION:       None,
+                utils.POS_DISTRIBUTION:        None,
+                utils.MORPHOLOGY_DISTRIBUTION: None,
+                utils.RELATION_DISTRIBUTION:   None }
+    
+    def __read_json_metadata(self, meta_file=None):
+        """ *Loads a JSON metadata file.*
+        
+        :param str meta_file: The metafile path.
+        :return: The metadata keyed by the metadata data structure keys.
+        :rtype: dict
+        :raise TypeError: If loaded data is not a dict.
+        """
+        # now load the file
+        fp = utfOpen(meta_file, mode='r', encoding='UTF-8')
+        # loading metadata
+        json_data = json.load(fp)
+        # we are done with file
+        fp.close()
+        # check if invalid data type is loaded
+        if not isinstance(json_data, dict):
+            raise TypeError('JSON data must be a dict.\nFound: <{}>'.format(type(json_data)))
+        # JSON object keys are always strings ---------------------------------
+        json_data = {int(k):v for k,v in json_data.items() if utils.is_integer(test_val=k)}
+        if isinstance(json_data.get(utils.SENTENCE_CONFIGURATION), dict):
+            json_data[utils.SENTENCE_CONFIGURATION] = {int(k):v for k,v in json_data.get(utils.SENTENCE_CONFIGURATION).items()}
+        return json_data
+        
+    def __verify_prefix(self, input_file=None, prefix_length=0, prefix_hash=None):
+        """ *Checks the hash value of the first bytes of the input file. The 
+        hash object is kept, so a resumed analysis can continue hashing from 
+        the end of the prefix instead of reading it again.*
         
-    def load_metadate(self, meta_file=None, current_hash=-1):
-        """ *Load meta data to class variables from the provided file.*
+        :param str input_file: The input file.
+        :param int prefix_length: The number of bytes to be hashed.
+        :param str prefix_hash: The expected hash value.
+        :return: True if the hash values match.
+        :rtype: bool
+        """
+        hasher = utils.update_hash(hasher=hashlib.sha1(), source_file=input_file, end_offset=prefix_length)
+        if hasher.hexdigest() != prefix_hash:
+            return False
+        self.prefix_hasher = [hasher, prefix_length]
+        return True
+    
+    def load_metadate(self, meta_file=None, current_hash=-1, input_file=None):
+        """ *Load meta data to class variables from the provided file. The 
+        format of the file (binary or JSON) is detected automatically.*
         
         :param str meta_file: The metafile path.
         :param str current_hash: Hash value to be compared for consistency.
+        :param str input_file: The input file to be checked for consistency instead of the hash value (see Note).
         :return: Nothing
         :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
         :raise ValueError: By `unicode file access <https://docs.python.org/2/library/codecs.html#codecs.open>`_.
         :raise zeroLengthValueError: If metafile is empty.
         :raise TypeError: If loaded data is not a dict.
+        :raise metadataValueError: If the binary format version is not supported.
         :raise notAllKeyError: If loaded data does not contain all the JSON data keys.
         :raise unequalValueError: If current hash does not match the saved hash value.
+        
+        .. Note::
+            If the input file is provided, the saved size and modification 
+            time are compared with the current ones first. Only if they differ 
+            (or the modification time is too close to the saving time of the 
+            metadata, see RACY_INTERVAL) the hash value of the analyzed prefix of the input file is generated 
+            and compared, so a file that has only grown is accepted as well. 
+            In that case (as well as for an interrupted analysis) the metadata 
+            is not complete and the analysis should be resumed. A file shorter 
+            than the prefix or with another prefix is rejected without being 
+            hashed again, the whole file is only hashed for metadata saved 
+            without a prefix hash value.
         """
         try:
             utils.doesTheFileExist(file_path=meta_file)
@@ -356,31 +1145,76 @@ class CoNLLMetaData:
                 raise exp.zeroLengthValueError('The metafile is empty.')
         except:
             raise IOError('Metadata file does not exist.')
-        # now load the file
-        fp = utfOpen(meta_file, mode='r', encoding='UTF-8')
-        # loading metadata
-        json_data = json.load(fp)
-        # we are done with file
-        fp.close()
-        # check if invalid data type is loaded
-        if not isinstance(json_data, dict):
-            raise TypeError('JSON data must be a dict.\nFound: <{}>'.format(type(json_data)))
+        # detect the format and load the file ---------------------------------
+        with open(meta_file, 'rb') as fp:
+            magic = fp.read(len(utils.META_MAGIC))
+        if magic == utils.META_MAGIC:
+            meta_data = self.__read_binary_metadata(meta_file=meta_file)
+        else:
+            meta_data = self.__read_json_metadata(meta_file=meta_file)
+        vocabularies = meta_data.pop(utils.VOCABULARIES, {})
         # check if all the keys are present
-        elif set(json_data.keys()) != set(range(utils.FILE_HASH_VALUE, utils.RELATION_DISTRIBUTION+1)):
-            raise exp.notAllKeyError('Not all the JSON data keys are present.')
+        if set(meta_data.keys()) != set(range(utils.FILE_HASH_VALUE, utils.ANALYSIS_STATE+1)):
+            raise exp.notAllKeyError('Not all the metadata keys are present.')
+        analyzedLength, analyzedLineCount, prefixHashValue, contentLength = meta_data.get(utils.ANALYSIS_STATE)
+        # check if the input file is unchanged by its size and modification 
+        # time, only grown by its prefix hash value or else (metadata without
+        # a prefix hash value) by the hash value ------------------------------
+        statisticsRefreshed = False
+        if input_file != None:
+            currentStatistics = utils.get_file_statistics(source_file=input_file)
+            compressedInput = utils.is_compressed(source_file=input_file)
+            # a modification time close to the save time of the metadata may
+            # hide a same size change (timestamp granularity) ----------------
+            racyStatistics = currentStatistics[1] >= os.stat(meta_file).st_mtime - utils.RACY_INTERVAL
+            if meta_data.get(utils.FILE_STATISTICS) == currentStatistics and not racyStatistics:
+                current_hash = meta_data.get(utils.FILE_HASH_VALUE)
+            elif prefixHashValue:
+                # a file shorter than the analyzed prefix or with another 
+                # prefix has changed, hashing it again cannot match ----------
+                if not compressedInput and analyzedLength > currentStatistics[0]:
+                    raise exp.unequalValueError('The input file is shorter than its analyzed prefix.')
+                elif not self.__verify_prefix(input_file, analyzedLength, prefixHashValue):
+                    raise exp.unequalValueError('The analyzed prefix of the input file does not match the metafile data.')
+                # the content length of a compressed file is only known after 
+                # decompressing it, hence the analysis is always resumed ------
+                contentLength = None if compressedInput else currentStatistics[0]
+                if contentLength == None or analyzedLength < contentLength:
+                    meta_data[utils.FILE_HASH_VALUE] = None # ----------------- to be generated by the resumed analysis
+                current_hash = meta_data.get(utils.FILE_HASH_VALUE)
+                meta_data[utils.FILE_STATISTICS] = currentStatistics
+                statisticsRefreshed = True
+            else: # ----------------------------------------------------------- metadata saved without a prefix hash value
+                current_hash = utils.generate_hash(source_file=input_file)
+                meta_data[utils.FILE_STATISTICS] = currentStatistics
+                statisticsRefreshed = True
         # check if the hash value from the meta file matches the recalculated
         # hash value indicating changes in the original file ------------------
-        elif json_data.get(utils.FILE_HASH_VALUE) != current_hash:
+        if meta_data.get(utils.FILE_HASH_VALUE) != current_hash:
             raise exp.unequalValueError('The current hash of the input file does not match the metafile data.')
         else:
-            self.file_hash_value = json_data.get(utils.FILE_HASH_VALUE)
-            self.sentence_configuration = json_data.get(utils.SENTENCE_CONFIGURATION)
-            self.token_distribution_map = json_data.get(utils.TOKEN_DISTRIBUTION)
-            self.lemma_distribution_map = json_data.get(utils.LEMMA_DISTRIBUTION)
-            self.gpos_distribution_map = json_data.get(utils.GPOS_DISTRIBUTION)
-            self.pos_distribution_map = json_data.get(utils.POS_DISTRIBUTION)
-            self.morphology_distribution_map = json_data.get(utils.MORPHOLOGY_DISTRIBUTION)
-            self.relation_distribution_map = json_data.get(utils.RELATION_DISTRIBUTION)
+            self.file_hash_value = meta_data.get(utils.FILE_HASH_VALUE)
+            self.file_statistics = meta_data.get(utils.FILE_STATISTICS)
+            self.statistics_refreshed = statisticsRefreshed
+            self.analyzed_length = analyzedLength
+            self.analyzed_line_count = analyzedLineCount
+            self.prefix_hash_value = prefixHashValue
+            self.content_length = contentLength
+            self.sentence_configuration = meta_data.get(utils.SENTENCE_CONFIGURATION)
+            self.token_distribution_map = meta_data.get(utils.TOKEN_DISTRIBUTION)
+            self.lemma_distribution_map = meta_data.get(utils.LEMMA_DISTRIBUTION)
+            self.gpos_distribution_map = meta_data.get(utils.GPOS_DISTRIBUTION)
+            self.pos_distribution_map = meta_data.get(utils.POS_DISTRIBUTION)
+            self.morphology_distribution_map = meta_data.get(utils.MORPHOLOGY_DISTRIBUTION)
+            self.relation_distribution_map = meta_data.get(utils.RELATION_DISTRIBUTION)
+            self.vocabularies = vocabularies
+            self.vocabulary_indexes = {}
+            self.sentence_lengths = None
+            if magic == utils.META_MAGIC:
+                for name in DISTRIBUTION_MAPS: # ------------------------------ decoded on first access (see __getattr__)
+                    del self.__dict__[name]
+            else:
+                self.__release_memory_map()
         return
         
     def update_morphology_map(self, morph_string=None):
@@ -398,97 +1232,414 @@ class CoNLLMetaData:
             self.morphology_distribution_map[g[0]] = self.morphology_distribution_map.get(g[0], {})
             self.morphology_distribution_map[g[0]][g[1]] = self.morphology_distribution_map[g[0]].get(g[1], 0) + 1
     
-    def __read_line(self, file_pointer=None):
-        if file_pointer == None:
-            raise ValueError('File pointer object cannot be "None"')
-        char_buffer = []
-        init_pos = file_pointer.tell()
-        cur_pos = None
-        while True:
-            old_pos = cur_pos
-            char = file_pointer.read(1)
-            cur_pos = file_pointer.tell()
-            if old_pos == cur_pos:
-                file_pointer.close()
-                return init_pos, None, ''.join(char_buffer)
-            if char == '\n':
-                break
-            else:
-                char_buffer.append(char)
-        return init_pos, file_pointer, ''.join(char_buffer)
+    def __analyze_sentence(self, sentence_number=None, sentence_lines=[]):
+        """ *Analyze the buffered token definitions of one sentence and update
+        the sentence configuration and the distribution maps.*
+        
+        :param int sentence_number: The sentence to be updated.
+        :param list sentence_lines: The stripped token definition lines.
+        :return: Nothing.
+        :raise ValueError: If invalid, non integer token ID is found.
+        :raise TypeError: If invalidtoken type is found.
+        """
+        initLine = self.sentence_configuration[sentence_number][0]
+        tokenConfig = self.sentence_configuration[sentence_number][-1]
+        for i in range(len(sentence_lines)): # -------------------------------- cycle through the sentence buffer
+            tokDef = sentence_lines[i]
+            try: # ------------------------------------------------------------ detect the token type
+                tokType = self.detect_token_type(tok=tokDef)
+            except:
+                raise TypeError('Failed detecting token type found [line: {}]'.format(initLine+i))
+            # lets deal with a valid token ------------------------------------
+            if tokType == utils.BASIC_TEN_SLOT_TYPE: # ------------------------ actions to be taken if a basic 10 slot line is found
+                tid, sur, lem, gpos, pos, morph, head, rel, idc0, idc1 = [le.strip() for le in tokDef.split()]
+                # check if token ID (tid) is valid ----------------------------
+                if not utils.is_integer(test_val=tid):
+                    raise ValueError('Invalid token id found [line: {}]'.format(initLine+i))
+                self.token_distribution_map[sur.lower()] = self.token_distribution_map.get(sur.lower(), 0) + 1
+                self.lemma_distribution_map[lem.lower()] = self.lemma_distribution_map.get(lem.lower(), 0) + 1
+                self.gpos_distribution_map[gpos.lower()] = self.gpos_distribution_map.get(gpos.lower(), 0) + 1
+                self.pos_distribution_map[pos.lower()] = self.pos_distribution_map.get(pos.lower(), 0) + 1
+                self.update_morphology_map(morph_string=morph)
+                self.relation_distribution_map[rel.lower()] = self.relation_distribution_map.get(rel.lower(), 0) + 1
+                tokenConfig.append([tid, tokType])
+            elif tokType == utils.COMPOUND_DEFINITION:
+                tokenConfig.append([tokDef.split()[0], tokType])
             
-    def analyze(self, in_file=None):
-        """ *Load and analyze the input file to generate metadata and update 
-        class level variables.*
+    def __find_sentence_boundary(self, in_file=None, offset=0):
+        """ *Finds the first sentence boundary at or after the given byte 
+        offset i.e. the byte offset right after the next empty line.*
         
-        :param str in_file: The CoNLL format file to be analyzed.
+        :param str in_file: The CoNLL format file.
+        :param int offset: The byte offset to start searching from.
+        :return: The byte offset of the line following the empty line or the file size.
+        :rtype: int
+        """
+        with utils.open_binary(source_file=in_file) as fp:
+            fp.seek(offset)
+            if offset > 0:
+                fp.readline() # ----------------------------------------------- align to the start of a line
+            while True:
+                line = fp.readline()
+                if not len(line) or not len(line.strip()):
+                    return fp.tell()
+    
+    def __split_file(self, in_file=None, chunk_count=1, start_offset=0, end_offset=None):
+        """ *Splits the file (or the given byte range of the file) into byte 
+        ranges that are aligned on sentence boundaries.*
+        
+        :param str in_file: The CoNLL format file.
+        :param int chunk_count: The number of chunks wanted.
+        :param int start_offset: The start of the range, must be a sentence boundary.
+        :param int end_offset: The end of the range (None for the end of file).
+        :return: The list of (start, end) byte offsets, possibly fewer than wanted.
+        :rtype: list[tuple(int, int)]
+        """
+        if end_offset == None:
+            end_offset = os.stat(in_file).st_size
+        boundaries = [start_offset]
+        for i in range(1, chunk_count):
+            boundary = self.__find_sentence_boundary(in_file=in_file, offset=start_offset+(end_offset-start_offset)*i//chunk_count)
+            if end_offset > boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        if end_offset > boundaries[-1]:
+            boundaries.append(end_offset)
+        return zip(boundaries[:-1], boundaries[1:])
+    
+    def __merge_metadata(self, line_base=0, sentence_configuration=None, distribution_maps=None):
+        """ *Merges the partial metadata of a chunk analyzed by a worker process 
+        into the class variables. The chunks must be merged in file order.*
+        
+        :param int line_base: The number of lines before the chunk.
+        :param dict sentence_configuration: The sentence configuration of the chunk (local numbering).
+        :param list distribution_maps: The distribution maps of the chunk.
         :return: Nothing.
-        :raise IOError: If hash value generation for the input file fails.
-        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
-        :raise ValueError: By `unicode file access <https://docs.python.org/2/library/codecs.html#codecs.open>`_.
+        """
+        sentenceBase = len(self.sentence_configuration)
+        for sid, (initLine, position, length, config) in sentence_configuration.items():
+            self.sentence_configuration[sentenceBase+sid] = [line_base+initLine, position, length, config]
+        for target, source in zip([self.token_distribution_map, 
+                                   self.lemma_distribution_map, 
+                                   self.gpos_distribution_map, 
+                                   self.pos_distribution_map, 
+                                   self.relation_distribution_map], distribution_maps[:-1]):
+            for k, v in source.items():
+                target[k] = target.get(k, 0) + v
+        for c, vmap in distribution_maps[-1].items():
+            self.morphology_distribution_map[c] = self.morphology_distribution_map.get(c, {})
+            for k, v in vmap.items():
+                self.morphology_distribution_map[c][k] = self.morphology_distribution_map[c].get(k, 0) + v
+    
+    def analyze_range(self, in_file=None, start_offset=0, end_offset=None, line_base=0, hasher=None, checkpoint=None):
+        """ *Analyze the given byte range of the input file and update the class 
+        level variables. Line numbers are counted from *line_base* and the new 
+        sentences are numbered after the ones already in the sentence 
+        configuration.*
+        
+        :param str in_file: The CoNLL format file to be analyzed.
+        :param int start_offset: The byte offset of the range, must be the start of a line.
+        :param int end_offset: The end of the range (None for the end of file).
+        :param int line_base: The number of lines before the range.
+        :param hasher: The hash object to be updated with the bytes of the range *e.g.* hashlib.sha1().
+        :param checkpoint: Called with the byte offset, the line count and the prefix hash value (if hasher is provided) of a sentence boundary (see Note).
+        :return: The line count at the end of the range, the byte offset of the last sentence boundary and the end of the scanned range.
+        :rtype: tuple(int, int, int)
+        :raise UnicodeDecodeError: If a line is not valid UTF-8.
         :raise ValueError: If invalid, non integer token ID is found.
         :raise TypeError: If invalidtoken type is found.
+        
+        .. Note::
+            A sentence boundary is the byte offset right after an empty line. 
+            Everything before it is fully analyzed, hence it is a valid point 
+            to resume the analysis from.
+        
+        .. Note::
+            A checkpoint saves all the metadata analyzed so far, hence the 
+            interval between two checkpoints grows with the offset of the 
+            last one: it is at least CHECKPOINT_SIZE bytes and at least that 
+            offset. The checkpoint offsets double at least, so the bytes 
+            written by all the checkpoints stay linear in the file size.
+        
+        .. Note::
+            The hash object is updated block by block while the range is being 
+            scanned, hence the file is read only once for both the analysis 
+            and the hash value.
         """
-        # generate hash value -------------------------------------------------
-        self.file_hash_value = utils.generate_hash(in_file)
-        # open file for processing --------------------------------------------
-        fp = utfOpen(in_file, mode='r', encoding='UTF-8')
         # initiate local variables --------------------------------------------
-        offsetValue = None
-        lineCounter = 0
-        sentenceCounter = 0
+        lineCounter = line_base
+        sentenceCounter = len(self.sentence_configuration)
         sentenceBuffer = []
-        # process the file line by line ---------------------------------------
-        while fp != None:
-            offsetValue, fp, line = self.__read_line(fp) # read a lines -------    
-            lineCounter += 1 # increment line counter -------------------------
-            if not len(line.strip()): # --------------------------------------- either a sentence boundery or just an empty line
-                if not len(sentenceBuffer) and fp != None: # --------------------------------- just an empty line before any sentence is buffered
-                    offsetValue = fp.tell()
-                    continue # let's go back to work --------------------------
-                while len(sentenceBuffer): # ---------------------------------- cycle through the sentence buffer
-                    tokDef = sentenceBuffer.pop(0)
-                    try: # ---------------------------------------------------- detect the token type
-                        tokType = self.detect_token_type(tok=tokDef)
-                    except:
-                        raise TypeError('Failed detecting token type found [line: {}]'.format(lineCounter-len(sentenceBuffer)+1))
-                    # lets deal with a valid token ----------------------------
-                    if tokType == utils.BASIC_TEN_SLOT_TYPE: # ------------ actions to be taken if a basic 10 slot line is found
-                        tid, sur, lem, gpos, pos, morph, head, rel, idc0, idc1 = [le.strip() for le in tokDef.strip().split()]
-                        # check if token ID (tid) is valid --------------------
-                        if not utils.is_integer(test_val=tid):
-                            raise ValueError('Invalid token id found [line: {}]'.format(lineCounter-len(sentenceBuffer)+1))
-                        self.token_distribution_map[sur.lower()] = self.token_distribution_map.get(sur.lower(), 0) + 1
-                        self.lemma_distribution_map[lem.lower()] = self.lemma_distribution_map.get(lem.lower(), 0) + 1
-                        self.gpos_distribution_map[gpos.lower()] = self.gpos_distribution_map.get(gpos.lower(), 0) + 1
-                        self.pos_distribution_map[pos.lower()] = self.pos_distribution_map.get(pos.lower(), 0) + 1
-                        self.update_morphology_map(morph_string=morph)
-                        self.relation_distribution_map[rel.lower()] = self.relation_distribution_map.get(rel.lower(), 0) + 1
-                        self.sentence_configuration[sentenceCounter][-1].append([tid, tokType])
-                    elif tokType == utils.COMPOUND_DEFINITION:
-                        self.sentence_configuration[sentenceCounter][-1].append([tid, tokType])
-                sentenceBuffer = [] #------------------------------------------ reset the sentence buffer
-            else:
+        boundaryOffset = start_offset
+        checkpointOffset = start_offset
+        blockEnd = start_offset
+        # process the file block by block and line by line --------------------
+        for blockOffset, block in utils.read_blocks(source_file=in_file, start_offset=start_offset, end_offset=end_offset):
+            blockHasher = None
+            if hasher != None:
+                if checkpoint != None:
+                    blockHasher = hasher.copy() # ----------------------------- hash state at the start of the block
+                hasher.update(block)
+            blockEnd = blockOffset + len(block)
+            offsetValue = blockOffset
+            lines = block.split('\n')
+            if block.endswith('\n'):
+                lines.pop()
+            for line in lines:
+                lineOffset = offsetValue
+                offsetValue += len(line) + 1
+                lineCounter += 1 # increment line counter ---------------------
+                stripped = line.strip()
+                if not len(stripped): # --------------------------------------- either a sentence boundery or just an empty line
+                    if len(sentenceBuffer):
+                        sentenceConfig = self.sentence_configuration[sentenceCounter]
+                        sentenceConfig[2] = sentenceEnd - sentenceConfig[1] #-- byte length without the empty line
+                        self.__analyze_sentence(sentence_number=sentenceCounter, sentence_lines=sentenceBuffer)
+                        sentenceBuffer = [] #---------------------------------- reset the sentence buffer
+                    if offsetValue <= blockEnd: # ----------------------------- only a terminated empty line is a boundary
+                        boundaryOffset = offsetValue
+                        if checkpoint != None and boundaryOffset - checkpointOffset >= max(utils.CHECKPOINT_SIZE, checkpointOffset):
+                            prefixHashValue = None
+                            if blockHasher != None:
+                                prefixHasher = blockHasher.copy()
+                                prefixHasher.update(block[:boundaryOffset-blockOffset])
+                                prefixHashValue = prefixHasher.hexdigest()
+                            checkpoint(boundaryOffset, lineCounter, prefixHashValue)
+                            checkpointOffset = boundaryOffset
+                    continue
                 # just found the first token of the first sentence or any other sentence on that matter
-                if not sentenceCounter or not len(sentenceBuffer):
+                if not len(sentenceBuffer):
                     sentenceCounter += 1
                     # initiate sentence configuration for the new sentence
-                    # each sentence configuration is comprised of two elements
-                    # an integer for the starting line number
-                    # followed by a list of token types expected
-                    self.sentence_configuration[sentenceCounter] = [lineCounter, offsetValue, []]
-                sentenceBuffer.append(line.strip())
+                    # each sentence configuration is comprised of four elements
+                    # an integer for the starting line number, the byte offset of
+                    # the starting line, the byte length of the sentence (set
+                    # once the sentence ends) followed by a list of token types 
+                    # expected
+                    self.sentence_configuration[sentenceCounter] = [lineCounter, lineOffset, 0, []]
+                sentenceBuffer.append(stripped.decode('UTF-8'))
+                sentenceEnd = min(offsetValue, blockEnd)
+        # the file may not end with an empty line -----------------------------
+        if len(sentenceBuffer):
+            sentenceConfig = self.sentence_configuration[sentenceCounter]
+            sentenceConfig[2] = sentenceEnd - sentenceConfig[1]
+            self.__analyze_sentence(sentence_number=sentenceCounter, sentence_lines=sentenceBuffer)
+        return lineCounter, boundaryOffset, blockEnd
+    
+    def __save_checkpoint(self, checkpoint_file=None, offset=0, line_count=0, prefix_hash=None):
+        """ *Saves the metadata analyzed so far as a resumable checkpoint.*
+        
+        :param str checkpoint_file: The metafile path to save the checkpoint.
+        :param int offset: The byte offset of the sentence boundary.
+        :param int line_count: The number of lines before the sentence boundary.
+        :param str prefix_hash: The hash value of the bytes before the sentence boundary.
+        :return: Nothing.
+        """
+        fileHashValue = self.file_hash_value
+        self.file_hash_value = None
+        self.analyzed_length = offset
+        self.analyzed_line_count = line_count
+        self.prefix_hash_value = prefix_hash
+        try:
+            self.save_metadata(meta_file=checkpoint_file)
+        except Exception as e:
+            print >> sys.stderr, 'WARNING: Metadata checkpoint not saved.'
+            print >> sys.stderr, e
+        self.file_hash_value = fileHashValue
+            
+    def analyze(self, in_file=None, processes=1, resume=False, checkpoint_file=None):
+        """ *Load and analyze the input file to generate metadata and update 
+        class level variables.*
+        
+        :param str in_file: The CoNLL format file to be analyzed.
+        :param int processes: The number of worker processes (None for all the cores).
+        :param bool resume: Whether to resume the analysis after the analyzed length (see Note).
+        :param str checkpoint_file: The metafile path to save checkpoints to (None for no checkpoint).
+        :return: Nothing.
+        :raise IOError: If hash value generation for the input file fails.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        :raise UnicodeDecodeError: If a line is not valid UTF-8.
+        :raise ValueError: If invalid, non integer token ID is found.
+        :raise TypeError: If invalidtoken type is found.
+        :raise smallerValueError: If the number of processes is smaller than 1.
+        
+        .. Note::
+            The file is scanned with the block based line reader of the 
+            utility module, hence the offsets stored in the sentence 
+            configuration are the byte offsets of the first line of each 
+            sentence.
+        
+        .. Note::
+            With more than one process the file is split into byte ranges 
+            aligned on empty lines (sentence boundaries) that are analyzed by 
+            a process pool. The partial results are merged in file order, 
+            hence the metadata is identical to the one of a serial analysis.
+        
+        .. Note::
+            When resuming, the loaded metadata must cover exactly the first 
+            *analyzed_length* bytes of the file (see **load_metadate**). The 
+            new sentences and counts are added to it. A serial analysis saves 
+            checkpoints at geometrically growing intervals of at least 
+            CHECKPOINT_SIZE bytes (see **analyze_range**), so an interrupted 
+            analysis can be resumed as well.
+        
+        .. Note::
+            The hash value of the input file is generated while scanning it, 
+            continuing the hash of the verified prefix when resuming. A serial 
+            analysis of a new file hence reads the file exactly once. With a 
+            process pool the parent process hashes the file while the workers 
+            analyze it.
+        
+        .. Note::
+            A gzip or xz compressed file is analyzed serially on its 
+            decompressed content, all the offsets and the hash value refer to 
+            that content. Decompressing builds the restart index of the file 
+            (see **libcompressed**), its member or stream boundaries are saved 
+            next to the metadata file. The index is shared with the readers of the 
+            same process.
+        """
+        if processes == None:
+            processes = multiprocessing.cpu_count()
+        elif processes < 1:
+            raise exp.smallerValueError('Number of processes cannot be smaller than 1.\nFound: {}'.format(processes))
+        if resume:
+            # keep the metadata of the analyzed prefix, decoded from the 
+            # mapped metadata file before it is closed ------------------------
+            self.sentence_configuration = {k:v for k,v in self.sentence_configuration.items()}
+            for key in self.mapped_distributions.keys():
+                self.__decode_distribution(key=key)
+        self.__release_memory_map()
+        # the vocabularies and lengths are generated again from the new data -
+        self.vocabularies = {}
+        self.vocabulary_indexes = {}
+        self.sentence_lengths = None
+        if not resume:
+            # reset metadata --------------------------------------------------
+            self.analyzed_length = 0
+            self.analyzed_line_count = 0
+            self.sentence_configuration = {}
+            self.token_distribution_map = {}
+            self.lemma_distribution_map = {}
+            self.gpos_distribution_map = {}
+            self.pos_distribution_map = {}
+            self.morphology_distribution_map = {}
+            self.relation_distribution_map = {}
+        # generate file statistics and continue the hash of the prefix --------
+        self.file_statistics = utils.get_file_statistics(source_file=in_file)
+        if utils.is_compressed(source_file=in_file):
+            # the content length is known once the file is decompressed -------
+            processes = 1
+            self.content_length = None
+        else:
+            self.content_length = self.file_statistics[0]
+        startOffset, endOffset = self.analyzed_length, self.content_length
+        if self.prefix_hasher != None and self.prefix_hasher[1] == startOffset:
+            hasher = self.prefix_hasher[0]
+        else:
+            hasher = utils.update_hash(hasher=hashlib.sha1(), source_file=in_file, end_offset=startOffset)
+        self.prefix_hasher = None
+        # split the file ------------------------------------------------------
+        chunks = self.__split_file(in_file=in_file, chunk_count=processes, start_offset=startOffset, end_offset=endOffset) if processes > 1 else []
+        if len(chunks) < 2:
+            checkpoint = None
+            if checkpoint_file != None:
+                checkpoint = lambda offset, line_count, prefix_hash: self.__save_checkpoint(checkpoint_file, offset, line_count, prefix_hash)
+            lineCount, boundaryOffset, endOffset = self.analyze_range(in_file=in_file, start_offset=startOffset, end_offset=endOffset, 
+                                                                      line_base=self.analyzed_line_count, hasher=hasher, checkpoint=checkpoint)
+        else:
+            # analyze the chunks in parallel while hashing the range and merge 
+            # them in file order ----------------------------------------------
+            pool = multiprocessing.Pool(processes=min(processes, len(chunks)))
+            try:
+                asyncResults = pool.map_async(analyze_chunk, [(self.__copy_empty(), in_file, start, end) for start, end in chunks])
+                pool.close()
+                utils.update_hash(hasher=hasher, source_file=in_file, start_offset=startOffset, end_offset=endOffset)
+                results = asyncResults.get()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+            lineCount = self.analyzed_line_count
+            for chunkLineCount, boundaryOffset, chunkEnd, sentence_configuration, distribution_maps in results:
+                self.__merge_metadata(line_base=lineCount, sentence_configuration=sentence_configuration, distribution_maps=distribution_maps)
+                lineCount += chunkLineCount
+        self.file_hash_value = hasher.hexdigest()
+        # analysis state ... resumable only if it ends on a sentence boundary -
+        self.content_length = endOffset
+        self.analyzed_length = endOffset
+        self.analyzed_line_count = lineCount
+        self.prefix_hash_value = self.file_hash_value if boundaryOffset == endOffset else ''
+        self.vocabularies = {} #----------------------------------------------- may be generated by a checkpoint
+        self.vocabulary_indexes = {}
+        self.sentence_lengths = None
+    
+    def __copy_empty(self):
+        """ *Returns a shallow copy of the object with empty metadata, to be sent 
+        to a worker process.*
+        """
+        metadata = copy.copy(self)
+        metadata.prefix_hasher = None
+        metadata.memory_map = None
+        metadata.mapped_distributions = {}
+        metadata.sentence_configuration = {}
+        metadata.token_distribution_map = {}
+        metadata.lemma_distribution_map = {}
+        metadata.gpos_distribution_map = {}
+        metadata.pos_distribution_map = {}
+        metadata.morphology_distribution_map = {}
+        metadata.relation_distribution_map = {}
+        metadata.vocabularies = {}
+        metadata.vocabulary_indexes = {}
+        metadata.sentence_lengths = None
+        return metadata
 # CLASS:: END =================================================================
 
 
+def analyze_chunk(arguments=None): # - DEF::START -----------------------------
+    """ Worker method for the parallel analysis. Analyzes one byte range of a 
+    CoNLL format file with the (pickled, empty) metadata object and returns 
+    the partial metadata to be merged.
+    
+    :param tuple arguments: The metadata object, the input file, the start and the end byte offset.
+    :return: The number of lines, the last sentence boundary, the end of the range, the sentence configuration and the distribution maps of the range.
+    :rtype: tuple(int, int, int, dict, list[dict])
+    """
+    metadata, in_file, start_offset, end_offset = arguments
+    lineCount, boundaryOffset, endOffset = metadata.analyze_range(in_file=in_file, start_offset=start_offset, end_offset=end_offset)
+    return lineCount, boundaryOffset, endOffset, metadata.sentence_configuration, [metadata.token_distribution_map, 
+                                                        metadata.lemma_distribution_map, 
+                                                        metadata.gpos_distribution_map, 
+                                                        metadata.pos_distribution_map, 
+                                                        metadata.relation_distribution_map, 
+                                                        metadata.morphology_distribution_map]
+# ----------------------------------------------------------------- DEF:: END -
+
 # CLASS:: a class of sudo stream of CoNLL format sentences --------------------
 # =============================================================================
 class annotatedCoNLLToken(base.annotatedString):
-            
-    def __init__(self, token=None, token_def=utils.CONLL_TOKEN_DEFINITION):
-        if token == None:
-            raise exp.noneValueError('Token cannot be "None"')
-        elif not isinstance(token, list):
+    """ *The compact token of a CoNLL format line. Only the raw strings of the 
+    annotations in use are kept (as a tuple), the values are lowercased or 
+    converted to integers (token ID and head) when they are requested.*
+    
+    :param list token: The token definition split into its fields.
+    :param list token_def: The annotation key of each field (NOT_IN_USE for the ignored ones).
+    :return: Nothing.
+    :raise noneValueError: If the token or the token definition is None.
+    :raise TypeError: If the token or the token definition is not a list.
+    :raise unequalValueError: If the token and the definition sizes differ.
+    
+    .. Note::
+        The annotation key to field position map is shared by all the tokens 
+        of the same definition, hence a token costs one slotted object and 
+        one tuple. The annotation_map of the former implementation is still 
+        available as a (computed) property.
+    """
+    __slots__ = ('values', 'key_index', 'updated_values')
+    
+    def __init__(self, token=None, token_def=utils.CONLL_TOKEN_DEFINITION):
+        if token == None:
+            raise exp.noneValueError('Token cannot be "None"')
+        elif not isinstance(token, list):
             raise TypeError('Token must be a list.\nFound: {}'.format(type(token)))
         elif token_def == None:
             raise exp.noneValueError('Token Definition cannot be "None"')
@@ -496,28 +1647,366 @@ class annotatedCoNLLToken(base.annotatedString):
             raise TypeError('Token Definition must be a list.\nFound: {}'.format(type(token_def)))
         elif len(token) != len(token_def):
             raise exp.unequalValueError('Token list size doesnot match the definition list size.\n{}(Token):{}(Definition)'.format(len(token), len(token_def)))
-        else:
-            self.annotation_map = {token_def[i]:int(token[i]) if token_def[i] in [utils.TID, utils.RELATION_HEAD] else token[i].lower() for i in range(len(token)) if token_def[i] != utils.NOT_IN_USE}
+        positions, self.key_index = get_token_key_index(token_def=token_def)
+        self.values = tuple(token[:len(positions)]) if positions[-1] == len(positions) - 1 else tuple([token[i] for i in positions])
+        self.updated_values = None
+    
+    def __getstate__(self):
+        return self.values, self.key_index, self.updated_values
+    
+    def __setstate__(self, state):
+        self.values, self.key_index, self.updated_values = state
+    
+    @property
+    def annotation_map(self):
+        return {k:self.getValue(k) for k in self.key_index}
     
     def getAnnotationKeyList(self):
-        return self.annotation_map.keys()
+        return self.key_index.keys()
     
     def setValue(self, annotation_key=None, value=None):
         if annotation_key == None:
             raise exp.noneValueError('Annotation Key cannot be "None"')
-        elif annotation_key not in self.getAnnotationKeyList():
+        elif annotation_key not in self.key_index:
             raise KeyError('Invalid key passed.\nFound: {}'.format(annotation_key))
         elif value == None:
             raise exp.noneValueError('Annotation value cannot be "None"')
-        self.annotation_map[annotation_key] = value
+        if self.updated_values == None:
+            self.updated_values = {}
+        self.updated_values[annotation_key] = value
     
     def getValue(self, annotation_key=None):
         if annotation_key == None:
             raise exp.noneValueError('Annotation Key cannot be "None"')
-        elif annotation_key not in self.getAnnotationKeyList():
+        elif self.updated_values != None and annotation_key in self.updated_values:
+            return self.updated_values[annotation_key]
+        try:
+            value = self.values[self.key_index[annotation_key]]
+        except (KeyError, TypeError):
             raise KeyError('Invalid key passed.\nFound: {}'.format(annotation_key))
-        return self.annotation_map.get(annotation_key)
+        if annotation_key == utils.TID or annotation_key == utils.RELATION_HEAD:
+            return int(value)
+        return value.lower()
+# CLASS:: END =================================================================
+
+TOKEN_KEY_INDEX = {}
+""" Field positions and annotation key to position maps of the token 
+definitions in use, shared by all the tokens
+"""
+
+def get_token_key_index(token_def=utils.CONLL_TOKEN_DEFINITION): # - DEF::START
+    """ Method to get the positions of the fields in use of a token definition 
+    (*token_def*) and the map of each annotation key to its position in the 
+    compact value tuple of a token. The result is computed once per token 
+    definition.
+    
+    :param list token_def: The annotation key of each field.
+    :return: The field positions in use and the annotation key to value position map.
+    :rtype: tuple(list[int], dict(int, int))
+    :raise zeroLengthValueError: If no field is in use.
+    """
+    key = tuple(token_def)
+    if key not in TOKEN_KEY_INDEX:
+        positions = [i for i in range(len(token_def)) if token_def[i] != utils.NOT_IN_USE]
+        if not len(positions):
+            raise exp.zeroLengthValueError('Token definition has no field in use.')
+        TOKEN_KEY_INDEX[key] = (positions, {token_def[positions[j]]:j for j in range(len(positions))})
+    return TOKEN_KEY_INDEX[key]
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: a CoNLL format token encoded with vocabulary IDs --------------------
+# =============================================================================
+class encodedCoNLLToken(base.annotatedString):
+    """ *The token of a CoNLL format line with the string annotations replaced 
+    by their integer IDs in the vocabularies of the metadata. The token ID and 
+    the head are integers as well and the morphological features are the 
+    tuple of the IDs of their class=value strings.*
+    
+    :param list token: The token definition split into its fields (basic 10 slot definition).
+    :param dict vocabulary_index: The map of annotation key to map of string to ID (see CoNLLMetaData.get_vocabulary_indexes).
+    :return: Nothing.
+    :raise noneValueError: If the token or the vocabulary index is None.
+    :raise TypeError: If the token is not a list.
+    :raise unequalValueError: If the token size differs from the CoNLL token definition.
+    
+    .. Note::
+        A string missing from the vocabulary is encoded as NULL. The values 
+        are looked up once, when the token is created, hence consumers get 
+        the IDs without any string hashing.
+    """
+    __slots__ = ('values',)
+    
+    def __init__(self, token=None, vocabulary_index=None):
+        if token == None:
+            raise exp.noneValueError('Token cannot be "None"')
+        elif not isinstance(token, list):
+            raise TypeError('Token must be a list.\nFound: {}'.format(type(token)))
+        elif vocabulary_index == None:
+            raise exp.noneValueError('Vocabulary index cannot be "None"')
+        elif len(token) != len(utils.CONLL_TOKEN_DEFINITION):
+            raise exp.unequalValueError('Token list size doesnot match the definition list size.\n{}(Token):{}(Definition)'.format(len(token), len(utils.CONLL_TOKEN_DEFINITION)))
+        tid, sur, lem, gpos, pos, morph, head, rel = token[:8]
+        morphIndex = vocabulary_index[utils.MORPH]
+        self.values = (int(tid), 
+                       vocabulary_index[utils.TOKEN].get(sur.lower(), utils.NULL), 
+                       vocabulary_index[utils.LEMMA].get(lem.lower(), utils.NULL), 
+                       vocabulary_index[utils.GPOS].get(gpos.lower(), utils.NULL), 
+                       vocabulary_index[utils.POS].get(pos.lower(), utils.NULL), 
+                       tuple([morphIndex.get(e, utils.NULL) for e in morph.split('|')]) if morph != '_' else (), 
+                       int(head), 
+                       vocabulary_index[utils.RELATION].get(rel.lower(), utils.NULL))
+    
+    def __getstate__(self):
+        return self.values
+    
+    def __setstate__(self, state):
+        self.values = state
+    
+    @property
+    def annotation_map(self):
+        return {k:self.getValue(k) for k in ENCODED_KEY_INDEX}
+    
+    def getAnnotationKeyList(self):
+        return ENCODED_KEY_INDEX.keys()
+    
+    def setValue(self, annotation_key=None, value=None):
+        if annotation_key == None:
+            raise exp.noneValueError('Annotation Key cannot be "None"')
+        elif annotation_key not in ENCODED_KEY_INDEX:
+            raise KeyError('Invalid key passed.\nFound: {}'.format(annotation_key))
+        elif value == None:
+            raise exp.noneValueError('Annotation value cannot be "None"')
+        values = list(self.values)
+        values[ENCODED_KEY_INDEX[annotation_key]] = value
+        self.values = tuple(values)
+    
+    def getValue(self, annotation_key=None):
+        if annotation_key == None:
+            raise exp.noneValueError('Annotation Key cannot be "None"')
+        try:
+            return self.values[ENCODED_KEY_INDEX[annotation_key]]
+        except (KeyError, TypeError):
+            raise KeyError('Invalid key passed.\nFound: {}'.format(annotation_key))
+# CLASS:: END =================================================================
+
+ENCODED_KEY_INDEX = get_token_key_index(token_def=utils.CONLL_TOKEN_DEFINITION)[1]
+""" Annotation key to value position map of the encoded tokens
+"""
         
+def iterate_length_buckets(file_reader=None, bucket_width=utils.BUCKET_WIDTH, batch_size=None, shuffle=True, min_length=1, max_length=None, seed=None): # - DEF::START
+    """ Method to iterate over the sentences of a reader (*file_reader*) 
+    grouped by length buckets, shortest bucket first, with the sentences 
+    shuffled inside each bucket (see CoNLLMetaData.get_length_buckets).
+    
+    :param base.fileReader file_reader: The reader (CoNLLFileReader or CoNLLCorpusReader).
+    :param int bucket_width: The number of lengths of a bucket.
+    :param int batch_size: The number of pairs of a batch (None to yield the pairs one by one).
+    :param bool shuffle: Whether the sentences of a bucket are shuffled.
+    :param int min_length: The minimum number of tokens.
+    :param int max_length: The maximum number of tokens, longer sentences are left out (None for no limit).
+    :param int seed: The seed of the shuffling (None for a random one).
+    :return: Pairs of sentence ID and sentence, or lists of them (a batch never spans two buckets).
+    :rtype: generator
+    :raise smallerValueError: If the batch size is smaller than 1.
+    """
+    if batch_size != None and batch_size < 1:
+        raise exp.smallerValueError('Batch size cannot be smaller than 1.\nFound: {}'.format(batch_size))
+    randomizer = random.Random(seed)
+    for lower, ids in file_reader.metadata.get_length_buckets(bucket_width=bucket_width, min_length=min_length, max_length=max_length):
+        if shuffle:
+            randomizer.shuffle(ids)
+        readSize = batch_size or utils.ITERATION_BATCHSIZE
+        for start in range(0, len(ids), readSize):
+            batch = zip(ids[start:start+readSize], file_reader.read_sentences(sentence_ids=ids[start:start+readSize]))
+            if batch_size != None:
+                yield batch
+                continue
+            for item in batch:
+                yield item
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: thread safe positional reads of a file -----------------------------
+# =============================================================================
+class positionalFile:
+    """ *The read only access to byte ranges of a (decompressed) input file 
+    that can be shared by concurrent threads. No file position is shared, 
+    each read gives its own offset.*
+    
+    :param str source_file: The full path of the file.
+    :param int max_handles: The maximum number of file objects open at once (without os.pread).
+    :return: Nothing.
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+    
+    .. Note::
+        A plain file is read with os.pread on a single descriptor where it is 
+        available (Python 3). Otherwise a read borrows a file object (see 
+        **open_binary**) from a pool of up to max_handles of them for its 
+        seek and read, so that many reads run at once on Python 2 as well. 
+        The file objects of a compressed file share its restart index. They 
+        are not tied to the threads, hence a thread pool with turnover opens 
+        no more of them.
+    """
+    def __init__(self, source_file=None, max_handles=utils.FILE_HANDLE_LIMIT):
+        if max_handles == None or max_handles < 1:
+            raise exp.smallerValueError('Number of file handles cannot be smaller than 1.\nFound: {}'.format(max_handles))
+        self.source_file = source_file
+        self.descriptor = None
+        compressedInput = utils.is_compressed(source_file=source_file)
+        if hasattr(os, 'pread') and not compressedInput:
+            self.descriptor = os.open(source_file, os.O_RDONLY)
+        self.max_handles = max_handles
+        self.free_handles = [] #----------------------------------------------- file objects not in use (without os.pread)
+        self.handle_count = 0 #------------------------------------------------ file objects open, in use or not
+        self.condition = threading.Condition()
+        self.closed = False
+    
+    def __acquire_handle(self):
+        """ *Returns a free file object, a new one if the pool is not full, or 
+        waits for one to be released.*
+        """
+        with self.condition:
+            while not self.closed and not len(self.free_handles) and self.handle_count >= self.max_handles:
+                self.condition.wait()
+            if self.closed:
+                raise ValueError('I/O operation on closed file.')
+            elif len(self.free_handles):
+                return self.free_handles.pop()
+            self.handle_count += 1
+        try:
+            return utils.open_binary(source_file=self.source_file)
+        except:
+            with self.condition:
+                self.handle_count -= 1
+                self.condition.notify()
+            raise
+    
+    def __release_handle(self, fp=None):
+        with self.condition:
+            if self.closed:
+                fp.close()
+                return
+            self.free_handles.append(fp)
+            self.condition.notify()
+    
+    def read(self, offset=0, length=0):
+        """ *Reads up to length bytes starting at the given offset (fewer only 
+        at the end of the file).*
+        
+        :param int offset: The offset of the first byte.
+        :param int length: The number of bytes.
+        :return: The bytes read.
+        :rtype: str
+        :raise ValueError: If the file is closed.
+        """
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        if self.descriptor != None:
+            data = os.pread(self.descriptor, length, offset)
+            while len(data) < length: # ---------------------------------------- short read, continue until the end of file
+                chunk = os.pread(self.descriptor, length - len(data), offset + len(data))
+                if not len(chunk):
+                    break
+                data += chunk
+            return data
+        fp = self.__acquire_handle()
+        try:
+            fp.seek(offset)
+            return fp.read(length)
+        finally:
+            self.__release_handle(fp)
+    
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            if self.descriptor != None:
+                os.close(self.descriptor)
+            for fp in self.free_handles: # ------------------------------------- the ones in use are closed when released
+                fp.close()
+            self.free_handles = []
+            self.condition.notify_all()
+# CLASS:: END =================================================================
+
+# CLASS:: bounded cache of parsed sentences ----------------------------------
+# =============================================================================
+class sentenceCache:
+    """ *The least recently used (LRU) cache of parsed sentences keyed by the 
+    sentence ID, bounded by the number of sentences and/or by the total byte 
+    length of the cached sentences in the input file.*
+    
+    :param int max_sentences: The maximum number of cached sentences (None for no limit).
+    :param int max_bytes: The maximum total byte length of the cached sentences (None for no limit).
+    :return: Nothing.
+    :raise smallerValueError: If a limit is smaller than 1.
+    
+    .. Note::
+        The byte limit is measured on the sentences as stored in the input 
+        file, the parsed tokens take several times that amount of memory. A 
+        sentence larger than the byte limit is never cached.
+    
+    .. Note::
+        The cache is guarded by a lock, hence it can be shared by threads.
+    """
+    def __init__(self, max_sentences=None, max_bytes=None):
+        for limit in [max_sentences, max_bytes]:
+            if limit != None and limit < 1:
+                raise exp.smallerValueError('Cache limit cannot be smaller than 1.\nFound: {}'.format(limit))
+        self.max_sentences = max_sentences
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() #----------------------------------------- sentence ID to (tokens, byte length), least recently used first
+        self.byte_count = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def get(self, sentence_id=None):
+        """ *Returns the cached tokens of the sentence (None if not cached) and 
+        marks the sentence as the most recently used.*
+        """
+        with self.lock:
+            entry = self.entries.pop(sentence_id, None)
+            if entry == None:
+                self.miss_count += 1
+                return None
+            self.entries[sentence_id] = entry
+            self.hit_count += 1
+            return entry[0]
+    
+    def put(self, sentence_id=None, tokens=None, byte_length=0):
+        """ *Caches the tokens of the sentence and evicts the least recently 
+        used sentences until the limits are respected.*
+        """
+        if self.max_bytes != None and byte_length > self.max_bytes:
+            return
+        with self.lock:
+            entry = self.entries.pop(sentence_id, None)
+            if entry != None:
+                self.byte_count -= entry[1]
+            self.entries[sentence_id] = (tokens, byte_length)
+            self.byte_count += byte_length
+            while (self.max_sentences != None and len(self.entries) > self.max_sentences) or (self.max_bytes != None and self.byte_count > self.max_bytes):
+                sid, (t, length) = self.entries.popitem(last=False)
+                self.byte_count -= length
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.byte_count = 0
+    
+    def get_hit_count(self):
+        return self.hit_count
+    
+    def get_miss_count(self):
+        return self.miss_count
+    
+    def get_byte_count(self):
+        return self.byte_count
+# CLASS:: END =================================================================
+
 # CLASS:: a class of sudo stream of CoNLL format sentences --------------------
 # =============================================================================
 class CoNLLFileReader(base.fileReader):
@@ -527,14 +2016,56 @@ class CoNLLFileReader(base.fileReader):
         
     :param str input_file: The input file in CoNLL format
     :param str meta_file: The metadata file associated with the input_file
+    :param bool save_meta: Whether newly analyzed metadata shall be saved.
+    :param int processes: The number of processes used for the analysis (None for all the cores).
+    :param CoNLLMetaData metadata: Already loaded metadata of the input_file (optional).
+    :param int cache_sentences: The number of parsed sentences kept in a LRU cache (None for no limit).
+    :param int cache_bytes: The total byte length of the parsed sentences kept in a LRU cache (None for no limit).
+    :param int prefetch: The number of sentences read ahead by a background thread while iterating (None for no prefetching).
+    :param bool encoded: Whether the tokens are encoded with the vocabulary IDs of the metadata (encodedCoNLLToken).
+    :param bool sentence_index: Whether the metadata loads or builds its sentence index (see CoNLLMetaData.find_sentences).
     :return: Nothing.
     :raise metadataValueError: If the metadata object failed to initialize.
+    
+    .. Note::
+        The sentence cache is only used if at least one of its limits is 
+        given. Each returned sentence is a new list, hence callers may modify 
+        it, but the token objects are shared with the cache.
+    
+    .. Note::
+        The reader is iterable over (sentence ID, sentence) pairs in file 
+        order. The iteration does not change the current sentence, hence the 
+        navigation methods can be used while iterating.
+    
+    .. Note::
+        **get_sentence**, **read_sentences** and the iteration keep no state 
+        in the reader and use positional reads (see positionalFile), hence 
+        one reader can serve concurrent threads (e.g. a thread pool of 
+        sentence lookups). The navigation methods (current sentence) are 
+        meant for a single thread.
     """
-    def __init__(self, input_file=None, meta_file=None):
+    def __init__(self, input_file=None, meta_file=None, save_meta=True, processes=1, metadata=None, cache_sentences=None, cache_bytes=None, prefetch=None, encoded=False, sentence_index=False):
+        base.fileReader.__init__(self)
         # load metadta ---------------------------------------------------------
-        self.metadata = CoNLLMetaData(input_file=input_file, meta_file=meta_file, save_meta=False)
-        # load file pointer of the input file ---------------------------------
-        self.file_pointer = utfOpen(input_file, mode='r', encoding='UTF-8')
+        if metadata == None:
+            self.metadata = CoNLLMetaData(input_file=input_file, meta_file=meta_file, save_meta=save_meta, processes=processes, sentence_index=sentence_index)
+        elif not isinstance(metadata, CoNLLMetaData):
+            raise TypeError('Metadata must be a CoNLLMetaData object.\nFound: <{}>'.format(type(metadata)))
+        else:
+            self.metadata = metadata
+        # positional reads of the input file (decompressed if needed) --------
+        self.input_file = input_file
+        self.positional_file = positionalFile(source_file=input_file)
+        # optional cache of the parsed sentences ------------------------------
+        self.sentence_cache = None
+        if cache_sentences != None or cache_bytes != None:
+            self.sentence_cache = sentenceCache(max_sentences=cache_sentences, max_bytes=cache_bytes)
+        # read ahead while iterating ------------------------------------------
+        if prefetch != None and prefetch < 1:
+            raise exp.smallerValueError('Prefetch size cannot be smaller than 1.\nFound: {}'.format(prefetch))
+        self.prefetch = prefetch
+        # vocabulary IDs of the encoded tokens --------------------------------
+        self.vocabulary_index = self.metadata.get_vocabulary_indexes() if encoded else None
     
     def get_key_elements(self, key=None):
         if key == None:
@@ -555,6 +2086,17 @@ class CoNLLFileReader(base.fileReader):
             return self.metadata.get_relation_list()
         else:
             raise KeyError('Unidentified key detected.\nFound: {}'.format(key))
+    
+    def get_vocabulary(self, key=None):
+        """ *Returns the frequency ordered vocabulary of an annotation, the 
+        position of a string is the ID used by the encoded tokens.*
+        
+        :param int key: The annotation key.
+        :return: The vocabulary.
+        :rtype: list[str]
+        :raise KeyError: If the annotation has no vocabulary.
+        """
+        return self.metadata.get_vocabulary(key=key)
         
     def __read_sentence(self):
         """ *Reads the sentence referenced by the index number found in the 
@@ -562,43 +2104,231 @@ class CoNLLFileReader(base.fileReader):
         
         :return: Nothing.
         :raise KeyError: If the sentence ID is unknown.
+        :raise IOError: If the input file is shorter than the sentence configuration.
+        """
+        self.sentence_buffer = self.get_sentence(sentence_id=self.current_sentence)
+    
+    def get_sentence(self, sentence_id=None):
+        """ *Reads a sentence by its ID without using or changing the current 
+        sentence, hence it can be called by concurrent threads.*
+        
+        :param int sentence_id: The ID of the sentence.
+        :return: The parsed sentence.
+        :rtype: list[annotatedCoNLLToken]
+        :raise noneValueError: If the sentence ID is None.
+        :raise KeyError: If the sentence ID is unknown.
+        :raise IOError: If the input file is shorter than the sentence configuration.
+        
+        .. Note::
+            The sentence is fetched with a single positional read of its 
+            exact byte range (offset and length from the metadata) and only 
+            those bytes are decoded. A cached sentence is neither read nor 
+            parsed again.
         """
+        if sentence_id == None:
+            raise exp.noneValueError('Sentence ID cannot be "None"')
+        if self.sentence_cache != None:
+            tokens = self.sentence_cache.get(sentence_id)
+            if tokens != None:
+                return list(tokens)
         try:        
-            initLine, position, config = self.metadata.get_sentence_configuration(sentence_number=self.current_sentence)
-        except KeyError:
-            raise KeyError('Failed to load sentence configuration for the ID: {}.'.format(self.current_sentence))
-        self.file_pointer.seek(position)
-        sentenceBuffer = []
-        lineOffset = 0
-        for line in self.file_pointer:
-            # either a sentence boundery or just an empty line ----------------
-            if not len(line.strip()):
-                # just an empty line before any sentence is buffered ----------
-                if not len(sentenceBuffer):
-                    try:
-                        raise exp.emptyLineWarning('Unexpected empty line found in line: {}'.format(initLine+lineOffset))
-                    except exp.emptyLineWarning as w:
-                        print >> sys.stderr, w
-                    lineOffset += 1
-                    continue # this is a precaution but should not happend ----
-                for i in range(len(sentenceBuffer)):#-------------------------------  cycle through the sentence buffer
-                    if config[i][-1] == utils.BASIC_TEN_SLOT_TYPE:
-                        self.sentence_buffer.append(annotatedCoNLLToken(token=[e.strip() for e in sentenceBuffer[i].strip().split()]))
-                return
-            else:
-                sentenceBuffer.append(line.strip())
-                lineOffset += 1
+            initLine, position, length, config = self.metadata.get_sentence_configuration(sentence_number=sentence_id)
+        except (KeyError, TypeError):
+            raise KeyError('Failed to load sentence configuration for the ID: {}.'.format(sentence_id))
+        data = self.positional_file.read(position, length)
+        if len(data) != length:
+            raise IOError('Failed to read the sentence ID: {} [line: {}].'.format(sentence_id, initLine))
+        tokens = self.__parse_sentence(data=data, config=config)
+        if self.sentence_cache != None:
+            self.sentence_cache.put(sentence_id, list(tokens), length)
+        return tokens
+    
+    def __parse_sentence(self, data=None, config=None):
+        """ *Decodes the raw bytes of one sentence and parses its token 
+        definitions following the sentence configuration.*
+        
+        :param str data: The raw bytes of the sentence.
+        :param list config: The token IDs and types of the sentence.
+        :return: The parsed tokens.
+        :rtype: list[annotatedCoNLLToken] or list[encodedCoNLLToken]
+        """
+        sentenceLines = data.decode('UTF-8').split(u'\n')
+        if self.vocabulary_index != None:
+            return [encodedCoNLLToken(token=sentenceLines[i].split(), vocabulary_index=self.vocabulary_index) for i in range(len(config)) if config[i][-1] == utils.BASIC_TEN_SLOT_TYPE]
+        return [annotatedCoNLLToken(token=sentenceLines[i].split()) for i in range(len(config)) if config[i][-1] == utils.BASIC_TEN_SLOT_TYPE]
+    
+    def read_sentences(self, sentence_ids=None):
+        """ *Reads a batch of sentences without changing the current sentence. 
+        The sentences are read in file order and the byte ranges of sentences 
+        close to each other are merged, so a batch is fetched with a few large 
+        reads instead of one seek and read per sentence.*
+        
+        :param list sentence_ids: The IDs of the sentences (in any order, may repeat).
+        :return: The parsed sentences in the order of the given IDs.
+        :rtype: list[list[annotatedCoNLLToken]]
+        :raise noneValueError: If the sentence ID list is None.
+        :raise KeyError: If a sentence ID is unknown.
+        :raise IOError: If the input file is shorter than the sentence configuration.
+        
+        .. Note::
+            Two sentences are read at once if at most READ_MERGE_GAP bytes 
+            separate them and the read does not exceed READ_BLOCKSIZE bytes. 
+            Cached sentences are not read again and the read ones are cached.
+        """
+        if sentence_ids == None:
+            raise exp.noneValueError('Sentence ID list cannot be "None"')
+        return self.__read_batch(sentence_ids=sentence_ids, sentence_cache=self.sentence_cache)
+    
+    def __read_batch(self, sentence_ids=None, sentence_cache=None):
+        """ *Reads a batch of sentences with positional reads (see 
+        **read_sentences**), optionally through the given sentence cache.*
+        """
+        sentences = {}
+        pending = []
+        for sid in set(sentence_ids):
+            tokens = sentence_cache.get(sid) if sentence_cache != None else None
+            if tokens != None:
+                sentences[sid] = tokens
+                continue
+            sentenceConfig = self.metadata.get_sentence_configuration(sentence_number=sid)
+            if sentenceConfig == None:
+                raise KeyError('Failed to load sentence configuration for the ID: {}.'.format(sid))
+            initLine, position, length, config = sentenceConfig
+            pending.append((position, length, sid, config))
+        pending.sort(key=lambda e: e[0])
+        # read the merged byte ranges in file order ---------------------------
+        i = 0
+        while i < len(pending):
+            start = pending[i][0]
+            end = start + pending[i][1]
+            j = i + 1
+            while j < len(pending) and pending[j][0] - end <= utils.READ_MERGE_GAP and pending[j][0] + pending[j][1] - start <= utils.READ_BLOCKSIZE:
+                end = max(end, pending[j][0] + pending[j][1])
+                j += 1
+            data = self.positional_file.read(start, end - start)
+            if len(data) != end - start:
+                raise IOError('Failed to read the sentences from byte {} to {}.'.format(start, end))
+            for position, length, sid, config in pending[i:j]:
+                sentences[sid] = self.__parse_sentence(data=data[position-start:position-start+length], config=config)
+                if sentence_cache != None:
+                    sentence_cache.put(sid, list(sentences[sid]), length)
+            i = j
+        return [list(sentences[sid]) for sid in sentence_ids]
+    
+    def __iter__(self):
+        return self.iterate_sentences()
+    
+    def iterate_sentences(self, first_sentence=1, prefetch=None):
+        """ *Generator over the (sentence ID, sentence) pairs in file order, 
+        starting with the given sentence. The sentences are read in batches of 
+        ITERATION_BATCHSIZE (see **read_sentences**) and do not go through the 
+        sentence cache. With prefetching, a background thread reads and 
+        parses the next sentences into a bounded queue while the caller 
+        processes the current one.*
+        
+        :param int first_sentence: The ID of the first sentence.
+        :param int prefetch: The number of sentences read ahead (None for the reader setting).
+        :return: Pairs of sentence ID and sentence.
+        :rtype: generator(tuple(int, list[annotatedCoNLLToken]))
+        :raise smallerValueError: If the prefetch size is smaller than 1.
+        
+        .. Note::
+            Decompression and file reads release the GIL, parsing does not, 
+            hence the prefetching mostly overlaps the I/O with the caller. An 
+            error of the background thread is raised by the generator. 
+            Abandoning the generator stops the thread.
+        """
+        if prefetch == None:
+            prefetch = self.prefetch
+        elif prefetch < 1:
+            raise exp.smallerValueError('Prefetch size cannot be smaller than 1.\nFound: {}'.format(prefetch))
+        if prefetch == None:
+            for batch in self.__iterate_batches(first_sentence=first_sentence):
+                for item in batch:
+                    yield item
+            return
+        queue = Queue(maxsize=prefetch)
+        stop = threading.Event()
+        worker = threading.Thread(target=self.__prefetch_sentences, args=(first_sentence, queue, stop))
+        worker.daemon = True
+        worker.start()
+        try:
+            while True:
+                item = queue.get()
+                if item == None:
+                    return
+                elif item[0] == None: # --------------------------------------- error raised by the background thread
+                    raise item[1][0], item[1][1], item[1][2]
+                yield item
+        finally:
+            stop.set()
+            worker.join()
+    
+    def iterate_buckets(self, bucket_width=utils.BUCKET_WIDTH, batch_size=None, shuffle=True, min_length=1, max_length=None, seed=None):
+        """ *Generator over the sentences grouped by length buckets, shuffled 
+        inside each bucket, so the batches need little padding (see 
+        **iterate_length_buckets**). The current sentence is not changed.*
+        """
+        return iterate_length_buckets(self, bucket_width, batch_size, shuffle, min_length, max_length, seed)
+    
+    def __iterate_batches(self, first_sentence=1):
+        """ *Generator over the consecutive batches of (sentence ID, sentence) 
+        pairs.*
+        """
+        sentenceCount = self.metadata.get_sentence_count()
+        for start in range(first_sentence, sentenceCount+1, utils.ITERATION_BATCHSIZE):
+            ids = range(start, min(start+utils.ITERATION_BATCHSIZE, sentenceCount+1))
+            yield zip(ids, self.__read_batch(sentence_ids=ids))
+    
+    def __prefetch_sentences(self, first_sentence=1, queue=None, stop=None):
+        """ *Background thread of **iterate_sentences**, fills the queue with 
+        (sentence ID, sentence) pairs followed by None, or with (None, error 
+        information) if an error occurred.*
+        """
+        def put(item):
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    pass
+            return False
+        try:
+            for batch in self.__iterate_batches(first_sentence=first_sentence):
+                for item in batch:
+                    if not put(item):
+                        return
+            put(None)
+        except Exception:
+            put((None, sys.exc_info()))
     
     def reset(self):
         self.current_sentence = 1
         self.sentence_buffer = []
     
+    def close(self):
+        """ *Closes the input file, the reader cannot be used afterwards.*
+        """
+        self.positional_file.close()
+    
+    def get_cache_statistics(self):
+        """ *Returns the hit and the miss count of the sentence cache.*
+        
+        :return: The number of cache hits and misses (0, 0 without a cache).
+        :rtype: tuple(int, int)
+        """
+        if self.sentence_cache == None:
+            return 0, 0
+        return self.sentence_cache.get_hit_count(), self.sentence_cache.get_miss_count()
+    
     def set_current_sentence(self, sentence_id=None):
         if sentence_id == None:
             raise exp.noneValueError('Sentence ID cannot be "None"')
         elif not isinstance(sentence_id, int):
             raise TypeError('Sentence ID must be a integer.\nFound: {}'.format(sentence_id))
         elif 1 <= sentence_id <= self.metadata.get_sentence_count():
+            if sentence_id != self.current_sentence:
+                self.sentence_buffer = []
             self.current_sentence = sentence_id
         else:
             raise ValueError('Sentence ID must be between {} and {}.\nFound: {}'.format(1, self.metadata.get_sentence_count(), sentence_id))
@@ -651,3 +2381,508 @@ class CoNLLFileReader(base.fileReader):
         return self.sentence_buffer        
 
 # CLASS:: END =================================================================
+
+def analyze_shard(arguments=None): # - DEF::START -----------------------------
+    """ Worker method for the parallel analysis of the shards of a corpus. The 
+    metadata of one shard is analyzed (or loaded) and saved to its cache file, 
+    to be loaded by the parent process.
+    
+    :param tuple arguments: The input file and the metadata file or directory.
+    :return: The input file.
+    :rtype: str
+    """
+    input_file, meta_file = arguments
+    CoNLLMetaData(input_file=input_file, meta_file=meta_file, save_meta=True)
+    return input_file
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: sentence configuration over the shards of a corpus ------------------
+# =============================================================================
+class shardedSentenceConfiguration:
+    """ *The read only, dict like view of the sentence configurations of all the 
+    shards of a corpus under a single, global sentence ID space. The sentences 
+    of the first shard come first, followed by the ones of the second shard 
+    and so on.*
+    
+    :param list shards: The CoNLLMetaData objects of the shards.
+    :return: Nothing.
+    """
+    def __init__(self, shards=None):
+        if shards == None:
+            raise exp.noneValueError('Shard list cannot be "None"')
+        self.shards = shards
+        self.first_sentence = [] #--------------------------------------------- global ID of the first sentence of each shard
+        self.sentence_count = 0
+        for shard in shards:
+            self.first_sentence.append(self.sentence_count + 1)
+            self.sentence_count += shard.get_sentence_count()
+    
+    def __len__(self):
+        return self.sentence_count
+    
+    def __contains__(self, sentence_number):
+        return isinstance(sentence_number, (int, long)) and 1 <= sentence_number <= self.sentence_count
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __getitem__(self, sentence_number):
+        if sentence_number not in self:
+            raise KeyError(sentence_number)
+        return self.get(sentence_number)
+    
+    def locate(self, sentence_number=None):
+        """ *Returns the shard index and the shard level sentence ID of a global 
+        sentence ID.*
+        
+        :param int sentence_number: The global sentence ID.
+        :return: The shard index and the sentence ID inside the shard.
+        :rtype: tuple(int, int)
+        :raise KeyError: If the sentence ID does not exist.
+        """
+        if sentence_number not in self:
+            raise KeyError('Sentence ID does not exist.\nFound: {}'.format(sentence_number))
+        i = bisect.bisect_right(self.first_sentence, sentence_number) - 1
+        return i, sentence_number - self.first_sentence[i] + 1
+    
+    def get(self, sentence_number=None, default=None):
+        if sentence_number not in self:
+            return default
+        shard, sid = self.locate(sentence_number)
+        return self.shards[shard].get_sentence_configuration(sentence_number=sid)
+    
+    def keys(self):
+        return range(1, self.sentence_count+1)
+    
+    def values(self):
+        return [self.get(k) for k in self.keys()]
+    
+    def items(self):
+        return [(k, self.get(k)) for k in self.keys()]
+# CLASS:: END =================================================================
+
+# CLASS:: metadata of a corpus sharded over multiple CoNLL format files -------
+# =============================================================================
+class CoNLLCorpusMetaData(CoNLLMetaData):
+    """ *The metadata of a corpus made of several CoNLL format files (shards). 
+    Each shard has its own metadata, analyzed and cached independently, and 
+    the distribution maps of the shards are merged into a single vocabulary. 
+    The sentences are accessible through a single, global sentence ID space.*
+        
+    :param list input_files: The input files in CoNLL format, in corpus order.
+    :param str meta_dir: The directory for the metadata files (None for the directory of each input file).
+    :param bool save_meta: Whether newly analyzed metadata shall be saved.
+    :param int processes: The number of shards analyzed in parallel (None for all the cores).
+    :param bool sentence_index: Whether the sentence index of each shard is loaded, or built and saved.
+    :return: Nothing.
+    :raise noneValueError: If the input file list is None.
+    :raise TypeError: If the input file list is not a list.
+    :raise zeroLengthValueError: If the input file list is empty.
+    
+    .. Note::
+        Analysis, loading and saving of the metadata are done per shard by 
+        CoNLLMetaData, hence adding a shard to the corpus analyzes only the 
+        new shard. Shards in different directories sharing the same file 
+        name must not share a metadata directory.
+    
+    .. Note::
+        The hash value of the corpus is the hash value of the hash values of 
+        the shards and the lengths are the sums of the ones of the shards. 
+        The methods that read or write a single metadata file (analysis, 
+        loading, saving and the sentence index files) are not supported for 
+        a corpus and raise implimentationError, they are available on the 
+        metadata of each shard (shards).
+    """
+    def __init__(self, input_files=None, meta_dir=None, save_meta=True, processes=None, sentence_index=False): # DEF:: START --------
+        # check input file list -----------------------------------------------
+        if input_files == None:
+            raise exp.noneValueError('Input file list cannot be "None"')
+        elif not isinstance(input_files, list):
+            raise TypeError('Input file list must be a list.\nFound: <{}>'.format(type(input_files)))
+        elif not len(input_files):
+            raise exp.zeroLengthValueError('Input file list cannot be empty.')
+        if processes == None:
+            processes = multiprocessing.cpu_count()
+        # analyze the shards in parallel, the results are saved in the cache --
+        if save_meta and processes > 1 and len(input_files) > 1:
+            pool = multiprocessing.Pool(processes=min(processes, len(input_files)))
+            try:
+                pool.map(analyze_shard, [(f, meta_dir) for f in input_files])
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+        # load the metadata of the shards -------------------------------------
+        self.shards = [CoNLLMetaData(input_file=f, meta_file=meta_dir, save_meta=save_meta, sentence_index=sentence_index) for f in input_files]
+        # class variables -----------------------------------------------------
+        self.input_files = input_files
+        self.file_location = None
+        self.file_name = None
+        self.file_extension = None
+        self.file_hash_value = utils.get_corpus_fingerprint(metadata=self)
+        self.file_statistics = None
+        self.statistics_refreshed = False
+        self.analyzed_length = sum([m.analyzed_length for m in self.shards])
+        self.analyzed_line_count = sum([m.analyzed_line_count for m in self.shards])
+        self.content_length = None if any([m.content_length == None for m in self.shards]) else sum([m.content_length for m in self.shards])
+        self.prefix_hash_value = None
+        self.prefix_hasher = None
+        self.sentence_index = None #------------------------------------------- kept by the shards
+        self.sentence_configuration = shardedSentenceConfiguration(self.shards)
+        self.token_distribution_map = {}
+        self.lemma_distribution_map = {}
+        self.gpos_distribution_map = {}
+        self.pos_distribution_map = {}
+        self.morphology_distribution_map = {}
+        self.relation_distribution_map = {}
+        self.memory_map = None
+        self.mapped_distributions = {}
+        self.vocabularies = {}
+        self.vocabulary_indexes = {}
+        self.sentence_lengths = None
+        # merge the distribution maps -----------------------------------------
+        for shard in self.shards:
+            for target, source in [(self.token_distribution_map, shard.token_distribution_map), 
+                                   (self.lemma_distribution_map, shard.lemma_distribution_map), 
+                                   (self.gpos_distribution_map, shard.gpos_distribution_map), 
+                                   (self.pos_distribution_map, shard.pos_distribution_map), 
+                                   (self.relation_distribution_map, shard.relation_distribution_map)]:
+                for k, v in source.items():
+                    target[k] = target.get(k, 0) + v
+            for c, vmap in shard.morphology_distribution_map.items():
+                self.morphology_distribution_map[c] = self.morphology_distribution_map.get(c, {})
+                for k, v in vmap.items():
+                    self.morphology_distribution_map[c][k] = self.morphology_distribution_map[c].get(k, 0) + v
+    
+    def __unsupported(self, method_name=None):
+        raise exp.implimentationError('{} is not supported for a sharded corpus, see the metadata of each shard.'.format(method_name))
+    
+    def is_complete(self):
+        """ *Returns whether the metadata of every shard is complete (see 
+        CoNLLMetaData).*
+        
+        :return: True if no analysis is pending.
+        :rtype: bool
+        """
+        return all([m.is_complete() for m in self.shards])
+    
+    def close(self):
+        """ *Closes the memory mapped files of all the shards.*
+        """
+        for shard in self.shards:
+            shard.close()
+    
+    def save_metadata(self, meta_file=None, meta_format=utils.BINARY_FORMAT):
+        self.__unsupported('Saving the metadata')
+    
+    def load_metadate(self, meta_file=None, current_hash=-1, input_file=None):
+        self.__unsupported('Loading the metadata')
+    
+    def analyze(self, in_file=None, processes=1, resume=False, checkpoint_file=None):
+        self.__unsupported('Analysis')
+    
+    def analyze_range(self, in_file=None, start_offset=0, end_offset=None, line_base=0, hasher=None, checkpoint=None):
+        self.__unsupported('Analysis')
+    
+    def load_sentence_index(self, index_file=None):
+        self.__unsupported('Loading a sentence index file')
+    
+    def build_sentence_index(self, input_file=None, index_file=None):
+        """ *Builds the sentence index of each shard in memory (see 
+        CoNLLMetaData), a shard saves its own index with the sentence_index 
+        option.*
+        
+        :param str input_file: Not used, the shards are read from input_files.
+        :param str index_file: Must be None.
+        :return: Nothing.
+        :raise implimentationError: If an index file is given.
+        """
+        if index_file != None:
+            self.__unsupported('Saving a sentence index file')
+        for shard, shardFile in zip(self.shards, self.input_files):
+            shard.build_sentence_index(input_file=shardFile)
+    
+    def get_shard_count(self):
+        """ *Returns the number of shards in the corpus.*
+        
+        :return: The number of shards.
+        :rtype: int
+        """
+        return len(self.shards)
+    
+    def locate_sentence(self, sentence_number=None):
+        """ *Returns the shard index and the shard level sentence ID of a global 
+        sentence ID.*
+        
+        :param int sentence_number: The global sentence ID.
+        :return: The shard index and the sentence ID inside the shard.
+        :rtype: tuple(int, int)
+        :raise KeyError: If the sentence ID does not exist.
+        """
+        return self.sentence_configuration.locate(sentence_number=sentence_number)
+    
+    def get_sentence_lengths(self):
+        """ *Returns the number of tokens of each sentence of the corpus, in 
+        global sentence ID order (see CoNLLMetaData).*
+        
+        :return: The sentence lengths.
+        :rtype: list[int]
+        """
+        if self.sentence_lengths == None:
+            self.sentence_lengths = []
+            for shard in self.shards:
+                self.sentence_lengths.extend(shard.get_sentence_lengths())
+        return self.sentence_lengths
+    
+    def get_postings(self, key=None, value=None):
+        """ *Returns the sorted global IDs of the sentences containing the given 
+        value of an annotation, from the sentence indexes of the shards (see 
+        CoNLLMetaData).*
+        
+        :param int key: The annotation key (see INDEX_KEYS).
+        :param str value: The (case insensitive) value.
+        :return: The sorted global sentence IDs.
+        :rtype: list[int]
+        :raise initializationError: If the sentence indexes are not available.
+        """
+        postings = []
+        for shard, sentenceBase in zip(self.shards, self.sentence_configuration.first_sentence):
+            postings.extend([sid + sentenceBase - 1 for sid in shard.get_postings(key=key, value=value)])
+        return postings
+# CLASS:: END =================================================================
+
+# CLASS:: a class of sudo stream of sentences over multiple CoNLL files -------
+# =============================================================================
+class CoNLLCorpusReader(base.fileReader):
+    """ *This class when instantiated will provide a reader object that can be 
+    used to access a corpus sharded over multiple CoNLL format text files as 
+    if it was a single file, with the same interface as CoNLLFileReader.*
+        
+    :param list input_files: The input files in CoNLL format, in corpus order.
+    :param str meta_dir: The directory for the metadata files (None for the directory of each input file).
+    :param bool save_meta: Whether newly analyzed metadata shall be saved.
+    :param int processes: The number of shards analyzed in parallel (None for all the cores).
+    :param int cache_sentences: The number of parsed sentences kept in a LRU cache (None for no limit).
+    :param int cache_bytes: The total byte length of the parsed sentences kept in a LRU cache (None for no limit).
+    :param int prefetch: The number of sentences read ahead by a background thread while iterating (None for no prefetching).
+    :param bool encoded: Whether the tokens are encoded with the vocabulary IDs of the corpus metadata (encodedCoNLLToken).
+    :param bool sentence_index: Whether the shard metadata load or build their sentence indexes (see CoNLLMetaData.find_sentences).
+    :return: Nothing.
+    
+    .. Note::
+        The sentence cache is shared by all the shards and keyed by the global 
+        sentence ID (see CoNLLFileReader).
+    
+    .. Note::
+        The reader is iterable over (global sentence ID, sentence) pairs in 
+        corpus order, shard after shard (see CoNLLFileReader).
+    """
+    def __init__(self, input_files=None, meta_dir=None, save_meta=True, processes=None, cache_sentences=None, cache_bytes=None, prefetch=None, encoded=False, sentence_index=False):
+        base.fileReader.__init__(self)
+        # load metadta ---------------------------------------------------------
+        self.metadata = CoNLLCorpusMetaData(input_files=input_files, meta_dir=meta_dir, save_meta=save_meta, processes=processes, sentence_index=sentence_index)
+        # one reader per shard sharing the shard metadata ---------------------
+        self.readers = [CoNLLFileReader(input_file=f, metadata=m, prefetch=prefetch) for f, m in zip(input_files, self.metadata.shards)]
+        if encoded: # --------------------------------------------------------- the IDs of the merged vocabularies
+            vocabularyIndex = self.metadata.get_vocabulary_indexes()
+            for reader in self.readers:
+                reader.vocabulary_index = vocabularyIndex
+        # optional cache of the parsed sentences ------------------------------
+        self.sentence_cache = None
+        if cache_sentences != None or cache_bytes != None:
+            self.sentence_cache = sentenceCache(max_sentences=cache_sentences, max_bytes=cache_bytes)
+    
+    def get_key_elements(self, key=None):
+        if key == None:
+            raise exp.noneValueError('Element key cannot be "None"')
+        elif not isinstance(key, int):
+            raise TypeError('Configuration key must be int.\nFound: {}'.format(type(key)))
+        elif key == utils.TOKEN:
+            return self.metadata.get_token_list()
+        elif key == utils.LEMMA:
+            return self.metadata.get_lemma_list()
+        elif key == utils.GPOS:
+            return self.metadata.get_generic_pos_list()
+        elif key == utils.POS:
+            return self.metadata.get_pos_list()
+        elif key == utils.MORPH:
+            return self.metadata.get_morphological_class_value_map()
+        elif key == utils.RELATION:
+            return self.metadata.get_relation_list()
+        else:
+            raise KeyError('Unidentified key detected.\nFound: {}'.format(key))
+    
+    def get_vocabulary(self, key=None):
+        """ *Returns the frequency ordered vocabulary of an annotation over all 
+        the shards (see CoNLLFileReader).*
+        """
+        return self.metadata.get_vocabulary(key=key)
+    
+    def __read_sentence(self):
+        """ *Reads the sentence referenced by the global index number found in 
+        the class variable current_sentence from its shard and load it in the 
+        sentence buffer.*
+        
+        :return: Nothing.
+        :raise KeyError: If the sentence ID is unknown.
+        """
+        self.sentence_buffer = self.get_sentence(sentence_id=self.current_sentence)
+    
+    def get_sentence(self, sentence_id=None):
+        """ *Reads a sentence by its global ID from its shard without using or 
+        changing the current sentence of the corpus or of the shard, hence it 
+        can be called by concurrent threads (see CoNLLFileReader).*
+        
+        :param int sentence_id: The global ID of the sentence.
+        :return: The parsed sentence.
+        :rtype: list[annotatedCoNLLToken]
+        :raise noneValueError: If the sentence ID is None.
+        :raise KeyError: If the sentence ID is unknown.
+        """
+        if sentence_id == None:
+            raise exp.noneValueError('Sentence ID cannot be "None"')
+        if self.sentence_cache != None:
+            tokens = self.sentence_cache.get(sentence_id)
+            if tokens != None:
+                return list(tokens)
+        shard, sid = self.metadata.locate_sentence(sentence_number=sentence_id)
+        reader = self.readers[shard]
+        tokens = reader.get_sentence(sentence_id=sid)
+        if self.sentence_cache != None:
+            self.sentence_cache.put(sentence_id, list(tokens), reader.metadata.get_sentence_configuration(sentence_number=sid)[2])
+        return tokens
+    
+    def read_sentences(self, sentence_ids=None):
+        """ *Reads a batch of sentences without changing the current sentence. 
+        The global IDs are grouped by shard and each shard reads its part in 
+        file order (see CoNLLFileReader).*
+        
+        :param list sentence_ids: The global IDs of the sentences (in any order, may repeat).
+        :return: The parsed sentences in the order of the given IDs.
+        :rtype: list[list[annotatedCoNLLToken]]
+        :raise noneValueError: If the sentence ID list is None.
+        :raise KeyError: If a sentence ID is unknown.
+        """
+        if sentence_ids == None:
+            raise exp.noneValueError('Sentence ID list cannot be "None"')
+        sentences = {}
+        shardMap = {}
+        for gid in set(sentence_ids):
+            tokens = self.sentence_cache.get(gid) if self.sentence_cache != None else None
+            if tokens != None:
+                sentences[gid] = tokens
+                continue
+            shard, sid = self.metadata.locate_sentence(sentence_number=gid)
+            shardMap[shard] = shardMap.get(shard, [])
+            shardMap[shard].append((gid, sid))
+        for shard, ids in sorted(shardMap.items()):
+            reader = self.readers[shard]
+            for (gid, sid), tokens in zip(ids, reader.read_sentences(sentence_ids=[sid for gid, sid in ids])):
+                sentences[gid] = tokens
+                if self.sentence_cache != None:
+                    self.sentence_cache.put(gid, list(tokens), reader.metadata.get_sentence_configuration(sentence_number=sid)[2])
+        return [list(sentences[gid]) for gid in sentence_ids]
+    
+    def __iter__(self):
+        return self.iterate_sentences()
+    
+    def iterate_sentences(self, first_sentence=1, prefetch=None):
+        """ *Generator over the (global sentence ID, sentence) pairs in corpus 
+        order, starting with the given sentence (see CoNLLFileReader).*
+        
+        :param int first_sentence: The global ID of the first sentence.
+        :param int prefetch: The number of sentences read ahead (None for the reader setting).
+        :return: Pairs of global sentence ID and sentence.
+        :rtype: generator(tuple(int, list[annotatedCoNLLToken]))
+        """
+        if first_sentence > self.metadata.get_sentence_count():
+            return
+        shard, sid = self.metadata.locate_sentence(sentence_number=first_sentence)
+        for i in range(shard, len(self.readers)):
+            sentenceBase = self.metadata.sentence_configuration.first_sentence[i] - 1
+            for lid, sentence in self.readers[i].iterate_sentences(first_sentence=sid if i == shard else 1, prefetch=prefetch):
+                yield sentenceBase + lid, sentence
+    
+    def iterate_buckets(self, bucket_width=utils.BUCKET_WIDTH, batch_size=None, shuffle=True, min_length=1, max_length=None, seed=None):
+        """ *Generator over the sentences of the corpus grouped by length 
+        buckets, shuffled inside each bucket (see **iterate_length_buckets**).*
+        """
+        return iterate_length_buckets(self, bucket_width, batch_size, shuffle, min_length, max_length, seed)
+    
+    def reset(self):
+        self.current_sentence = 1
+        self.sentence_buffer = []
+    
+    def close(self):
+        """ *Closes the input files of all the shards.*
+        """
+        for reader in self.readers:
+            reader.close()
+    
+    def get_cache_statistics(self):
+        """ *Returns the hit and the miss count of the sentence cache.*
+        
+        :return: The number of cache hits and misses (0, 0 without a cache).
+        :rtype: tuple(int, int)
+        """
+        if self.sentence_cache == None:
+            return 0, 0
+        return self.sentence_cache.get_hit_count(), self.sentence_cache.get_miss_count()
+    
+    def set_current_sentence(self, sentence_id=None):
+        if sentence_id == None:
+            raise exp.noneValueError('Sentence ID cannot be "None"')
+        elif not isinstance(sentence_id, int):
+            raise TypeError('Sentence ID must be a integer.\nFound: {}'.format(sentence_id))
+        elif 1 <= sentence_id <= self.metadata.get_sentence_count():
+            if sentence_id != self.current_sentence:
+                self.sentence_buffer = []
+            self.current_sentence = sentence_id
+        else:
+            raise ValueError('Sentence ID must be between {} and {}.\nFound: {}'.format(1, self.metadata.get_sentence_count(), sentence_id))
+    
+    def get_current_sentence(self):
+        """ *Returns the current sentence buffer. However, if the buffer is empty 
+        the sentence will be read from its shard first.*
+        
+        :return: The sentence buffer.
+        :rtype: The sentence buffer data structure (see CoNLLFileReader)
+        :raise KeyError: If the sentence ID is unknown for the read call.
+        """
+        if not len(self.sentence_buffer):
+            self.__read_sentence()
+        return self.sentence_buffer
+    
+    def get_next_sentence(self):
+        """ *Loads the next sentence with respect to the current position
+        specified by **current_sentence**, crossing shard boundaries.*
+        
+        :return: The sentence buffer.
+        :rtype: The sentence buffer data structure.
+        :raise lastElementWarning: If the current sentence is the last sentence of the corpus.
+        """
+        if self.current_sentence == self.metadata.get_sentence_count():
+            raise exp.lastElementWarning('Current sentence is the last sentence.')
+        self.current_sentence += 1
+        self.sentence_buffer = []
+        self.__read_sentence()
+        return self.sentence_buffer
+    
+    def get_previous_sentence(self):
+        """ *Loads the previous sentence with respect to the current position
+        specified by **current_sentence**, crossing shard boundaries.*
+        
+        :return: The sentence buffer.
+        :rtype: The sentence buffer data structure.
+        :raise firstElementWarning: If the current sentence is the first sentence of the corpus.
+        """
+        if self.current_sentence == 1:
+            raise exp.firstElementWarning('Current sentence is the first sentence.')
+        self.current_sentence -= 1
+        self.sentence_buffer = []
+        self.__read_sentence()
+        return self.sentence_buffer
+
+# CLASS:: END =================================================================
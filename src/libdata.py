@@ -32,7 +32,7 @@ from random import randint
 # CLASS ******************************************
 class slidingWindowVectorData:
     
-    def __init__(self, file_reader=None, vector_config=None, window_width=10):
+    def __init__(self, file_reader=None, vector_config=None, window_width=10, sparse=False):
         if file_reader == None:
             raise exp.noneValueError('File reader cannot be "None"')
         elif not isinstance(file_reader, base.fileReader):
@@ -40,7 +40,7 @@ class slidingWindowVectorData:
         else:
             self.input_reader = file_reader
             # initiate a vector reader using the file reader object
-            self.vector_reader = vec.CoNLLFileVector(file_reader)
+            self.vector_reader = vec.CoNLLFileVector(file_reader, sparse=sparse)
             if self.vector_reader == None:
                 raise exp.noneValueError('File vector reader cannot be "None"')
             elif not isinstance(self.vector_reader, base.fileVectorReader):
@@ -60,36 +60,43 @@ class slidingWindowVectorData:
             raise ValueError('Window width cannot be less than {}.\nFound: {}'.format(2, window_width))
         else:
             self.window_width = window_width
-        self.relation_reader = vec.listOneHotVectorReader(element_list=self.input_reader.get_key_elements(key=utils.RELATION))
+        # sparse mode ... data points are (indices, values) pairs, the memory 
+        # scales with the number of tokens, not with the vector dimensions
+        self.sparse = sparse
+        self.input_dimension = None
+        self.output_dimension = None
+        self.relation_reader = vec.listOneHotVectorReader(element_list=self.input_reader.get_key_elements(key=utils.RELATION), vocabulary=self.input_reader.get_vocabulary(key=utils.RELATION))
         self.input_data_matrix = {}
         self.output_data_matrix = {}
         self.__populate_data_metrix()
         
     def __populate_data_metrix(self):
-        self.input_reader.reset()
-        curSentence = self.input_reader.get_current_sentence()
-        while True:
+        for sentID, curSentence in self.input_reader:
             """
-            print '>>SENT[', self.input_reader.get_current_sentence_id(), ']',  len(curSentence)
+            print '>>SENT[', sentID, ']',  len(curSentence)
             print curSentence
             print
             """
             # input data generation
-            sentID = self.input_reader.get_current_sentence_id()
             curSentence.sort(key = lambda x: x.getValue(utils.TID))
             # input generation
-            vectorMap = self.vector_reader.generate_vector(sentID)
+            vectorMap = self.vector_reader.generate_vector(sentID, sentence=curSentence)
             inputVectors = [vectorMap.get(k) for k in sorted(vectorMap.keys())]
             #inputVectors = [self.vector_reader.get_vector(self.input_reader.get_current_sentence_id(), t.getValue(utils.TID)) for t in curSentence]
             for i in range(self.window_width - 1):
                 inputVectors[:0] = [self.vector_reader.get_null_vector()]
                 inputVectors.append(self.vector_reader.get_null_vector())
+            tokenDimension = self.vector_reader.get_vector_dimension()
+            self.input_dimension = tokenDimension * self.window_width
             startIndex = 0
             endIndex = self.window_width
             counter = 0
             while True:
                 #print [inputVectors[i] for i in range(startIndex, endIndex)]
-                dataPoint = npcat([inputVectors[i] for i in range(startIndex, endIndex)])
+                if self.sparse:
+                    dataPoint = vec.concatenate_sparse_vectors([inputVectors[i] for i in range(startIndex, endIndex)], [tokenDimension]*self.window_width)
+                else:
+                    dataPoint = npcat([inputVectors[i] for i in range(startIndex, endIndex)])
                 self.input_data_matrix[(sentID, counter)] = dataPoint
                 if endIndex == len(inputVectors):
                     break
@@ -107,51 +114,58 @@ class slidingWindowVectorData:
             endIndex = self.window_width
             counter = 0
             while True:            
-                dataPoint = []
+                dataPoint = [] # ---------------------------------------------- (slot, relation) of each element, None for padding
                 for e in curSentence[startIndex:endIndex]:
                     if e == utils.NULL:
-                        dataPoint.append([self.relation_reader.get_null_vector()]*(self.window_width+3))
+                        dataPoint.append(None)
                     else:
                         hid = e.getValue(utils.RELATION_HEAD)
-                        rmap = [self.relation_reader.get_null_vector()]*(self.window_width+3)
-                        rel = self.relation_reader.get_vector(key=e.getValue(utils.RELATION))
+                        rel = e.getValue(utils.RELATION)
                         if hid == 0:
-                            rmap[0] = rel
-                            dataPoint.append(rmap)
+                            dataPoint.append((0, rel))
                         else:
                             hIndex = next((j for j, item in enumerate(curSentence) if item != utils.NULL and item.getValue(utils.TID) == hid), -1)
                             if hIndex == -1:
                                 raise KeyError('Invalid token ID found')
                             elif hIndex < startIndex:
-                                rmap[1] = rel
-                                dataPoint.append(rmap)
+                                dataPoint.append((1, rel))
                             elif hIndex >= endIndex:
-                                rmap[2] = rel
-                                dataPoint.append(rmap)
+                                dataPoint.append((2, rel))
                             else:
-                                rmap[3+hIndex-startIndex] = rel
-                                dataPoint.append(rmap)
-                self.output_data_matrix[(sentID, counter)] = npcat([npcat(e) for e in dataPoint])
+                                dataPoint.append((3+hIndex-startIndex, rel))
+                self.output_data_matrix[(sentID, counter)] = self.__encode_relations(dataPoint)
                 if endIndex == len(inputVectors):
                     break
                 else:
                     startIndex += 1
                     endIndex += 1
                     counter += 1
-            curSentence = None
-            try:
-                curSentence = self.input_reader.get_next_sentence()
-            except exp.lastElementWarning:
-                break
+    
+    def __encode_relations(self, relation_slots=None):
+        # each window element has (window width + 3) relation vectors: root,
+        # head before the window, head after the window and each position
+        slotCount = self.window_width + 3
+        nullVector = vec.get_empty_sparse_vector() if self.sparse else self.relation_reader.get_null_vector()
+        relationVectors = []
+        for item in relation_slots:
+            rmap = [nullVector]*slotCount
+            if item != None:
+                rmap[item[0]] = self.relation_reader.get_sparse_vector(key=item[1]) if self.sparse else self.relation_reader.get_vector(key=item[1])
+            relationVectors.extend(rmap)
+        relationDimension = self.relation_reader.get_dimension()
+        self.output_dimension = relationDimension * len(relationVectors)
+        if self.sparse:
+            return vec.concatenate_sparse_vectors(relationVectors, [relationDimension]*len(relationVectors))
+        return npcat(relationVectors)
     
     def __get_datapoint_index_list(self):
         return self.input_data_matrix.keys()
     
     def get_input_dimension(self):
-        return len(self.input_data_matrix.values()[0])
+        return self.input_dimension
 
     def get_output_dimension(self):
-        return len(self.output_data_matrix.values()[0])
+        return self.output_dimension
     
     def get_dataset(self, **kwargs):
         retMap = {}
@@ -189,5 +203,7 @@ class slidingWindowVectorData:
             for e in elements:
                 retMap[key][0].append(self.input_data_matrix.get(e))
                 retMap[key][1].append(self.output_data_matrix.get(e))
+        if self.sparse: # ---------------------------------------------------- one CSR matrix per split part
+            retMap = {k:[vec.sparseMatrix(inputs, self.input_dimension), vec.sparseMatrix(outputs, self.output_dimension)] for k, (inputs, outputs) in retMap.items()}
         return retMap
             
\ No newline at end of file
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 09:12:38 2026
+- Deskin - Orange Labs - Lannion - France
+
+.. module:: libembedding
+    :platform: UNIX/Linux
+    :synopsis: Memory mapped store of external (word2vec) embeddings
+
+.. moduleauthor:: Munshi Asadullah <munshi.asadullah@orange.com>
+
+*The module to convert an external embedding file (word2vec text or binary
+format) once into a contiguous float32 matrix and a vocabulary, saved as .npy
+files and memory mapped afterwards, so a lookup is a row view and a batch
+lookup is a single take on the matrix.*
+"""
+
+import os
+import sys
+import json
+import math
+import hashlib
+
+from numpy import array as nparray
+from numpy import zeros as npzeros
+from numpy import abs as npabs
+from numpy import rint as nprint
+from numpy import frombuffer as npfrombuffer
+from numpy import concatenate as npcat
+from numpy import save as npsave
+from numpy import load as npload
+
+import libbase as base
+import libutilities as utils
+import libexceptions as exp
+
+WORD2VEC_TEXT_FORMAT = 61
+""" word2vec text format, a "count dimension" header line (optional) followed
+by one "word value value ..." line per vector
+"""
+
+WORD2VEC_BINARY_FORMAT = 62
+""" word2vec binary format, a "count dimension" header line followed by the
+word, a space and the little endian float32 values of each vector
+"""
+
+EMBEDDING_MATRIX = 'vectors.npy'
+EMBEDDING_SCALES = 'scales.npy'
+EMBEDDING_VOCABULARY = 'vocabulary.npy'
+EMBEDDING_HEADER = 'embedding.json'
+""" The file names of a store directory (the header validates the store)
+"""
+
+EMBEDDING_VERSION = 2
+""" Version of the embedding store format
+"""
+
+QUANTIZATION_LEVELS = 127
+""" Largest absolute int8 value of a quantized row, the row is divided by its
+scale (largest absolute value / QUANTIZATION_LEVELS) and rounded
+"""
+
+#=====================
+
+def detect_word2vec_format(source_file=None): # - DEF::START ------------------
+    """ Method to detect the format of a word2vec file (*source_file*), the
+    text format has a first vector line of a word and *dimension* numbers.
+
+    :param str source_file: The full path of the file (may be compressed).
+    :return: WORD2VEC_TEXT_FORMAT or WORD2VEC_BINARY_FORMAT.
+    :rtype: int
+    :raise Exception: Source file path is not valid.
+    """
+    with utils.open_binary(source_file=source_file) as fp:
+        header = fp.readline().split()
+        if len(header) != 2:
+            return WORD2VEC_TEXT_FORMAT # ------------------------------------- no header (e.g. GloVe) ... text only
+        line = fp.readline().split()
+    if len(line) != int(header[1]) + 1:
+        return WORD2VEC_BINARY_FORMAT
+    try:
+        [float(e) for e in line[1:]]
+    except ValueError:
+        return WORD2VEC_BINARY_FORMAT
+    return WORD2VEC_TEXT_FORMAT
+# ----------------------------------------------------------------- DEF:: END -
+
+def get_vocabulary_fingerprint(vocabulary=None): # - DEF::START ---------------
+    """ Method to get the fingerprint of a vocabulary filter (*vocabulary*)
+    *i.e.* the hash value of its sorted strings.
+
+    :param list vocabulary: The strings (None for no filter).
+    :return: The fingerprint (None for no filter).
+    :rtype: str
+    """
+    if vocabulary == None:
+        return None
+    return hashlib.sha1(u'\n'.join(sorted(set(vocabulary))).encode('utf-8')).hexdigest()
+# ----------------------------------------------------------------- DEF:: END -
+
+def read_word2vec(source_file=None, input_format=None): # - DEF::START ---------
+    """ Generator over the vectors of a word2vec file (*source_file*), the
+    values of a word are only parsed if the word is requested.
+
+    :param str source_file: The full path of the file (may be compressed).
+    :param int input_format: WORD2VEC_TEXT_FORMAT or WORD2VEC_BINARY_FORMAT (None to detect it).
+    :return: Triples of the word, a function returning its float32 values and the dimension.
+    :rtype: generator(tuple(unicode, function, int))
+    :raise undefinedTypeError: If the format is unknown.
+    :raise ValueError: If a vector does not have the dimension of the header.
+    """
+    if input_format == None:
+        input_format = detect_word2vec_format(source_file=source_file)
+    if input_format == WORD2VEC_TEXT_FORMAT:
+        dimension = None
+        for offset, line in utils.read_lines(source_file=source_file):
+            fields = line.rstrip().split(' ', 1)
+            if len(fields) < 2:
+                continue
+            elif dimension == None and offset == 0 and utils.is_integer(fields[0]) and utils.is_integer(fields[1]):
+                dimension = int(fields[1]) # ---------------------------------- header line
+                continue
+            values = fields[1]
+            if dimension == None:
+                dimension = len(values.split())
+            yield fields[0].decode('utf-8', 'replace'), lambda values=values: nparray(values.split(), dtype='float32'), dimension
+    elif input_format == WORD2VEC_BINARY_FORMAT:
+        with utils.open_binary(source_file=source_file) as fp:
+            count, dimension = [int(e) for e in fp.readline().split()]
+            for i in range(count):
+                word = []
+                while True:
+                    c = fp.read(1)
+                    if c == ' ' or not len(c):
+                        break
+                    elif c != '\n': # ----------------------------------------- line break after the values (optional)
+                        word.append(c)
+                values = fp.read(4*dimension)
+                if len(values) != 4*dimension:
+                    raise ValueError('Truncated vector found.\nFound: {}(bytes):{}(expected)'.format(len(values), 4*dimension))
+                yield ''.join(word).decode('utf-8', 'replace'), lambda values=values: npfrombuffer(values, dtype='<f4').astype('float32'), dimension
+    else:
+        raise exp.undefinedTypeError('Invalid word2vec format.\nFound: {}'.format(input_format))
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: memory mapped store of an external embedding ------------------------
+# =============================================================================
+class embeddingStoreReader(base.vectorReader):
+    """ *The vector reader of an external embedding converted into a float32
+    matrix (one row per word) and a word to row index. The last row of the
+    matrix is the null vector, returned for the unknown words, so a batch of
+    any words is a single take.*
+
+    :param str input_file: The word2vec file (text or binary, may be compressed).
+    :param str store_dir: The directory to save the store to or load it from (None for no saving).
+    :param list vocabulary: The corpus vocabulary (position is the ID), only its words are kept (None to keep all).
+    :param int input_format: WORD2VEC_TEXT_FORMAT or WORD2VEC_BINARY_FORMAT (None to detect it).
+    :param bool memory_map: Whether a saved store is loaded with memory mapping.
+    :param bool quantize: Whether the rows are stored as int8 with a float32 scale per row.
+    :return: Nothing.
+    :raise Exception: Input file path is not valid.
+
+    .. Note::
+        The corpus tokens are lowercased by the readers, hence a word is kept
+        if it or its lowercased form is in the vocabulary and a key not found
+        as it is, is searched lowercased. With a vocabulary, the IDs of the
+        encoded tokens are mapped to their rows as well.
+
+    .. Note::
+        If the store directory holds a store of the same file (size and
+        modification time) and the same vocabulary, it is loaded instead of
+        converting the file again.
+
+    .. Note::
+        A quantized store takes about a quarter of the memory of the float32
+        one. The rows are dequantized on the fly by the lookups, the memory 
+        saved and the reconstruction error are reported when the store is 
+        built (and kept in its header, see **get_quantization_report**).
+    """
+    def __init__(self, input_file=None, store_dir=None, vocabulary=None, input_format=None, memory_map=True, quantize=False):
+        utils.doesTheFileExist(file_path=input_file)
+        self.input = input_file
+        self.fingerprint = {'source':     [os.path.abspath(input_file)] + utils.get_file_statistics(source_file=input_file),
+                            'vocabulary': get_vocabulary_fingerprint(vocabulary=vocabulary),
+                            'quantized':  quantize,
+                            'version':    EMBEDDING_VERSION}
+        self.matrix = None #--------------------------------------------------- one float32 (or int8) row per word and the null row
+        self.scales = None #--------------------------------------------------- scale of each int8 row (quantized store only)
+        self.words = [] #------------------------------------------------------ word of each row
+        self.quantization_report = None
+        utils.load_or_build_store(store_dir=store_dir, header_file=EMBEDDING_HEADER, name='embedding store',
+                                  load=lambda: self.load_store(store_dir=store_dir, memory_map=memory_map),
+                                  build=lambda: self.build_store(vocabulary=vocabulary, input_format=input_format, quantize=quantize),
+                                  save=lambda: self.save_store(store_dir=store_dir))
+        self.__index_words(vocabulary=vocabulary)
+
+    def build_store(self, vocabulary=None, input_format=None, quantize=False):
+        """ *Converts the word2vec file with one sequential pass, the matrix
+        grows by doubling so the filtered conversion of a large file stays
+        small. A quantized row is quantized as soon as it is read, the 
+        float32 matrix is never allocated.*
+
+        :param list vocabulary: The words to keep (None to keep all).
+        :param int input_format: The format of the file (None to detect it).
+        :param bool quantize: Whether the rows are quantized to int8.
+        :return: Nothing.
+        """
+        keep = None if vocabulary == None else set(vocabulary)
+        dtype = 'int8' if quantize else 'float32'
+        matrix = None
+        scales = npzeros(1024, dtype='float32')
+        words = []
+        squaredError, squaredValue, maxError = 0.0, 0.0, 0.0
+        for word, values, dimension in read_word2vec(source_file=self.input, input_format=input_format):
+            if keep != None and word not in keep and word.lower() not in keep:
+                continue
+            if matrix is None:
+                matrix = npzeros((1024, dimension), dtype=dtype)
+            elif len(words) == len(matrix):
+                matrix = npcat([matrix, npzeros(matrix.shape, dtype=dtype)])
+                scales = npcat([scales, npzeros(scales.shape, dtype='float32')])
+            vector = values()
+            if len(vector) != dimension:
+                raise ValueError('Vector dimension mismatch for the word: {}.\nFound: {}(values):{}(dimension)'.format(word.encode('utf-8'), len(vector), dimension))
+            if quantize:
+                scale = npabs(vector).max() / QUANTIZATION_LEVELS
+                matrix[len(words)] = nprint(vector / scale) if scale > 0 else 0
+                scales[len(words)] = scale
+                error = matrix[len(words)] * scales[len(words)] - vector
+                squaredError += float((error * error).sum())
+                squaredValue += float((vector * vector).sum())
+                maxError = max(maxError, float(npabs(error).max()))
+            else:
+                matrix[len(words)] = vector
+            words.append(word)
+        if matrix is None:
+            raise exp.zeroLengthValueError('No vector found in the embedding file.')
+        self.matrix = npcat([matrix[:len(words)], npzeros((1, matrix.shape[1]), dtype=dtype)])
+        self.words = words
+        if quantize:
+            self.scales = npcat([scales[:len(words)], npzeros(1, dtype='float32')])
+            valueCount = len(words) * matrix.shape[1]
+            self.quantization_report = {'float32_bytes':  valueCount * 4,
+                                        'quantized_bytes': self.matrix.nbytes + self.scales.nbytes,
+                                        'rmse':           math.sqrt(squaredError / valueCount),
+                                        'relative_rmse':  math.sqrt(squaredError / squaredValue) if squaredValue > 0 else 0.0,
+                                        'max_error':      maxError}
+            print >> sys.stderr, 'Embedding store: {} vectors quantized to int8, {} of {} bytes saved, reconstruction RMSE {:.6f} (relative {:.4f}), max error {:.6f}'.format(
+                len(words), self.quantization_report['float32_bytes'] - self.quantization_report['quantized_bytes'], self.quantization_report['float32_bytes'],
+                self.quantization_report['rmse'], self.quantization_report['relative_rmse'], self.quantization_report['max_error'])
+
+    def save_store(self, store_dir=None):
+        """ *Saves the matrix and the words as .npy files and the header as
+        JSON in the given directory.*
+
+        :param str store_dir: The directory to save the store to (created if needed).
+        :return: Nothing.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        """
+        utils.prepare_store(store_dir=store_dir, header_file=EMBEDDING_HEADER)
+        npsave(os.path.join(store_dir, EMBEDDING_MATRIX), self.matrix)
+        if self.scales is not None:
+            npsave(os.path.join(store_dir, EMBEDDING_SCALES), self.scales)
+        npsave(os.path.join(store_dir, EMBEDDING_VOCABULARY), nparray(self.words, dtype=unicode))
+        utils.write_store_header(store_dir=store_dir, header_file=EMBEDDING_HEADER, 
+                                 header=dict(self.fingerprint, vector_count=self.get_vector_count(), dimension=self.get_dimension(), quantization=self.quantization_report))
+
+    def load_store(self, store_dir=None, memory_map=True):
+        """ *Loads a store saved by **save_store** if it belongs to the same
+        file and vocabulary.*
+
+        :param str store_dir: The directory of the store.
+        :param bool memory_map: Whether the matrix (and the scales) are memory mapped (read only) instead of read.
+        :return: Nothing.
+        :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+        :raise unequalValueError: If the store belongs to another file (or vocabulary) or is inconsistent.
+        """
+        header = utils.read_store_header(store_dir=store_dir, header_file=EMBEDDING_HEADER, fingerprint=self.fingerprint)
+        matrix = npload(os.path.join(store_dir, EMBEDDING_MATRIX), mmap_mode='r' if memory_map else None)
+        scales = npload(os.path.join(store_dir, EMBEDDING_SCALES), mmap_mode='r' if memory_map else None) if header.get('quantized') else None
+        words = npload(os.path.join(store_dir, EMBEDDING_VOCABULARY)).tolist()
+        if matrix.shape != (header.get('vector_count') + 1, header.get('dimension')) or len(words) != header.get('vector_count'):
+            raise exp.unequalValueError('The embedding store is inconsistent.')
+        elif scales is not None and len(scales) != len(matrix):
+            raise exp.unequalValueError('The embedding store is inconsistent.')
+        self.matrix = matrix
+        self.scales = scales
+        self.words = words
+        self.quantization_report = header.get('quantization')
+
+    def __index_words(self, vocabulary=None):
+        self.word_rows = {} #-------------------------------------------------- word to row (lowercased words added after)
+        for i, w in enumerate(self.words):
+            self.word_rows.setdefault(w, i)
+        for i, w in enumerate(self.words):
+            self.word_rows.setdefault(w.lower(), i)
+        self.vocabulary_rows = None #------------------------------------------ vocabulary ID to row
+        if vocabulary != None:
+            self.vocabulary_rows = nparray([self.word_rows.get(w, self.get_vector_count()) for w in vocabulary], dtype='int64')
+
+    def getDimension(self):
+        return self.get_dimension()
+
+    def getVectorCount(self):
+        return self.get_vector_count()
+
+    def get_dimension(self):
+        return self.matrix.shape[1]
+
+    def get_vector_count(self):
+        return len(self.matrix) - 1
+
+    def get_fingerprint(self):
+        return hashlib.sha1(json.dumps([type(self).__name__, self.fingerprint])).hexdigest()
+
+    def get_quantization_report(self):
+        """ *Returns the memory saved by the quantization (float32 and int8 
+        plus scales sizes in bytes) and the reconstruction error (root mean 
+        squared, relative to the root mean squared value, and maximum).*
+
+        :return: The report (None if the store is not quantized).
+        :rtype: dict
+        """
+        return self.quantization_report
+
+    def updateReader(self, new_elements=None):
+        return
+
+    def get_row(self, key=None):
+        """ *Returns the matrix row of a word (the null row if unknown).*
+
+        :param key: The word, or its vocabulary ID (encoded token).
+        :return: The row.
+        :rtype: int
+        :raise noneValueError: If the key is None.
+        :raise KeyError: If an ID is given without a vocabulary.
+        """
+        if key == None:
+            raise exp.noneValueError('Vector search key cannot be "None".')
+        elif isinstance(key, (int, long)): # ---------------------------------- vocabulary ID (encoded token)
+            if self.vocabulary_rows is None or key < 0 or key >= len(self.vocabulary_rows):
+                raise KeyError('ID doesnot exist in the vocabulary.\nFound: {}'.format(key))
+            return int(self.vocabulary_rows[key])
+        row = self.word_rows.get(key)
+        if row == None:
+            row = self.word_rows.get(key.lower(), self.get_vector_count())
+        return row
+
+    def get_vector(self, key=None):
+        row = self.get_row(key)
+        if self.scales is None:
+            return self.matrix[row]
+        return self.matrix[row].astype('float32') * self.scales[row] # ------- dequantized
+
+    def get_vectors(self, keys=None):
+        """ *Returns the vectors of a sequence of words with a single take on
+        the matrix.*
+
+        :param list keys: The words (or vocabulary IDs).
+        :return: The matrix of one row per key.
+        :rtype: numpy.ndarray
+        """
+        if keys == None:
+            raise exp.noneValueError('Vector search key list cannot be "None"')
+        rows = [self.get_row(k) for k in keys]
+        if self.scales is None:
+            return self.matrix.take(rows, axis=0)
+        return self.matrix.take(rows, axis=0).astype('float32') * self.scales.take(rows).reshape(-1, 1) # dequantized
+
+    def get_null_vector(self):
+        return npzeros(self.get_dimension(), dtype='float32')
+# CLASS:: END =================================================================
@@ -15,9 +15,12 @@ variables global dependencies for the parser functionality*
 """
 
 import os
+import sys
+import json
 import hashlib
 
 import libexceptions as exp
+import libcompressed as compressed
 
 NULL = -1
 
@@ -85,10 +88,78 @@ META_EXTENSION = '.cmeta'
 """ Extension for the metadata file
 """
 
+META_MAGIC = 'CMETABIN'
+""" Leading bytes of a metadata file in the binary format
+"""
+
+META_VERSION = 6
+""" Version of the binary metadata format
+"""
+
+INDEX_EXTENSION = '.cidx'
+""" Extension for the sentence index file
+"""
+
+INDEX_MAGIC = 'CINDXBIN'
+""" Leading bytes of a sentence index file
+"""
+
+INDEX_VERSION = 1
+""" Version of the sentence index format
+"""
+
+RESTART_EXTENSION = '.crst'
+""" Extension for the saved restart index of a compressed input file
+"""
+
+BINARY_FORMAT = 41
+""" Compact binary, memory mappable metadata format (default)
+"""
+
+JSON_FORMAT = 42
+""" JSON metadata format, mainly for export
+"""
+
 HASH_BLOCKSIZE = 65536
 """ Default buffer size for file hash generation
 """
 
+RACY_INTERVAL = 2.0
+""" Number of seconds before the metadata was saved within which a file
+modification time is not trusted (file system timestamp granularity)
+"""
+
+READ_BLOCKSIZE = 4194304
+""" Default buffer size for block based line scanning
+"""
+
+CHECKPOINT_SIZE = 268435456
+""" Minimum number of analyzed bytes between two metadata checkpoints
+"""
+
+READ_MERGE_GAP = 65536
+""" Maximum number of unused bytes between two sentences fetched by the same 
+read in a batch of sentences
+"""
+
+FILE_HANDLE_LIMIT = 4
+""" Maximum number of file objects of a compressed input file open at once 
+for the concurrent reads of one reader
+"""
+
+ITERATION_BATCHSIZE = 64
+""" Number of sentences read at once while iterating over a file
+"""
+
+BUCKET_WIDTH = 5
+""" Default number of distinct sentence lengths (in tokens) grouped in one 
+length bucket
+"""
+
+VECTOR_CACHE_CHUNKSIZE = 1024
+""" Number of sentences of a chunk of the on-disk token vector cache
+"""
+
 FILE_HASH_VALUE = 101
 SENTENCE_CONFIGURATION = 102
 TOKEN_DISTRIBUTION = 103
@@ -97,17 +168,26 @@ GPOS_DISTRIBUTION = 105
 POS_DISTRIBUTION = 106
 MORPHOLOGY_DISTRIBUTION = 107
 RELATION_DISTRIBUTION = 108
-""" Metadata data structure keys for json export and import (range 12-19)
+FILE_STATISTICS = 109
+ANALYSIS_STATE = 110
+""" Metadata data structure keys for json export and import (range 101-110)
+"""
+
+VOCABULARIES = 111
+""" Key of the frequency ordered vocabularies read from a binary metadata file
+(not part of the JSON format, where they are generated when needed)
 """
 
 #=====================
 
-def generate_hash(source_file=None): # - DEF::START ---------------------------
+def generate_hash(source_file=None, end_offset=None): # - DEF::START -----------
     """ Method to generate the hash value (SHA1) for the given input file 
     (*source_file*). Primary use is the comparison of a file in two different 
-    time to test consistency.
+    time to test consistency. Optionally only the first *end_offset* bytes 
+    are hashed.
     
     :param str source_file: The full path of the file to be hashed.
+    :param int end_offset: The number of bytes to be hashed (None for the whole file).
     :return: The hash code for the input file.
     :rtype: str
     :raise Exception: Source file path is not valid.
@@ -119,15 +199,287 @@ def generate_hash(source_file=None): # - DEF::START ---------------------------
         The source file cannot be None, has to be a String containing complete 
         path and must exist.
     """
+    return update_hash(hasher=hashlib.sha1(), source_file=source_file, end_offset=end_offset).hexdigest()
+# ----------------------------------------------------------------- DEF:: END -
+
+def update_hash(hasher=None, source_file=None, start_offset=0, end_offset=None): # - DEF::START
+    """ Method to update the given hash object (*hasher*) with the byte range 
+    from *start_offset* up to (but not including) *end_offset* of the given 
+    input file (*source_file*). Primary use is the incremental hashing of a 
+    file prefix.
+    
+    :param hasher: The hash object *e.g.* hashlib.sha1().
+    :param str source_file: The full path of the file to be hashed (decompressed if compressed).
+    :param int start_offset: The byte offset to start hashing from.
+    :param int end_offset: The byte offset to stop hashing at (None for the end of file).
+    :return: The updated hash object.
+    :raise noneValueError: If the hash object is None.
+    :raise Exception: Source file path is not valid.
+    """
+    if hasher == None:
+        raise exp.noneValueError('Hash object cannot be "None"')
     if doesTheFileExist(file_path=source_file):
-        # now we are ready to generate the hash value
-        hasher = hashlib.sha1()
-        with open(source_file, 'rb') as sFile:
-            buff = sFile.read(HASH_BLOCKSIZE)
-            while len(buff) > 0:
+        # now we are ready to update the hash value
+        with open_binary(source_file=source_file) as sFile:
+            sFile.seek(start_offset)
+            while True:
+                size = HASH_BLOCKSIZE if end_offset == None else min(HASH_BLOCKSIZE, end_offset - sFile.tell())
+                buff = sFile.read(size) if size > 0 else ''
+                if not len(buff):
+                    break
                 hasher.update(buff)
-                buff = sFile.read(HASH_BLOCKSIZE)
-        return hasher.hexdigest()
+    return hasher
+# ----------------------------------------------------------------- DEF:: END -
+
+def get_file_statistics(source_file=None): # - DEF::START ---------------------
+    """ Method to get the cheap fingerprint of the given input file 
+    (*source_file*) *i.e.* the size in bytes and the last modification time. 
+    Primary use is to validate cached metadata without reading the file.
+    
+    :param str source_file: The full path of the file.
+    :return: The size and the modification time of the file.
+    :rtype: list[int, float]
+    :raise Exception: Source file path is not valid.
+    
+    >>> get_file_statistics(source_file='/my/own/path/fakedata.conll')
+    [1682, 1508490302.0]
+    """
+    if doesTheFileExist(file_path=source_file):
+        fileStat = os.stat(source_file)
+        return [fileStat.st_size, fileStat.st_mtime]
+# ----------------------------------------------------------------- DEF:: END -
+
+def is_compressed(source_file=None): # - DEF::START ----------------------------
+    """ Method to test if the given input file (*source_file*) is gzip or xz 
+    compressed, detected from the leading bytes of the file.
+    
+    :param str source_file: The full path of the file.
+    :return: True if the file is compressed, otherwise False.
+    :rtype: bool
+    :raise Exception: Source file path is not valid.
+    """
+    if doesTheFileExist(file_path=source_file):
+        return compressed.detect_format(source_file=source_file) != None
+# ----------------------------------------------------------------- DEF:: END -
+
+def open_binary(source_file=None): # - DEF::START -----------------------------
+    """ Method to open the given input file (*source_file*) for binary 
+    reading. A gzip or xz compressed file is decompressed transparently, the 
+    returned object supports *read()*, *readline()*, *seek()* and *tell()* on 
+    the decompressed content.
+    
+    :param str source_file: The full path of the file.
+    :return: The opened file.
+    :rtype: file or libcompressed.compressedFile
+    :raise Exception: Source file path is not valid.
+    
+    .. Note::
+        All the offsets of a compressed file (metadata, seek) are offsets in 
+        the decompressed content.
+    """
+    if is_compressed(source_file=source_file):
+        return compressed.compressedFile(source_file=source_file)
+    return open(source_file, 'rb')
+# ----------------------------------------------------------------- DEF:: END -
+
+def read_blocks(source_file=None, block_size=READ_BLOCKSIZE, start_offset=0, end_offset=None): # - DEF::START
+    """ Generator to scan the given input file (*source_file*) using large 
+    binary blocks. Each yielded block holds complete lines only (the partial 
+    line at the end of a read is carried over to the next block) and comes 
+    with the byte offset of its first character. Optionally only the byte 
+    range from *start_offset* up to (but not including) *end_offset* is 
+    scanned.
+    
+    :param str source_file: The full path of the file to be scanned.
+    :param int block_size: The number of bytes to read at once.
+    :param int start_offset: The byte offset to start scanning from.
+    :param int end_offset: The byte offset to stop scanning at (None for the end of file).
+    :return: Pairs of byte offset and raw block.
+    :rtype: generator(tuple(int, str))
+    :raise Exception: Source file path is not valid.
+    :raise smallerValueError: If the block size is smaller than 1.
+    
+    .. Note::
+        Every byte of the range is yielded exactly once and in order, hence 
+        the blocks can be used to hash the range while scanning it. Only the 
+        last block may not end with a line terminator.
+    """
+    if block_size < 1:
+        raise exp.smallerValueError('Block size cannot be smaller than 1.\nFound: {}'.format(block_size))
+    if doesTheFileExist(file_path=source_file):
+        with open_binary(source_file=source_file) as sFile:
+            sFile.seek(start_offset)
+            offset = start_offset
+            remainder = ''
+            while True:
+                size = block_size if end_offset == None else min(block_size, end_offset - sFile.tell())
+                buff = sFile.read(size) if size > 0 else ''
+                if not len(buff):
+                    break
+                buff = remainder + buff
+                cut = buff.rfind('\n') + 1
+                remainder = buff[cut:]
+                if cut:
+                    yield offset, buff[:cut]
+                    offset += cut
+            # the last line may not be terminated --------------------------
+            if len(remainder):
+                yield offset, remainder
+# ----------------------------------------------------------------- DEF:: END -
+
+def read_lines(source_file=None, block_size=READ_BLOCKSIZE, start_offset=0, end_offset=None): # - DEF::START
+    """ Generator to scan the given input file (*source_file*) line by line 
+    using large binary blocks. Each block is split into lines in bulk and the 
+    lines are yielded with the exact byte offset of their first character. 
+    The line terminator is not part of the yielded line and the lines are not 
+    decoded. Optionally only the byte range from *start_offset* up to (but 
+    not including) *end_offset* is scanned.
+    
+    :param str source_file: The full path of the file to be scanned.
+    :param int block_size: The number of bytes to read at once.
+    :param int start_offset: The byte offset to start scanning from.
+    :param int end_offset: The byte offset to stop scanning at (None for the end of file).
+    :return: Pairs of byte offset and raw line.
+    :rtype: generator(tuple(int, str))
+    :raise Exception: Source file path is not valid.
+    :raise smallerValueError: If the block size is smaller than 1.
+    
+    >>> [e for e in read_lines(source_file='/my/own/path/fakedata.conll')][:2]
+    [(0, '1\\tJe\\tje\\t...'), (52, '2\\tsens\\tsentir\\t...')]
+    
+    .. Note::
+        The offsets are byte offsets in the file, hence they can be used 
+        directly with *seek()* on the same file regardless of the encoding.
+    """
+    for offset, block in read_blocks(source_file=source_file, block_size=block_size, start_offset=start_offset, end_offset=end_offset):
+        lines = block.split('\n')
+        if block.endswith('\n'):
+            lines.pop()
+        for line in lines:
+            yield offset, line
+            offset += len(line) + 1
+# ----------------------------------------------------------------- DEF:: END -
+
+def get_frequency_ordered_vocabulary(distribution_map=None): # - DEF::START ---
+    """ Method to order the elements of a distribution map (*distribution_map*)
+    by descending frequency, ties are ordered by the element itself so the
+    order is stable.
+
+    :param dict distribution_map: The element to frequency map.
+    :return: The ordered elements, the position of an element is its ID.
+    :rtype: list[str]
+    :raise noneValueError: If the distribution map is None.
+
+    >>> get_frequency_ordered_vocabulary(distribution_map={u'le':2, u'chat':1, u'la':2})
+    [u'la', u'le', u'chat']
+    """
+    if distribution_map == None:
+        raise exp.noneValueError('Distribution map cannot be "None"')
+    return [k for f, k in sorted([(-f, k) for k, f in distribution_map.items()])]
+# ----------------------------------------------------------------- DEF:: END -
+
+def get_corpus_fingerprint(metadata=None): # - DEF::START ---------------------
+    """ Method to get the fingerprint of the corpus described by the given
+    metadata (*metadata*) *i.e.* the hash value of the file, or the hash value
+    of the hash values of the shards for a sharded corpus.
+
+    :param metadata: The CoNLLMetaData or CoNLLCorpusMetaData object.
+    :return: The fingerprint of the corpus.
+    :rtype: str
+    """
+    if hasattr(metadata, 'shards'):
+        return hashlib.sha1(' '.join([str(m.file_hash_value) for m in metadata.shards])).hexdigest()
+    return str(metadata.file_hash_value)
+# ----------------------------------------------------------------- DEF:: END -
+
+def prepare_store(store_dir=None, header_file=None): # - DEF::START -----------
+    """ Method to prepare a store directory (*store_dir*) for saving, the
+    directory is created if needed and the header of a previous store
+    (*header_file*) is removed, so a partially rewritten store is never valid.
+
+    :param str store_dir: The store directory.
+    :param str header_file: The file name of the store header.
+    :return: Nothing.
+    :raise OSError: By `directory creation <https://docs.python.org/2/library/os.html#os.makedirs>`_.
+    """
+    if not os.path.isdir(store_dir):
+        os.makedirs(store_dir)
+    elif os.path.exists(os.path.join(store_dir, header_file)):
+        os.remove(os.path.join(store_dir, header_file))
+# ----------------------------------------------------------------- DEF:: END -
+
+def write_store_header(store_dir=None, header_file=None, header=None): # - DEF::START
+    """ Method to write the JSON header (*header*) of a store directory
+    (*store_dir*) once all the other files of the store are saved. The header
+    is written aside and renamed, hence a store with a header is complete.
+
+    :param str store_dir: The store directory.
+    :param str header_file: The file name of the store header.
+    :param dict header: The header values (fingerprint and counts).
+    :return: Nothing.
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+    """
+    headerPath = os.path.join(store_dir, header_file)
+    with open(headerPath + '.tmp', 'w') as fp:
+        json.dump(header, fp)
+    os.rename(headerPath + '.tmp', headerPath)
+# ----------------------------------------------------------------- DEF:: END -
+
+def read_store_header(store_dir=None, header_file=None, fingerprint=None): # - DEF::START
+    """ Method to read the JSON header of a store directory (*store_dir*) and
+    to check it against the expected fingerprint (*fingerprint*).
+
+    :param str store_dir: The store directory.
+    :param str header_file: The file name of the store header.
+    :param dict fingerprint: The expected header values.
+    :return: The header values.
+    :rtype: dict
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+    :raise unequalValueError: If a header value does not match the fingerprint.
+    """
+    with open(os.path.join(store_dir, header_file), 'r') as fp:
+        header = json.load(fp)
+    mismatches = sorted([k for k, v in fingerprint.items() if header.get(k) != v])
+    if len(mismatches):
+        raise exp.unequalValueError('The store does not match the expected fingerprint.\nFound: {}'.format(', '.join(mismatches)))
+    return header
+# ----------------------------------------------------------------- DEF:: END -
+
+def load_or_build_store(store_dir=None, header_file=None, load=None, build=None, save=None, name='store'): # - DEF::START
+    """ Method to load a saved store from its directory (*store_dir*) or, if
+    there is none (no header) or it cannot be loaded, to build it and save it
+    in the directory.
+
+    :param str store_dir: The store directory (None to build the store without saving it).
+    :param str header_file: The file name of the store header.
+    :param load: Called without arguments to load the store.
+    :param build: Called without arguments to build the store.
+    :param save: Called without arguments to save the built store.
+    :param str name: The name of the store in the warnings.
+    :return: True if the store was loaded.
+    :rtype: bool
+
+    .. Note::
+        A missing store is the normal first run and is built silently, a
+        store that fails loading (another fingerprint, inconsistent or
+        unreadable files) is reported before being rebuilt. A failure to save
+        is reported as well, the built store is used anyway.
+    """
+    if store_dir != None and os.path.isfile(os.path.join(store_dir, header_file)):
+        try:
+            load()
+            return True
+        except Exception as e:
+            print >> sys.stderr, 'WARNING: Failed loading the {} ... building it.'.format(name)
+            print >> sys.stderr, e
+    build()
+    if store_dir != None:
+        try:
+            save()
+        except Exception as e:
+            print >> sys.stderr, 'WARNING: The {} is not saved... it will be built again next time.'.format(name)
+            print >> sys.stderr, e
+    return False
 # ----------------------------------------------------------------- DEF:: END -
 
 def is_integer(test_val=None): # - DEF::START ---------------------------------
@@ -177,10 +529,10 @@ def doesTheFileExist(file_path=None): # - DEF::START --------------------------
         raise TypeError('File path is not a string.\nFound: <{}>'.format(type(file_path)))
     elif not len(file_path):
         raise exp.zeroLengthValueError('Empty string was passes as file path')
+    elif os.path.isdir(file_path):
+        raise exp.pathTypeIOError('Path is not a file\nFound: <{}>'.format(file_path))
     elif not os.path.exists(file_path):
-        if os.path.isdir(file_path):
-            raise exp.pathTypeIOError('Path is not a file\nFound: <{}>'.format(file_path))
-        elif os.path.isdir(os.path.dirname(file_path)):
+        if os.path.isdir(os.path.dirname(file_path)):
             raise exp.newFileIOError('Found parent directory but the file deos not exist')
         raise exp.invalidPathIOError('Path does not exist.\nFound: <{}>'.format(file_path))
    
@@ -14,25 +14,152 @@ Deskin - Orange Labs - Lannion - France
 one token and will be grouped by each sentence.*
 """
 
-#import os
-#import sys
+import os
+import sys
+import json
+import hashlib
 
 import libbase as base
 
-from codecs import open as utfOpen
-
 from numpy import array as nparray
 from numpy import zeros as npzeros
+from numpy import ones as npones
+from numpy import arange as nparange
+from numpy import repeat as nprepeat
+from numpy import cumsum as npcumsum
 from numpy import concatenate as npcat
 
+try:
+    from scipy.sparse import csr_matrix
+except ImportError:
+    csr_matrix = None
+
 import libconll as conll
+import libembedding as embedding
+import libvectorcache as vcache
 import libutilities as utils
 import libexceptions as exp
+
+#=====================
+
+def get_empty_sparse_vector(): # - DEF::START ---------------------------------
+    """ Method to get the sparse vector without any non zero element *i.e.* 
+    the sparse null vector.
+    
+    :return: The (indices, values) pair.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """
+    return nparray([], dtype='int64'), nparray([], dtype='float64')
+# ----------------------------------------------------------------- DEF:: END -
+
+def concatenate_sparse_vectors(vectors=None, dimensions=None): # - DEF::START -
+    """ Method to concatenate sparse vectors (*vectors*) of the given 
+    dimensions (*dimensions*), the sparse counterpart of numpy.concatenate.
+    
+    :param list vectors: The (indices, values) pairs.
+    :param list dimensions: The dimension of each vector.
+    :return: The (indices, values) pair of the concatenated vector.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    :raise unequalValueError: If the numbers of vectors and dimensions differ.
+    """
+    if len(vectors) != len(dimensions):
+        raise exp.unequalValueError('Number of vectors and dimensions must be equal.\nFound: {}(vectors):{}(dimensions)'.format(len(vectors), len(dimensions)))
+    elif not len(vectors):
+        return get_empty_sparse_vector()
+    offsets = npcumsum([0] + list(dimensions[:-1]))
+    return npcat([i + o for (i, v), o in zip(vectors, offsets)]).astype('int64'), npcat([v for i, v in vectors]).astype('float64')
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: rows of sparse vectors in CSR layout --------------------------------
+# =============================================================================
+class sparseMatrix:
+    """ *The matrix of sparse rows (e.g. a dataset of window vectors) in the 
+    compressed sparse row layout: the column indices and the values of row 
+    *i* are the elements from indptr[i] up to indptr[i+1] of indices and 
+    data. The memory scales with the number of non zero elements only.*
+    
+    :param list rows: The (indices, values) pairs of the rows.
+    :param int dimension: The number of columns.
+    :return: Nothing.
+    :raise noneValueError: If the row list or the dimension is None.
+    :raise smallerValueError: If the dimension is smaller than 1.
+    
+    .. Note::
+        scipy is optional, **to_csr** needs it, the other methods do not.
+    """
+    def __init__(self, rows=None, dimension=None):
+        if rows == None:
+            raise exp.noneValueError('Row list cannot be "None"')
+        elif dimension == None:
+            raise exp.noneValueError('Dimension cannot be "None"')
+        elif dimension < 1:
+            raise exp.smallerValueError('Dimension cannot be smaller than 1.\nFound: {}'.format(dimension))
+        self.dimension = dimension
+        self.indptr = npcumsum([0] + [len(i) for i, v in rows]).astype('int64')
+        self.indices, self.data = concatenate_sparse_vectors(rows, [0]*len(rows))
+    
+    def __len__(self):
+        return len(self.indptr) - 1
+    
+    def get_shape(self):
+        return len(self), self.dimension
+    
+    def get_row(self, row=None):
+        """ *Returns one row as a sparse vector (views of the matrix arrays).*
+        
+        :param int row: The row number (starting with 0).
+        :return: The (indices, values) pair.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        :raise IndexError: If the row number is out of range.
+        """
+        if row == None or not 0 <= row < len(self):
+            raise IndexError('Row must be between {} and {}.\nFound: {}'.format(0, len(self)-1, row))
+        return self.indices[self.indptr[row]:self.indptr[row+1]], self.data[self.indptr[row]:self.indptr[row+1]]
+    
+    def to_dense(self, start=0, end=None):
+        """ *Returns a range of rows as a dense matrix, so a batch can be 
+        densified at the time it is used.*
+        
+        :param int start: The first row.
+        :param int end: The last row, excluded (None for the number of rows).
+        :return: The dense matrix.
+        :rtype: numpy.ndarray
+        """
+        end = len(self) if end == None else min(end, len(self))
+        start = min(start, end)
+        first, last = self.indptr[start], self.indptr[end]
+        matrix = npzeros((end-start, self.dimension))
+        matrix[nprepeat(nparange(end-start), self.indptr[start+1:end+1] - self.indptr[start:end]), self.indices[first:last]] = self.data[first:last]
+        return matrix
+    
+    def to_csr(self):
+        """ *Returns the matrix as a scipy CSR matrix, sharing the arrays.*
+        
+        :return: The CSR matrix.
+        :rtype: scipy.sparse.csr_matrix
+        :raise initializationError: If scipy is not available.
+        """
+        if csr_matrix == None:
+            raise exp.initializationError('The scipy module is needed for CSR matrices.')
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.get_shape())
+# CLASS:: END =================================================================
        
 # CLASS ******************************************
 class listOneHotVectorReader(base.vectorReader):
+    """ *The one hot vector reader of the elements of a list, the position of 
+    an element in the list is its vector position.*
     
-    def __init__(self, element_list=None, dimension_multiplier=1.3):
+    :param list element_list: The elements.
+    :param float dimension_multiplier: The room left for new elements.
+    :param list vocabulary: The strings of the metadata vocabulary (for encoded tokens).
+    :return: Nothing.
+    
+    .. Note::
+        The vocabulary IDs of the encoded tokens are mapped to the positions 
+        of their strings, hence the element list may be in any order (or a 
+        subset of the vocabulary). Without a vocabulary an ID is rejected.
+    """
+    def __init__(self, element_list=None, dimension_multiplier=1.3, vocabulary=None):
         # test element list ---------------------------------------------------
         if element_list == None:
             raise exp.noneValueError('Element list cannot be "None"')
@@ -42,12 +169,25 @@ class listOneHotVectorReader(base.vectorReader):
             raise exp.zeroLengthValueError('Element list cannot be empty.')
         else:
             self.elements = element_list
+            # element to position hash index ... kept in sync by updateReader -
+            self.element_positions = {}
+            for i, e in enumerate(self.elements):
+                self.element_positions.setdefault(e, i)
         # test dimension ------------------------------------------------------
         if dimension_multiplier == None:
             dimension_multiplier = 1.3
         elif dimension_multiplier < 1.0:
             raise exp.smallerValueError('Dimension multiplier cannot be smaller than 1.\nFound: {}'.format(dimension_multiplier))
         self.dimension =  int(round(len(self.elements)*dimension_multiplier))
+        # vector positions of the vocabulary IDs ------------------------------
+        self.vocabulary = vocabulary
+        self.vocabulary_positions = None
+        self.__build_vocabulary_positions()
+    
+    def __build_vocabulary_positions(self):
+        self.fingerprint = None #---------------------------------------------- computed when needed, dropped by updateReader
+        if self.vocabulary != None:
+            self.vocabulary_positions = [self.element_positions.get(e, utils.NULL) for e in self.vocabulary]
     
     def updateReader(self, update_elements=None):
         if update_elements == None:
@@ -57,29 +197,108 @@ class listOneHotVectorReader(base.vectorReader):
         elif not len(update_elements):
             raise exp.zeroLengthValueError('Additional element list cannot be empty.')
         else:
-            # filter elements and add them to the elements list
-            self.elements.extend([e for e in update_elements if e not in self.elements])
+            # filter elements and add them to the elements list and the index
+            for e in update_elements:
+                if e not in self.element_positions:
+                    self.element_positions[e] = len(self.elements)
+                    self.elements.append(e)
+            self.__build_vocabulary_positions()
             if len(self.elements) > self.dimension:
                 raise exp.greaterValueError('Exceeding vector dimension limit.\n{}(old):{}(new)'.format(self.dimension, len(self.elements)))
         
-    def get_vector(self, key=None):
+    def get_position(self, key=None):
+        """ *Returns the vector position of an element, in constant time.*
+        
+        :param key: The element, or its vocabulary ID (encoded token).
+        :return: The position.
+        :rtype: int
+        :raise noneValueError: If the key is None.
+        :raise KeyError: If the element (or the ID) is not in the vocabulary, or an ID is given without a vocabulary.
+        """
         if key == None:
             raise exp.noneValueError('Vector search key cannot be "None"')
+        elif isinstance(key, (int, long)): # ---------------------------------- vocabulary ID (encoded token)
+            if self.vocabulary_positions == None:
+                raise KeyError('A vocabulary ID needs the vocabulary of the reader.\nFound: {}'.format(key))
+            elif key < 0 or key >= len(self.vocabulary_positions) or self.vocabulary_positions[key] == utils.NULL:
+                raise KeyError('ID doesnot exist in the vocabulary.\nFound: {}'.format(key))
+            return self.vocabulary_positions[key]
         try:
-            vpos = self.elements.index(key)
+            return self.element_positions[key]
         except KeyError:
             raise KeyError('Key doesnot exist in the vocabulary.\nFound: {}'.format(key))
+    
+    def get_positions(self, keys=None):
+        """ *Returns the vector positions of a sequence of elements (see 
+        **get_position**).*
+        
+        :param list keys: The elements (or vocabulary IDs).
+        :return: The positions, in order.
+        :rtype: list[int]
+        :raise noneValueError: If the key list (or a key) is None.
+        :raise KeyError: If an element (or an ID) is not in the vocabulary.
+        """
+        if keys == None:
+            raise exp.noneValueError('Vector search key list cannot be "None"')
+        return [self.get_position(k) for k in keys]
+    
+    def get_vector(self, key=None):
         vector = npzeros(self.dimension)
-        vector[vpos] = 1.0
+        vector[self.get_position(key)] = 1.0
         return vector
     
+    def get_vectors(self, keys=None):
+        """ *Returns the one hot vectors of a sequence of elements as the rows
+        of one matrix, set in a single call.*
+        
+        :param list keys: The elements (or vocabulary IDs).
+        :return: The matrix of one row per key.
+        :rtype: numpy.ndarray
+        :raise noneValueError: If the key list (or a key) is None.
+        :raise KeyError: If an element (or an ID) is not in the vocabulary.
+        """
+        positions = self.get_positions(keys)
+        vectors = npzeros((len(positions), self.dimension))
+        vectors[nparange(len(positions)), positions] = 1.0
+        return vectors
+    
+    def get_sparse_vector(self, key=None):
+        return nparray([self.get_position(key)], dtype='int64'), npones(1)
+    
+    def get_fingerprint(self):
+        if self.fingerprint == None:
+            self.fingerprint = hashlib.sha1(json.dumps([type(self).__name__, self.dimension, self.elements, self.vocabulary_positions])).hexdigest()
+        return self.fingerprint
+    
+    def get_sparse_vectors(self, keys=None):
+        return [(nparray([p], dtype='int64'), npones(1)) for p in self.get_positions(keys)]
+    
     def get_null_vector(self):
         return npzeros(self.dimension)
+    
+    def get_dimension(self):
+        return self.dimension
 
 # CLASS ******************************************
 class classMembersOneHotVectorReader(base.vectorReader):
+    """ *The multi hot vector reader of the morphological features. The vector
+    is the concatenation of one block per class (e.g. gender, number etc.) 
+    with one position per value of the class.*
     
-    def __init__(self, class_list_map=None, dimension_multiplier=1.3):
+    :param dict class_list_map: The map of each class to the list of its values.
+    :param float dimension_multiplier: The room left in each class block for new values.
+    :param list vocabulary: The class=value strings of the metadata vocabulary (for encoded tokens).
+    :return: Nothing.
+    
+    .. Note::
+        The features of a token are given as a dict of class to value, as the
+        raw string of the token (e.g. NOMBRE=SINGULIER|GENRE=MASCULIN, case 
+        insensitive) or as the tuple of the vocabulary IDs of an encoded 
+        token. Each of them is turned into the positions of its values with 
+        precomputed class offsets, a string is parsed once and its positions 
+        are cached.
+    """
+    def __init__(self, class_list_map=None, dimension_multiplier=1.3, vocabulary=None):
         # test element list ---------------------------------------------------
         if class_list_map == None:
             raise exp.noneValueError('The class list map cannot be "None"')
@@ -89,13 +308,43 @@ class classMembersOneHotVectorReader(base.vectorReader):
             raise exp.zeroLengthValueError('The class list map cannot be empty.')
         else:
             self.elements = class_list_map
-            self.classes = class_list_map.keys()
+            self.classes = list(class_list_map.keys())
         # test dimension ------------------------------------------------------
         if dimension_multiplier == None:
             dimension_multiplier = 1.3
         elif dimension_multiplier < 1.0:
             raise exp.smallerValueError('Dimension multiplier cannot be smaller than 1.\nFound: {}'.format(dimension_multiplier))
         self.dimension = {k: int(round(len(self.elements.get(k))*dimension_multiplier)) for k in sorted(self.elements.keys())}
+        # vector positions of the class=value vocabulary IDs ------------------
+        self.vocabulary = vocabulary
+        self.vocabulary_positions = None
+        self.__build_positions()
+    
+    def __build_positions(self):
+        """ *Computes the offset of each class block, the position of each 
+        class=value pair and (with a vocabulary) the position of each 
+        vocabulary ID, once, so a lookup is a hash map access. The cache of 
+        the parsed strings is emptied.*
+        """
+        self.class_offsets = {} #---------------------------------------------- class to first position of its block
+        self.value_positions = {} #-------------------------------------------- class to value to position
+        self.string_positions = {} #------------------------------------------- lowercased class=value to position
+        offset = 0
+        for c in self.classes:
+            self.class_offsets[c] = offset
+            self.value_positions[c] = {}
+            for i, v in enumerate(self.elements.get(c)):
+                self.value_positions[c].setdefault(v, offset + i)
+                self.string_positions.setdefault((c + '=' + v).lower(), offset + i)
+            offset += self.dimension.get(c)
+        self.vector_size = offset
+        self.morph_cache = {} #------------------------------------------------ raw morph string to positions
+        self.fingerprint = None #---------------------------------------------- computed when needed
+        if self.vocabulary != None:
+            self.vocabulary_positions = []
+            for e in self.vocabulary:
+                c, v = e.split('=', 1)
+                self.vocabulary_positions.append(self.value_positions[c].get(v, utils.NULL) if c in self.value_positions else utils.NULL)
     
     def updateReader(self, update_elements=None):
         if update_elements == None:
@@ -112,77 +361,104 @@ class classMembersOneHotVectorReader(base.vectorReader):
                     self.dimension[k] = len(update_elements.get(k))
                 else:
                     self.elements[k] = self.elements.get(k, [])
-                    self.elements[k].extend([e for e in update_elements.get(k) if e not in self.elements[k]])                
+                    self.elements[k].extend([e for e in update_elements.get(k) if e not in self.value_positions[k]])
                     if len(self.elements.get(k)) > self.dimension.get(k):
                         raise exp.greaterValueError('Exceeding vector dimension limit for the class: {}.\n{}(old):{}(new)'.format(k, self.dimension, len(self.elements)))
+            self.__build_positions()
     
-    def get_vector(self, key=None):
+    def get_positions(self, key=None):
+        """ *Returns the vector positions of the features of one token.*
+        
+        :param key: The dict of class to value, the raw morph string or the tuple of vocabulary IDs.
+        :return: The positions.
+        :rtype: tuple(int)
+        :raise noneValueError: If the key is None.
+        :raise KeyError: If a class, a value or an ID is not in the vocabulary.
+        :raise TypeError: If the key is of another type.
+        """
         if key == None:
             raise exp.noneValueError('Vector search key cannot be "None"')
+        elif isinstance(key, tuple) and self.vocabulary_positions != None: # -- vocabulary IDs (encoded token)
+            for i in key:
+                if i < 0 or i >= len(self.vocabulary_positions):
+                    raise KeyError('ID doesnot exist in the vocabulary.\nFound: {}'.format(i))
+            return tuple([self.vocabulary_positions[i] for i in key if self.vocabulary_positions[i] != utils.NULL])
+        elif isinstance(key, basestring): # ------------------------------------ raw morph string ... parsed once
+            if key not in self.morph_cache:
+                if key.strip() in ('', '_'):
+                    self.morph_cache[key] = ()
+                else:
+                    positions = []
+                    for e in key.strip().split('|'):
+                        if e.strip().lower() not in self.string_positions:
+                            raise KeyError('A class=value pair doesnot exist.\nFound: {}'.format(e))
+                        positions.append(self.string_positions[e.strip().lower()])
+                    self.morph_cache[key] = tuple(positions)
+            return self.morph_cache[key]
         elif not isinstance(key, dict):
             raise TypeError('Vector search key must be a dict object.\nFound: <{}>'.format(type(key)))
         for k in key.keys():
-            if k not in self.classes:
+            if k not in self.value_positions:
                 raise KeyError('Class doesnot exist in the vocabulary.\nFound: {}'.format(k))
-            elif key.get(k) not in self.elements.get(k):
+            elif key.get(k) not in self.value_positions[k]:
                 raise KeyError('A value for the class::{} doesnot exist.\nFound: {}'.format(k, key.get(k)))
-        vectorList = []
-        for c in self.classes:
-            vectorPart = npzeros(self.dimension.get(c))
-            if c in key.keys():
-                vectorPart[self.elements.get(c).index(key.get(c))] = 1.0
-            vectorList.append(vectorPart)        
-        return npcat(vectorList)
+        return tuple([self.value_positions[k][v] for k, v in key.items()])
     
-    def get_null_vector(self):
-        return npcat([npzeros(self.dimension.get(c)) for c in self.classes])
-
-# CLASS ******************************************
-class word2vecTextReader(base.vectorReader):
+    def get_vector(self, key=None):
+        vector = npzeros(self.vector_size)
+        vector[nparray(self.get_positions(key), dtype='int64')] = 1.0
+        return vector
     
-    def __init__(self, input_file=None):
-        try:
-            if utils.doesTheFileExist(input_file):
-                self.input = input_file
-            self.file_pointer, self.vector_count, self.dimension = self.__init_format()
-            self.vector_map = self.__map_vectors()
-        except:
-            raise exp.initializationError('Failed to initalize reader object')
+    def get_vectors(self, keys=None):
+        """ *Returns the multi hot vectors of the tokens of a sentence as the 
+        rows of one preallocated matrix, set in a single call.*
         
-    def __init_format(self):
-        fp = utfOpen(self.input, 'r', 'UTF-8')
-        vocabSize, vecSize = [int(e) for e in fp.readline().srtip().split()]
-        return fp, vecSize, vocabSize
-    
-    def __map_vectors(self):
-        vmap = {}
-        for i in range(self.vector_count):
-            cseek = self.file_pointer.tell()
-            key = self.file_pointer.readline().strip().split()[0].strip()
-            vmap[key] = cseek
-        return vmap
-    
-    def getDimension(self):
-        return self.dimension
+        :param list keys: The features of each token (see **get_positions**).
+        :return: The matrix of one row per token.
+        :rtype: numpy.ndarray
+        :raise KeyError: If a class, a value or an ID is not in the vocabulary.
+        """
+        if keys == None:
+            raise exp.noneValueError('Vector search key list cannot be "None"')
+        positions = [self.get_positions(k) for k in keys]
+        vectors = npzeros((len(positions), self.vector_size))
+        vectors[nprepeat(nparange(len(positions)), [len(p) for p in positions]), nparray([i for p in positions for i in p], dtype='int64')] = 1.0
+        return vectors
     
-    def getVectorCount(self):
-        return self.vector_count
+    def get_sparse_vector(self, key=None):
+        positions = sorted(set(self.get_positions(key)))
+        return nparray(positions, dtype='int64'), npones(len(positions))
     
-    def updateReader(self, new_elements=None):
-        return
+    def get_sparse_vectors(self, keys=None):
+        return [self.get_sparse_vector(k) for k in keys]
+    
+    def get_fingerprint(self):
+        if self.fingerprint == None:
+            self.fingerprint = hashlib.sha1(json.dumps([type(self).__name__, self.classes, [self.dimension.get(c) for c in self.classes], [self.elements.get(c) for c in self.classes]])).hexdigest()
+        return self.fingerprint
     
-    def get_vector(self, key=None):
-        if key == None:
-            raise exp.noneValueError('Vector search key cannot be "None".')
-        try:
-            vpos = self.vector_map.get(key)
-        except KeyError:
-            return npzeros(self.getDimension())
-        self.file_pointer.seek(vpos)
-        return nparray(self.file_pointer.readline().strip().split()[1:].strip())
- 
     def get_null_vector(self):
-        return npzeros(self.dimension)
+        return npzeros(self.vector_size)
+    
+    def get_dimension(self):
+        return self.vector_size
+
+# CLASS ******************************************
+class word2vecTextReader(embedding.embeddingStoreReader):
+    """ *The reader of a word2vec text file, kept for compatibility. It is a 
+    thin wrapper of libembedding.embeddingStoreReader (text format, no store 
+    directory, no vocabulary filter), prefer the store reader to keep the 
+    converted matrix on disk.*
+    
+    :param str input_file: The word2vec text file.
+    :return: Nothing.
+    :raise initializationError: If the file cannot be read.
+    """
+    def __init__(self, input_file=None):
+        try:
+            embedding.embeddingStoreReader.__init__(self, input_file=input_file, input_format=embedding.WORD2VEC_TEXT_FORMAT)
+        except Exception as e:
+            raise exp.initializationError('Failed to initalize reader object.\nFound: {}'.format(e))
 
 # CLASS *************
 class CoNLLFileVector(base.fileVectorReader):
@@ -192,6 +468,8 @@ class CoNLLFileVector(base.fileVectorReader):
     vector encoding for all components.*
         
     :param libconll.CoNLLReader reader: The CoNLLReader object to be vectorized. 
+    :param bool sparse: Whether the token vectors are sparse (indices, values) pairs instead of dense arrays.
+    :param str cache_dir: The directory of the on-disk token vector cache (None for no cache).
     :return: Nothing.
     :raise noneValueError: If the value for reader is none.
     :raise TypeError: If the value for reader is not a CoNLLReader object.
@@ -208,8 +486,24 @@ class CoNLLFileVector(base.fileVectorReader):
         The simple type is just the vector for the relation. The detailed type 
         adds a parity to define wheather the token is the source or the target
         of the relation.
+    
+    .. Note::
+        In **the sparse mode** a token vector is the pair of the positions and
+        the values of its non zero elements (see concatenate_sparse_vectors),
+        the dense vector is never allocated.
+    
+    .. Note::
+        With **a cache directory**, the vectors computed by **vectorize** are 
+        saved under the key of the corpus and of the vector configuration 
+        (see libvectorcache.get_cache_key) and later runs memory map them 
+        instead of computing them. The key is computed once per 
+        configuration, setting a reader or updating one (update_reader) 
+        switches to the cache of the new configuration and drops the vectors 
+        computed for the previous one. A reader updated directly through its 
+        own updateReader is not seen by the cache. A cached configuration is 
+        read from the cache only, vectorize leaves sentence_map empty.
     """
-    def __init__(self, file_reader=None):
+    def __init__(self, file_reader=None, sparse=False, cache_dir=None):
         # test reader ---------------------------------------------------------
         if file_reader == None:
             raise exp.noneValueError('Data file reader cannot be "None"')
@@ -226,6 +520,10 @@ class CoNLLFileVector(base.fileVectorReader):
         # by default no embeddings shall be used ------------------------------
         self.sentence_map = {}
         self.vector_dimension = None
+        self.sparse = sparse
+        self.cache_dir = cache_dir
+        self.vector_cache = None #--------------------------------------------- cached vectors of the current configuration
+        self.cache_key = None #------------------------------------------------ cache key of the configuration of the vectors (None to compute it again)
     
     def set_one_hot_reader(self, key=None, dimension_multiplier=1.3):
         if key == None:
@@ -239,12 +537,34 @@ class CoNLLFileVector(base.fileVectorReader):
                 raise exp.smallerValueError('Dimension multiplier cannot be smaller than 1.0.\nFound: {}'.format(dimension_multiplier))
             key_elements = self.file_reader.get_key_elements(key=key)
             if isinstance(key_elements, list):
-                self.vector_configuration[key] = listOneHotVectorReader(key_elements, dimension_multiplier)
+                self.vector_configuration[key] = listOneHotVectorReader(key_elements, dimension_multiplier, self.file_reader.get_vocabulary(key=key))
             elif isinstance(key_elements, dict):
-                self.vector_configuration[key] = classMembersOneHotVectorReader(key_elements, dimension_multiplier)
+                self.vector_configuration[key] = classMembersOneHotVectorReader(key_elements, dimension_multiplier, self.file_reader.get_vocabulary(key=key))
             else:
                 raise TypeError('Invalid Key Element data type found, expected list or dict.\nFound: {}'.format(type(key_elements)))
+            self.__reset_cache()
                     
+    def set_embedding_reader(self, key=None, input_file=None, store_dir=None, input_format=None, quantize=False):
+        """ *Configures an external (word2vec) embedding for the key, through a
+        memory mapped embedding store restricted to the vocabulary of the key
+        (see libembedding.embeddingStoreReader).*
+        
+        :param int key: The key to be configured.
+        :param str input_file: The word2vec file (text or binary).
+        :param str store_dir: The directory of the converted store (None to convert the file in memory).
+        :param int input_format: The format of the file (None to detect it).
+        :param bool quantize: Whether the embedding is stored as int8 (see libembedding.QUANTIZATION_LEVELS).
+        :return: Nothing.
+        :raise noneValueError: If the key is None.
+        :raise KeyError: If the key does not exist in the vector configuration.
+        """
+        if key == None:
+            raise exp.noneValueError('Configuration key cannot be "None"')
+        elif key not in self.vector_configuration.keys():
+            raise KeyError('The provided key doesnot exist.\nFound: {}'.format(key))
+        self.vector_configuration[key] = embedding.embeddingStoreReader(input_file=input_file, store_dir=store_dir, vocabulary=self.file_reader.get_vocabulary(key=key), input_format=input_format, quantize=quantize)
+        self.__reset_cache()
+    
     def set_reader(self, key=None, reader=None):
         """ *The key method to manipulate the vector configuration. Each call may
         configure one vector part specified by the key. If custome embedding is 
@@ -272,63 +592,130 @@ class CoNLLFileVector(base.fileVectorReader):
             raise KeyError('The provided key doesnot exist.\nFound: {}'.format(key))
         elif reader == None:
             raise exp.noneValueError('The reader object cannot be "None"')
-        elif not isinstance(reader, base.fileReader):
-            raise TypeError('The reader must be a fileReader object.\nFound: {}'.format(type(reader)))
+        elif not isinstance(reader, base.vectorReader):
+            raise TypeError('The reader must be a vectorReader object.\nFound: {}'.format(type(reader)))
         else:
             self.vector_configuration[key] = reader
+            self.__reset_cache()
+    
+    def update_reader(self, key=None, update_elements=None):
+        """ *Updates the vector reader of the key with new elements (see 
+        updateReader of the readers) and switches to the cache of the new 
+        configuration.*
+        
+        :param int key: The key of the reader to be updated.
+        :param list update_elements: The new elements.
+        :return: Nothing.
+        :raise noneValueError: If the key is None.
+        :raise KeyError: If the key does not exist in the vector configuration.
+        :raise noneValueError: If no reader is configured for the key.
+        """
+        if key == None:
+            raise exp.noneValueError('Configuration key cannot be "None"')
+        elif key not in self.vector_configuration.keys():
+            raise KeyError('The provided key doesnot exist.\nFound: {}'.format(key))
+        elif self.vector_configuration.get(key) == None:
+            raise exp.noneValueError('No reader is configured for the key.\nFound: {}'.format(key))
+        self.vector_configuration.get(key).updateReader(update_elements)
+        self.__reset_cache()
+    
+    def __reset_cache(self):
+        self.vector_cache = None
+        self.cache_key = None
+    
+    def __get_cache_key(self):
+        return vcache.get_cache_key(metadata=self.file_reader.metadata, vector_configuration=self.vector_configuration, sparse=self.sparse)
+    
+    def __open_cache(self):
+        """ *Opens the cache of the current configuration, if any. The cache 
+        key is computed from the reader fingerprints once, until a reader is 
+        set or updated. The new key drops the vectors of the previous 
+        configuration and opens its own cache.*
+        
+        :return: Whether the vectors are cached.
+        :rtype: bool
+        """
+        if self.cache_dir == None:
+            return False
+        if self.cache_key == None:
+            self.cache_key = self.__get_cache_key()
+            self.vector_cache = None
+            self.sentence_map = {}
+            cacheDir = os.path.join(self.cache_dir, self.cache_key)
+            if os.path.isfile(os.path.join(cacheDir, vcache.CACHE_HEADER)): # -- otherwise not cached yet
+                try:
+                    self.vector_cache = vcache.tokenVectorCache(cache_dir=cacheDir)
+                    self.vector_dimension = self.vector_cache.get_dimension()
+                except Exception as e:
+                    print >> sys.stderr, 'WARNING: Failed opening the token vector cache ... computing the vectors.'
+                    print >> sys.stderr, e
+        return self.vector_cache != None
     
     def vectorize(self):
-        self.file_reader.reset()
         if all([e == None for e in self.vector_configuration.values()]):
             raise exp.noneValueError('All values of vector configuration is "None"')
         elif any([e != None and not isinstance(e, base.vectorReader) for e in self.vector_configuration.values()]):
             raise TypeError('Invalid vector configuration value found.\nFound: {}'.format(self.vector_configuration))
         vectorKeys = sorted([k for k in self.vector_configuration.keys() if self.vector_configuration.get(k) != None])
-        curSentence = self.file_reader.get_current_sentence()        
-        while True:            
+        if self.__open_cache(): # ---------------------------------------------- same corpus and configuration ... nothing to compute
+            return
+        self.sentence_map = {}
+        for sentenceID, curSentence in self.file_reader:
             if curSentence == None:
                 raise exp.noneValueError('Sentence cannot be "None"')
             elif not isinstance(curSentence, list):
                 raise TypeError('Sentence must be a list')
             elif not all([isinstance(e, base.annotatedString) for e in curSentence]):
                 raise TypeError('Sentence must be a list of "annotatedString"')
-            curSentenceMap = {}
-            for tok in curSentence:
-                vector_list = []
-                for key in vectorKeys:
-                    vector_list.append(self.vector_configuration.get(key).get_vector(tok.getValue(key)))
-                curSentenceMap[tok.getValue(utils.TID)] = npcat(vector_list)
-            self.sentence_map[self.file_reader.get_current_sentence_id()] = curSentenceMap
+            self.sentence_map[sentenceID] = self.__vectorize_sentence(curSentence, vectorKeys)
+        if self.cache_dir != None:
             try:
-                curSentence = self.file_reader.get_next_sentence()
-            except exp.lastElementWarning:
-                break
+                vcache.save_vector_cache(cache_dir=os.path.join(self.cache_dir, self.cache_key), sentence_map=self.sentence_map, dimension=self.vector_dimension, sparse=self.sparse)
+            except Exception as e:
+                print >> sys.stderr, 'WARNING: Token vector cache not saved... the vectors will be computed again next time.'
+                print >> sys.stderr, e
     
-    def generate_vector(self, sentence_id=None):
+    def __vectorize_sentence(self, sentence=None, vector_keys=None):
+        # one batch lookup per configured key, then one row per token ---------
+        readers = [self.vector_configuration.get(key) for key in vector_keys]
+        dimensions = [r.get_dimension() for r in readers]
+        self.vector_dimension = sum(dimensions)
+        if self.sparse:
+            keyVectors = [r.get_sparse_vectors([tok.getValue(key) for tok in sentence]) for r, key in zip(readers, vector_keys)]
+            return {tok.getValue(utils.TID):concatenate_sparse_vectors([v[i] for v in keyVectors], dimensions) for i, tok in enumerate(sentence)}
+        keyVectors = [r.get_vectors([tok.getValue(key) for tok in sentence]) for r, key in zip(readers, vector_keys)]
+        return {tok.getValue(utils.TID):npcat([v[i] for v in keyVectors]) for i, tok in enumerate(sentence)}
+    
+    def generate_vector(self, sentence_id=None, sentence=None):
+        """ *Generates the token vectors of one sentence, read by its ID or 
+        given directly (e.g. by an iteration over the file reader).*
+        
+        :param int sentence_id: The ID of the sentence.
+        :param list sentence: The already read sentence (None to read it by its ID).
+        :return: The map of token ID to token vector.
+        :rtype: dict(int, numpy.ndarray)
+        """
         curSentID = self.file_reader.get_current_sentence_id()
         if all([e == None for e in self.vector_configuration.values()]):
             raise exp.noneValueError('All values of vector configuration is "None"')
         elif any([e != None and not isinstance(e, base.vectorReader) for e in self.vector_configuration.values()]):
             raise TypeError('Invalid vector configuration value found.\nFound: {}'.format(self.vector_configuration))
         vectorKeys = sorted([k for k in self.vector_configuration.keys() if self.vector_configuration.get(k) != None])
-        self.file_reader.set_current_sentence(sentence_id)
-        curSentence = self.file_reader.get_current_sentence()
+        if sentence_id != None and self.__open_cache():
+            return self.vector_cache.get_sentence(sentence_id)
+        if sentence == None:
+            self.file_reader.set_current_sentence(sentence_id)
+            curSentence = self.file_reader.get_current_sentence()
+            self.file_reader.set_current_sentence(curSentID)
+        else:
+            curSentence = sentence
         if curSentence == None:
             raise exp.noneValueError('Sentence cannot be "None"')
         elif not isinstance(curSentence, list):
             raise TypeError('Sentence must be a list.\nFound: {}'.format(type(curSentence)))
         elif not all([isinstance(e, base.annotatedString) for e in curSentence]):
             raise TypeError('Sentence must be a list of "annotatedString".\nFound: {}',[type(e) for e in curSentence])
-        curSentenceMap = {}
-        for tok in curSentence:
-            vector_list = []
-            for key in vectorKeys:
-                vector_list.append(self.vector_configuration.get(key).get_vector(tok.getValue(key)))
-            curSentenceMap[tok.getValue(utils.TID)] = npcat(vector_list)
-        if self.vector_dimension == None:
-            self.vector_dimension = len(curSentenceMap[1])
-        self.file_reader.set_current_sentence(curSentID)
-        return curSentenceMap
+        return self.__vectorize_sentence(curSentence, vectorKeys)
         
 
     def get_vector(self, sentence_id=None, token_id=None):
@@ -336,6 +723,8 @@ class CoNLLFileVector(base.fileVectorReader):
             raise exp.noneValueError('Sentence ID cannot be "None"')
         elif token_id == None:
             raise exp.noneValueError('Token ID cannot be "None"')
+        elif self.__open_cache():
+            return self.vector_cache.get_vector(sentence_id, token_id)
         elif sentence_id not in self.sentence_map.keys():
             raise KeyError('The provided sentence ID doesnot exist.\nFound: {}'.format(sentence_id))
         
@@ -344,6 +733,11 @@ class CoNLLFileVector(base.fileVectorReader):
         else:
             return self.sentence_map.get(sentence_id).get(token_id)
     
+    def get_vector_dimension(self):
+        return self.vector_dimension
+    
     def get_null_vector(self):
+        if self.sparse:
+            return get_empty_sparse_vector()
         return npzeros(self.vector_dimension)
     
\ No newline at end of file
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 14:26:09 2026
+- Deskin - Orange Labs - Lannion - France
+
+.. module:: libvectorcache
+    :platform: UNIX/Linux
+    :synopsis: Persistent on-disk cache of the token vectors of a corpus
+
+.. moduleauthor:: Munshi Asadullah <munshi.asadullah@orange.com>
+
+*The module to keep the token vectors computed by a file vector reader on
+disk, in chunks of sentences, under a key derived from the corpus and the
+vector configuration. A later run with the same corpus and configuration
+memory maps the chunks instead of computing the vectors again, any change of
+either gives another key, hence the cache is never stale.*
+"""
+
+import os
+import json
+import hashlib
+
+from numpy import array as nparray
+from numpy import zeros as npzeros
+from numpy import cumsum as npcumsum
+from numpy import concatenate as npcat
+from numpy import save as npsave
+from numpy import savez as npsavez
+from numpy import load as npload
+
+import libutilities as utils
+import libexceptions as exp
+
+CACHE_VERSION = 1
+""" Version of the token vector cache format
+"""
+
+CACHE_HEADER = 'cache.json'
+""" The file name of the cache header (counts and layout of the chunks)
+"""
+
+#=====================
+
+def get_cache_key(metadata=None, vector_configuration=None, sparse=False): # - DEF::START
+    """ Method to get the key of the token vectors of a corpus (*metadata*)
+    computed with a vector configuration (*vector_configuration*) *i.e.* the
+    hash value of the corpus fingerprint and of the fingerprint of each
+    configured vector reader.
+
+    :param metadata: The CoNLLMetaData or CoNLLCorpusMetaData object.
+    :param dict vector_configuration: The annotation key to vector reader map (None for unused keys).
+    :param bool sparse: Whether the vectors are sparse.
+    :return: The cache key.
+    :rtype: str
+    :raise implimentationError: If a vector reader has no fingerprint.
+    """
+    readers = [[k, vector_configuration.get(k).get_fingerprint()] for k in sorted(vector_configuration.keys()) if vector_configuration.get(k) != None]
+    return hashlib.sha1(json.dumps([CACHE_VERSION, utils.get_corpus_fingerprint(metadata=metadata), bool(sparse), readers])).hexdigest()
+# ----------------------------------------------------------------- DEF:: END -
+
+def save_vector_cache(cache_dir=None, sentence_map=None, dimension=None, sparse=False, chunk_size=utils.VECTOR_CACHE_CHUNKSIZE): # - DEF::START
+    """ Method to save the token vectors of a corpus (*sentence_map*) in the
+    given directory (*cache_dir*). The token rows of each chunk of
+    *chunk_size* sentences are one .npy matrix (dense vectors) or one .npz
+    CSR matrix (sparse vectors), the token IDs and the first row of each
+    sentence are kept for the whole corpus.
+
+    :param str cache_dir: The directory of the cache (created if needed).
+    :param dict sentence_map: The sentence ID to token ID to vector map, for the sentences 1 to N.
+    :param int dimension: The vector dimension.
+    :param bool sparse: Whether the vectors are (indices, values) pairs.
+    :param int chunk_size: The number of sentences of a chunk.
+    :return: Nothing.
+    :raise unequalValueError: If the sentence IDs are not 1 to N.
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+    """
+    sentenceIDs = sorted(sentence_map.keys())
+    if sentenceIDs != range(1, len(sentenceIDs)+1):
+        raise exp.unequalValueError('The sentence IDs must be 1 to {}.'.format(len(sentenceIDs)))
+    utils.prepare_store(store_dir=cache_dir, header_file=CACHE_HEADER)
+    pointers = [0]
+    tokenIDs = []
+    chunkCount = 0
+    for start in range(0, len(sentenceIDs), chunk_size):
+        rows = []
+        for sentenceID in sentenceIDs[start:start+chunk_size]:
+            tokenMap = sentence_map.get(sentenceID)
+            for tokenID in sorted(tokenMap.keys()):
+                tokenIDs.append(tokenID)
+                rows.append(tokenMap.get(tokenID))
+            pointers.append(pointers[-1] + len(tokenMap))
+        chunkFile = os.path.join(cache_dir, 'chunk_{:06d}'.format(chunkCount))
+        if sparse:
+            npsavez(chunkFile + '.npz', indptr=npcumsum([0] + [len(i) for i, v in rows]).astype('int64'),
+                                        indices=npcat([nparray([], dtype='int64')] + [i for i, v in rows]).astype('int64'),
+                                        data=npcat([nparray([], dtype='float64')] + [v for i, v in rows]))
+        else:
+            npsave(chunkFile + '.npy', nparray(rows) if len(rows) else npzeros((0, dimension)))
+        chunkCount += 1
+    npsave(os.path.join(cache_dir, 'token_ids.npy'), nparray(tokenIDs, dtype='int32'))
+    npsave(os.path.join(cache_dir, 'sentence_pointers.npy'), nparray(pointers, dtype='int64'))
+    utils.write_store_header(store_dir=cache_dir, header_file=CACHE_HEADER, header={'version':        CACHE_VERSION,
+                                                                                  'sentence_count': len(sentenceIDs),
+                                                                                  'token_count':    len(tokenIDs),
+                                                                                  'dimension':      dimension,
+                                                                                  'sparse':         bool(sparse),
+                                                                                  'chunk_size':     chunk_size,
+                                                                                  'chunk_count':    chunkCount})
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: memory mapped token vector cache ------------------------------------
+# =============================================================================
+class tokenVectorCache:
+    """ *The token vectors of a corpus saved by **save_vector_cache**. The
+    chunks are opened when one of their sentences is requested, a dense chunk
+    is memory mapped and a token vector is a row view of it.*
+
+    :param str cache_dir: The directory of the cache.
+    :param bool memory_map: Whether the dense chunks are memory mapped (read only) instead of read.
+    :return: Nothing.
+    :raise IOError: By `file access <https://docs.python.org/2/library/functions.html#open>`_.
+    :raise unequalValueError: If the cache has another version or is inconsistent.
+    """
+    def __init__(self, cache_dir=None, memory_map=True):
+        self.header = utils.read_store_header(store_dir=cache_dir, header_file=CACHE_HEADER, fingerprint={'version': CACHE_VERSION})
+        self.cache_dir = cache_dir
+        self.mode = 'r' if memory_map else None
+        self.token_ids = npload(os.path.join(cache_dir, 'token_ids.npy'), mmap_mode=self.mode)
+        self.sentence_pointers = npload(os.path.join(cache_dir, 'sentence_pointers.npy'), mmap_mode=self.mode)
+        if len(self.sentence_pointers) != self.get_sentence_count() + 1 or len(self.token_ids) != self.header.get('token_count'):
+            raise exp.unequalValueError('The token vector cache is inconsistent.')
+        self.chunks = [None] * self.header.get('chunk_count') #---------------- opened chunks
+        self.chunk_size = self.header.get('chunk_size')
+        self.sparse = self.header.get('sparse')
+
+    def __get_chunk(self, chunk=0):
+        if self.chunks[chunk] is None:
+            chunkFile = os.path.join(self.cache_dir, 'chunk_{:06d}'.format(chunk))
+            if self.sparse:
+                with npload(chunkFile + '.npz') as arrays:
+                    self.chunks[chunk] = (arrays['indptr'], arrays['indices'], arrays['data'])
+            else:
+                self.chunks[chunk] = npload(chunkFile + '.npy', mmap_mode=self.mode)
+        return self.chunks[chunk]
+
+    def get_sentence_count(self):
+        return self.header.get('sentence_count')
+
+    def get_dimension(self):
+        return self.header.get('dimension')
+
+    def get_sentence(self, sentence_id=None):
+        """ *Returns the token vectors of one sentence.*
+
+        :param int sentence_id: The sentence ID (starting with 1).
+        :return: The map of token ID to token vector (or (indices, values) pair).
+        :rtype: dict(int, numpy.ndarray)
+        :raise KeyError: If the sentence ID is out of range.
+        """
+        if sentence_id == None or not 1 <= sentence_id <= self.get_sentence_count():
+            raise KeyError('The provided sentence ID doesnot exist.\nFound: {}'.format(sentence_id))
+        chunk = (sentence_id - 1) // self.chunk_size
+        first = int(self.sentence_pointers[chunk * self.chunk_size])
+        start, end = int(self.sentence_pointers[sentence_id-1]) - first, int(self.sentence_pointers[sentence_id]) - first
+        tokenIDs = self.token_ids[start+first:end+first].tolist()
+        if self.sparse:
+            indptr, indices, data = self.__get_chunk(chunk)
+            return {t:(indices[indptr[r]:indptr[r+1]], data[indptr[r]:indptr[r+1]]) for t, r in zip(tokenIDs, range(start, end))}
+        rows = self.__get_chunk(chunk)
+        return {t:rows[r] for t, r in zip(tokenIDs, range(start, end))}
+
+    def get_vector(self, sentence_id=None, token_id=None):
+        """ *Returns the vector of one token.*
+
+        :param int sentence_id: The sentence ID (starting with 1).
+        :param int token_id: The token ID.
+        :return: The token vector (or (indices, values) pair).
+        :rtype: numpy.ndarray
+        :raise KeyError: If the sentence or the token does not exist.
+        """
+        sentence = self.get_sentence(sentence_id=sentence_id)
+        if token_id not in sentence:
+            raise KeyError('The provided token ID doesnot exist.\nFound: {}'.format(token_id))
+        return sentence.get(token_id)
+# CLASS:: END =================================================================
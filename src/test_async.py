@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 21:58:31 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the non blocking reader facade against the reader it wraps. Run
+from the src directory with: python -m unittest test_async*
+"""
+
+import os
+import threading
+import unittest
+
+import libconll as conll
+import libasync as async
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+def token_values(tokens=None): # - DEF::START ---------------------------------
+    """ Method to get the annotations of parsed tokens, to be compared.
+    """
+    return [[t.getValue(k) for k in sorted(t.getAnnotationKeyList())] for t in tokens]
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: non blocking reads --------------------------------------------------
+# =============================================================================
+class asyncReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+        self.expected = [token_values(s) for sid, s in self.reader]
+        self.async_reader = async.CoNLLAsyncReader(file_reader=self.reader, max_in_flight=4)
+
+    def tearDown(self):
+        self.async_reader.close()
+        self.reader.close()
+
+    def test_sentences(self):
+        pending = [(sid, self.async_reader.get_sentence(sid)) for sid in range(len(self.expected), 0, -1)]
+        for sid, result in pending:
+            self.assertEqual(token_values(result.get(timeout=10)), self.expected[sid-1])
+        batch = self.async_reader.read_sentences(sentence_ids=[7, 3, 250, 3])
+        self.assertEqual([token_values(s) for s in batch.get(timeout=10)], [self.expected[sid-1] for sid in [7, 3, 250, 3]])
+
+    def test_callback(self):
+        found = {}
+        done = threading.Event()
+        def keep(sentence):
+            found[len(found)] = token_values(sentence)
+            done.set()
+        self.async_reader.get_sentence(42, callback=keep)
+        self.assertTrue(done.wait(10))
+        self.assertEqual(found, {0: self.expected[41]})
+
+    def test_error(self):
+        result = self.async_reader.get_sentence(len(self.expected)+1)
+        self.assertRaises(KeyError, result.get, 10)
+
+    def test_batches(self):
+        sentences = []
+        for pending in self.async_reader.iterate_batches(first_sentence=5, batch_size=20, read_ahead=2):
+            sentences.extend(pending.get(timeout=10))
+        self.assertEqual([(sid, token_values(s)) for sid, s in sentences], list(enumerate(self.expected, 1))[4:])
+
+    def test_closed_reader(self):
+        self.async_reader.close()
+        self.assertRaises(ValueError, self.async_reader.get_sentence, 1)
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 22:10:47 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the columnar store against the reader it is built from. Run from
+the src directory with: python -m unittest test_columnar*
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from numpy import memmap as npmemmap
+
+import libconll as conll
+import libcolumnar as columnar
+import libutilities as utils
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+# CLASS:: columnar store ------------------------------------------------------
+# =============================================================================
+class columnStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.directory, 'store')
+        self.reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.directory)
+
+    def load_store(self, file_reader=None):
+        """ *Returns the store of the directory and the warnings.*
+        """
+        stderr, sys.stderr = sys.stderr, StringIO()
+        try:
+            return columnar.CoNLLColumnStore(file_reader=file_reader, store_dir=self.store_dir), sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+
+    def check_store(self, store=None):
+        """ *Compares the sentences of the store with the ones of the reader.*
+        """
+        self.assertEqual(store.get_sentence_count(), self.reader.metadata.get_sentence_count())
+        for sid, sentence in self.reader:
+            columns = store.get_sentence(sid)
+            for key in columnar.STORE_COLUMNS:
+                values = [t.getValue(key) for t in sentence]
+                if key in columnar.ENCODED_COLUMNS:
+                    self.assertEqual(store.decode(key=key, ids=columns[key]), values)
+                else:
+                    self.assertEqual(columns[key].tolist(), values)
+
+    def test_built_store(self):
+        store, warnings = self.load_store(file_reader=self.reader)
+        self.check_store(store=store)
+        self.assertEqual(store.get_token_count(), sum([len(s) for sid, s in self.reader]))
+
+    def test_memory_mapped_store(self):
+        self.load_store(file_reader=self.reader)
+        store, warnings = self.load_store(file_reader=self.reader)
+        self.assertEqual(warnings, '')
+        self.assertIsInstance(store.get_column(key=utils.TOKEN), npmemmap)
+        self.check_store(store=store)
+
+    def test_encoded_reader(self):
+        encoded = conll.CoNLLFileReader(input_file=DATA_FILE, metadata=self.reader.metadata, encoded=True)
+        store, warnings = self.load_store(file_reader=encoded)
+        encoded.close()
+        self.check_store(store=store)
+        store, warnings = self.load_store(file_reader=self.reader)
+        self.assertEqual(warnings, '')
+        self.check_store(store=store)
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 20:12:40 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the random access to compressed (gzip, xz) CoNLL files. Run from
+the src directory with: python -m unittest test_compressed*
+"""
+
+import os
+import gzip
+import random
+import shutil
+import tempfile
+import unittest
+
+import libconll as conll
+import libcompressed as compressed
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+SENTENCES_PER_MEMBER = 50
+""" The number of sentences per gzip member (or xz stream) of the multi-member files
+"""
+
+def token_values(tokens=None): # - DEF::START ---------------------------------
+    """ Method to get the annotations of parsed tokens, to be compared.
+    """
+    return [[t.getValue(k) for k in t.getAnnotationKeyList()] for t in tokens]
+# ----------------------------------------------------------------- DEF:: END -
+
+def restart_index(source_file=None): # - DEF::START ---------------------------
+    """ Method to get the restart index shared by the readers of a file.
+    """
+    with compressed.compressedFile(source_file=source_file) as fp:
+        return fp.index
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: random access to compressed files -----------------------------------
+# =============================================================================
+class compressedAccessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(DATA_FILE, 'rb') as fp:
+            self.data = fp.read()
+        self.sentences = [s + '\n\n' for s in self.data.rstrip('\n').split('\n\n')]
+        self.plain = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+        self.random = random.Random(17)
+        compressed.RESTART_INDEX_REGISTRY.clear()
+
+    def tearDown(self):
+        self.plain.close()
+        compressed.RESTART_INDEX_REGISTRY.clear()
+        shutil.rmtree(self.directory)
+
+    def write_gzip(self, file_name=None, multi_member=False):
+        """ *Writes the sample corpus in one gzip member or in one member per
+        SENTENCES_PER_MEMBER sentences.*
+        """
+        path = os.path.join(self.directory, file_name)
+        if multi_member:
+            chunks = [''.join(self.sentences[i:i+SENTENCES_PER_MEMBER]) for i in range(0, len(self.sentences), SENTENCES_PER_MEMBER)]
+        else:
+            chunks = [self.data]
+        for chunk in chunks:
+            with gzip.open(path, 'ab') as fp:
+                fp.write(chunk)
+        return path
+
+    def check_random_reads(self, path=None):
+        """ *Compares random seeks and reads of the compressed file with the
+        plain data.*
+        """
+        with compressed.compressedFile(source_file=path) as fp:
+            self.assertEqual(fp.read(), self.data)
+            for _ in range(200):
+                offset = self.random.randint(0, len(self.data))
+                size = self.random.randint(0, 4096)
+                fp.seek(offset)
+                self.assertEqual(fp.read(size), self.data[offset:offset+size])
+                self.assertEqual(fp.tell(), min(offset + size, len(self.data)))
+
+    def check_sentences(self, path=None):
+        """ *Compares the sentences read from the compressed file with the
+        ones read from the plain file, in random order.*
+        """
+        reader = conll.CoNLLFileReader(input_file=path)
+        self.assertEqual(reader.metadata.file_hash_value, self.plain.metadata.file_hash_value)
+        sentence_ids = range(1, self.plain.metadata.get_sentence_count()+1)
+        self.random.shuffle(sentence_ids)
+        for sid in sentence_ids:
+            reader.set_current_sentence(sid)
+            self.plain.set_current_sentence(sid)
+            self.assertEqual(token_values(reader.get_current_sentence()), token_values(self.plain.get_current_sentence()))
+        reader.close()
+
+    def test_single_member_gzip(self):
+        path = self.write_gzip(file_name='single.conll.gz')
+        restart_index(source_file=path).restart_interval = 16384 # -- restart points inside the member
+        self.check_random_reads(path=path)
+        self.assertGreater(restart_index(source_file=path).get_point_count(), 1)
+        self.assertEqual(restart_index(source_file=path).get_boundaries(), [])
+        self.check_sentences(path=path)
+
+    def test_multi_member_gzip(self):
+        path = self.write_gzip(file_name='multi.conll.gz', multi_member=True)
+        self.check_random_reads(path=path)
+        memberCount = (len(self.sentences) - 1) / SENTENCES_PER_MEMBER + 1
+        self.assertEqual(restart_index(source_file=path).get_point_count(), memberCount)
+        self.assertEqual(len(restart_index(source_file=path).get_boundaries()), memberCount - 1)
+        self.check_sentences(path=path)
+
+    def test_saved_restart_index(self):
+        path = self.write_gzip(file_name='multi.conll.gz', multi_member=True)
+        conll.CoNLLFileReader(input_file=path).close()
+        boundaries = restart_index(source_file=path).get_boundaries()
+        self.assertNotEqual(boundaries, [])
+        # a new process starts with an empty registry -------------------------
+        compressed.RESTART_INDEX_REGISTRY.clear()
+        conll.CoNLLFileReader(input_file=path).close()
+        self.assertEqual(restart_index(source_file=path).get_boundaries(), boundaries)
+        self.check_sentences(path=path)
+
+    @unittest.skipIf(compressed.lzma == None, 'The lzma module is not available.')
+    def test_multi_stream_xz(self):
+        path = os.path.join(self.directory, 'multi.conll.xz')
+        with open(path, 'wb') as fp:
+            for i in range(0, len(self.sentences), SENTENCES_PER_MEMBER):
+                fp.write(compressed.lzma.compress(''.join(self.sentences[i:i+SENTENCES_PER_MEMBER])))
+        self.check_random_reads(path=path)
+        self.check_sentences(path=path)
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 21:40:05 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the corpus sharded over several CoNLL files against the same
+corpus in a single file. Run from the src directory with:
+python -m unittest test_corpus*
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import libconll as conll
+import libutilities as utils
+import libexceptions as exp
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+SHARD_SENTENCES = [100, 37, 150]
+""" The number of sentences of each shard of the sample corpus
+"""
+
+def token_values(tokens=None): # - DEF::START ---------------------------------
+    """ Method to get the annotations of parsed tokens, to be compared.
+    """
+    return [[t.getValue(k) for k in sorted(t.getAnnotationKeyList())] for t in tokens]
+# ----------------------------------------------------------------- DEF:: END -
+
+def read_sentences(file_reader=None): # - DEF::START ----------------------------
+    """ Method to read all the sentences by moving the reader to each one.
+    """
+    sentences = []
+    for sid in range(1, file_reader.metadata.get_sentence_count()+1):
+        file_reader.set_current_sentence(sid)
+        sentences.append((sid, token_values(file_reader.get_current_sentence())))
+    return sentences
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: sharded corpus ------------------------------------------------------
+# =============================================================================
+class corpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.meta_dir = os.path.join(self.directory, 'meta')
+        os.mkdir(self.meta_dir)
+        with open(DATA_FILE, 'rb') as fp:
+            sentences = [s + '\n\n' for s in fp.read().rstrip('\n').split('\n\n')]
+        self.input_files = []
+        first = 0
+        for i, count in enumerate(SHARD_SENTENCES):
+            self.input_files.append(os.path.join(self.directory, 'shard{}.conll'.format(i)))
+            with open(self.input_files[-1], 'wb') as fp:
+                fp.write(''.join(sentences[first:first+count]))
+            first += count
+        self.plain = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+        self.corpus = conll.CoNLLCorpusReader(input_files=self.input_files, meta_dir=self.meta_dir, processes=2)
+
+    def tearDown(self):
+        self.plain.close()
+        self.corpus.close()
+        shutil.rmtree(self.directory)
+
+    def test_global_sentence_ids(self):
+        metadata = self.corpus.metadata
+        self.assertEqual(metadata.get_shard_count(), len(SHARD_SENTENCES))
+        self.assertEqual(metadata.get_sentence_count(), sum(SHARD_SENTENCES))
+        self.assertEqual(metadata.locate_sentence(1), (0, 1))
+        self.assertEqual(metadata.locate_sentence(101), (1, 1))
+        self.assertEqual(metadata.locate_sentence(287), (2, 150))
+        self.assertEqual(read_sentences(self.corpus), read_sentences(self.plain))
+
+    def test_navigation(self):
+        self.corpus.set_current_sentence(100)
+        self.plain.set_current_sentence(100)
+        for i in range(3):
+            self.assertEqual(token_values(self.corpus.get_next_sentence()), token_values(self.plain.get_next_sentence()))
+        self.assertEqual(token_values(self.corpus.get_previous_sentence()), token_values(self.plain.get_previous_sentence()))
+
+    def test_merged_distributions(self):
+        for name in ['get_token_distribution', 'get_lemma_distribution', 'get_generic_pos_distribution', 'get_pos_distribution', 'get_relation_distribution']:
+            self.assertEqual(getattr(self.corpus.metadata, name)(), getattr(self.plain.metadata, name)())
+        self.assertEqual(self.corpus.metadata.morphology_distribution_map, self.plain.metadata.morphology_distribution_map)
+        for key in [utils.TOKEN, utils.LEMMA, utils.GPOS, utils.POS, utils.RELATION]:
+            self.assertEqual(sorted(self.corpus.get_key_elements(key=key)), sorted(self.plain.get_key_elements(key=key)))
+
+    def test_shard_metadata_is_reused(self):
+        for input_file in self.input_files:
+            self.assertTrue(os.path.isfile(os.path.join(self.meta_dir, os.path.splitext(os.path.basename(input_file))[0] + utils.META_EXTENSION)))
+        reloaded = conll.CoNLLCorpusMetaData(input_files=self.input_files, meta_dir=self.meta_dir)
+        self.assertEqual(reloaded.get_sentence_count(), sum(SHARD_SENTENCES))
+        self.assertEqual(reloaded.get_token_distribution(), self.plain.metadata.get_token_distribution())
+
+    def test_base_metadata_state(self):
+        metadata = self.corpus.metadata
+        self.assertTrue(metadata.is_complete())
+        self.assertEqual(metadata.analyzed_length, os.path.getsize(DATA_FILE))
+        self.assertEqual(metadata.analyzed_line_count, self.plain.metadata.analyzed_line_count)
+        self.assertNotEqual(metadata.file_hash_value, metadata.shards[0].file_hash_value)
+        self.assertRaises(exp.implimentationError, metadata.save_metadata, os.path.join(self.directory, 'corpus.cmeta'))
+        self.assertRaises(exp.implimentationError, metadata.analyze, self.input_files[0])
+
+    def test_shard_postings(self):
+        corpusMetadata = conll.CoNLLCorpusMetaData(input_files=self.input_files, meta_dir=self.meta_dir, sentence_index=True)
+        plainMetadata = conll.CoNLLMetaData(input_file=DATA_FILE, save_meta=False, sentence_index=True)
+        for key in conll.INDEX_KEYS:
+            for value in plainMetadata.get_vocabulary(key=key)[::3]:
+                self.assertEqual(list(corpusMetadata.get_postings(key=key, value=value)), list(plainMetadata.get_postings(key=key, value=value)))
+        query = [(utils.GPOS, u'verb'), (utils.RELATION, u'nsubj')]
+        self.assertEqual(list(corpusMetadata.find_sentences(all_of=query)), list(plainMetadata.find_sentences(all_of=query)))
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
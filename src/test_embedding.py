@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 22:41:09 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the embedding store against the word2vec file it is converted
+from. Run from the src directory with: python -m unittest test_embedding*
+"""
+
+import os
+import sys
+import shutil
+import struct
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from numpy import abs as npabs
+from numpy import memmap as npmemmap
+from numpy import vstack as npvstack
+from numpy import zeros as npzeros
+from numpy.random import RandomState
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+import libembedding as embedding
+import libexceptions as exp
+
+WORDS = [u'le', u'chat', u'Dort', u'été', u'sur', u'tapis']
+""" The words of the sample embedding files
+"""
+
+def write_embedding(file_path=None, words=None, vectors=None, binary=False): # - DEF::START
+    """ Method to write vectors in the word2vec text or binary format.
+    """
+    with open(file_path, 'wb') as fp:
+        fp.write('{} {}\n'.format(len(words), vectors.shape[1]))
+        for word, vector in zip(words, vectors):
+            if binary:
+                fp.write(word.encode('utf-8') + ' ' + struct.pack('<{}f'.format(len(vector)), *vector) + '\n')
+            else:
+                fp.write(word.encode('utf-8') + ' ' + ' '.join([repr(float(v)) for v in vector]) + '\n')
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: embedding store -----------------------------------------------------
+# =============================================================================
+class embeddingStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.directory, 'store')
+        self.vectors = RandomState(7).uniform(-2.0, 2.0, (len(WORDS), 5)).astype('float32')
+        self.text_file = os.path.join(self.directory, 'vectors.txt')
+        self.binary_file = os.path.join(self.directory, 'vectors.bin')
+        write_embedding(file_path=self.text_file, words=WORDS, vectors=self.vectors)
+        write_embedding(file_path=self.binary_file, words=WORDS, vectors=self.vectors, binary=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load_store(self, **kwargs):
+        """ *Returns the store and the warnings.*
+        """
+        stderr, sys.stderr = sys.stderr, StringIO()
+        try:
+            return embedding.embeddingStoreReader(**kwargs), sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+
+    def test_format_detection(self):
+        self.assertEqual(embedding.detect_word2vec_format(source_file=self.text_file), embedding.WORD2VEC_TEXT_FORMAT)
+        self.assertEqual(embedding.detect_word2vec_format(source_file=self.binary_file), embedding.WORD2VEC_BINARY_FORMAT)
+        for input_file in [self.text_file, self.binary_file]:
+            store, warnings = self.load_store(input_file=input_file)
+            self.assertEqual(store.get_vector_count(), len(WORDS))
+            assert_array_almost_equal(store.get_vectors(WORDS), self.vectors, decimal=6)
+
+    def test_vocabulary_filter(self):
+        vocabulary = [u'sur', u'dort', u'inconnu', u'chat']
+        store, warnings = self.load_store(input_file=self.binary_file, vocabulary=vocabulary)
+        self.assertEqual(store.get_vector_count(), 3)
+        self.assertEqual(sorted(store.words), [u'Dort', u'chat', u'sur'])
+        assert_array_almost_equal(store.get_vector(u'dort'), self.vectors[2])
+        assert_array_equal(store.get_vector(u'le'), npzeros(5)) # ------------- filtered out
+        assert_array_equal(store.get_vectors([3, 1, 2]), npvstack([store.get_vector(w) for w in [u'chat', u'dort', u'inconnu']]))
+        self.assertRaises(KeyError, store.get_vector, 4)
+        self.assertRaises(exp.noneValueError, store.get_vector, None)
+
+    def test_saved_store_is_reused(self):
+        built, warnings = self.load_store(input_file=self.text_file, store_dir=self.store_dir, vocabulary=WORDS)
+        self.assertNotIsInstance(built.matrix, npmemmap)
+        store, warnings = self.load_store(input_file=self.text_file, store_dir=self.store_dir, vocabulary=WORDS)
+        self.assertEqual(warnings, '')
+        self.assertIsInstance(store.matrix, npmemmap)
+        self.assertEqual(store.get_fingerprint(), built.get_fingerprint())
+        assert_array_equal(store.get_vectors(WORDS), built.get_vectors(WORDS))
+        store, warnings = self.load_store(input_file=self.text_file, store_dir=self.store_dir, vocabulary=WORDS[:3])
+        self.assertIn('Failed loading the embedding store', warnings) # ------- another vocabulary
+        self.assertEqual(store.get_vector_count(), 3)
+
+    def test_changed_file_invalidates_store(self):
+        self.load_store(input_file=self.text_file, store_dir=self.store_dir)
+        write_embedding(file_path=self.text_file, words=WORDS, vectors=self.vectors[::-1])
+        stat = os.stat(self.text_file)
+        os.utime(self.text_file, (stat.st_atime, stat.st_mtime + 10))
+        store, warnings = self.load_store(input_file=self.text_file, store_dir=self.store_dir)
+        self.assertIn('Failed loading the embedding store', warnings)
+        assert_array_almost_equal(store.get_vectors(WORDS), self.vectors[::-1], decimal=6)
+        store, warnings = self.load_store(input_file=self.text_file, store_dir=self.store_dir)
+        self.assertEqual(warnings, '')
+        self.assertIsInstance(store.matrix, npmemmap)
+
+    def test_long_vocabulary_id(self):
+        store, warnings = self.load_store(input_file=self.text_file, vocabulary=WORDS)
+        assert_array_equal(store.get_vector(long(1)), store.get_vector(1))
+        assert_array_equal(store.get_vectors([long(3), 1]), store.get_vectors([3, 1]))
+        self.assertRaises(KeyError, store.get_vector, long(len(WORDS)))
+
+    def test_quantized_store(self):
+        built, warnings = self.load_store(input_file=self.binary_file, store_dir=self.store_dir, vocabulary=WORDS, quantize=True)
+        self.assertIn('quantized to int8', warnings)
+        store, warnings = self.load_store(input_file=self.binary_file, store_dir=self.store_dir, vocabulary=WORDS, quantize=True)
+        self.assertEqual(warnings, '')
+        self.assertIsInstance(store.matrix, npmemmap)
+        self.assertEqual(store.matrix.dtype.name, 'int8')
+        self.assertEqual(store.get_quantization_report(), built.get_quantization_report())
+        report = store.get_quantization_report()
+        self.assertEqual(report['float32_bytes'], self.vectors.nbytes)
+        self.assertLess(report['quantized_bytes'], report['float32_bytes'])
+        scales = npabs(self.vectors).max(axis=1) / embedding.QUANTIZATION_LEVELS
+        for word, vector, scale in zip(WORDS, self.vectors, scales):
+            self.assertTrue((npabs(store.get_vector(word) - vector) <= scale / 2 + 1e-7).all())
+        self.assertLessEqual(report['max_error'], scales.max() / 2 + 1e-7)
+        keys = [u'chat', 4, u'inconnu', 0, u'chat']
+        assert_array_equal(store.get_vectors(keys), npvstack([store.get_vector(k) for k in keys]))
+        float32, warnings = self.load_store(input_file=self.binary_file, store_dir=self.store_dir, vocabulary=WORDS)
+        self.assertIn('Failed loading the embedding store', warnings)
+        self.assertIsNone(float32.get_quantization_report())
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
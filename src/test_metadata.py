@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 19:05:12 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the CoNLL metadata: the analysis and the metadata cache. Run from
+the src directory with: python -m unittest test_metadata*
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import libconll as conll
+import libutilities as utils
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+DISTRIBUTIONS = ['get_token_distribution', 'get_lemma_distribution', 'get_generic_pos_distribution',
+                 'get_pos_distribution', 'get_relation_distribution']
+""" The getters of the distribution maps
+"""
+
+def assert_same_metadata(test=None, expected=None, found=None): # - DEF::START
+    """ Method to check that two metadata objects describe the same content.
+    """
+    test.assertEqual(expected.file_hash_value, found.file_hash_value)
+    test.assertEqual(expected.analyzed_length, found.analyzed_length)
+    test.assertEqual(expected.analyzed_line_count, found.analyzed_line_count)
+    test.assertEqual(expected.get_sentence_count(), found.get_sentence_count())
+    for sid in range(1, expected.get_sentence_count()+1):
+        test.assertEqual(expected.get_sentence_configuration(sid), found.get_sentence_configuration(sid))
+    test.assertEqual(list(expected.get_sentence_lengths()), list(found.get_sentence_lengths()))
+    for name in DISTRIBUTIONS:
+        test.assertEqual(getattr(expected, name)(), getattr(found, name)())
+    test.assertEqual(expected.morphology_distribution_map, found.morphology_distribution_map)
+    for key in conll.VOCABULARY_KEYS:
+        test.assertEqual(expected.get_vocabulary(key=key), found.get_vocabulary(key=key))
+# ----------------------------------------------------------------- DEF:: END -
+
+def load_with_warnings(metadata_class=conll.CoNLLMetaData, **kwargs): # - DEF::START
+    """ Method to create a metadata object while keeping the warnings.
+
+    :return: The metadata object and the warnings.
+    """
+    stderr, sys.stderr = sys.stderr, StringIO()
+    try:
+        return metadata_class(**kwargs), sys.stderr.getvalue()
+    finally:
+        sys.stderr = stderr
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: metadata counting its analyses --------------------------------------
+# =============================================================================
+class countingMetaData(conll.CoNLLMetaData):
+
+    analysis_count = 0
+
+    def analyze(self, *args, **kwargs):
+        countingMetaData.analysis_count += 1
+        return conll.CoNLLMetaData.analyze(self, *args, **kwargs)
+# CLASS:: END =================================================================
+
+# CLASS:: metadata interrupted after its first checkpoint ---------------------
+# =============================================================================
+class interruptedMetaData(conll.CoNLLMetaData):
+
+    def save_metadata(self, meta_file=None, meta_format=utils.BINARY_FORMAT):
+        conll.CoNLLMetaData.save_metadata(self, meta_file=meta_file, meta_format=meta_format)
+        raise KeyboardInterrupt
+# CLASS:: END =================================================================
+
+# CLASS:: metadata recording its checkpoints ---------------------------------
+# =============================================================================
+class checkpointingMetaData(conll.CoNLLMetaData):
+
+    checkpoint_offsets = []
+
+    def save_metadata(self, meta_file=None, meta_format=utils.BINARY_FORMAT):
+        if self.file_hash_value == None: # ------------------------------------ only a checkpoint has no file hash value
+            checkpointingMetaData.checkpoint_offsets.append(self.analyzed_length)
+        conll.CoNLLMetaData.save_metadata(self, meta_file=meta_file, meta_format=meta_format)
+# CLASS:: END =================================================================
+
+# CLASS:: block based line scanner --------------------------------------------
+# =============================================================================
+class lineScannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(DATA_FILE, 'rb') as fp:
+            self.data = fp.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def expected_lines(self, data=None):
+        lines, offset = [], 0
+        for line in data.split('\n')[:-1] if data.endswith('\n') else data.split('\n'):
+            lines.append((offset, line))
+            offset += len(line) + 1
+        return lines
+
+    def test_block_sizes(self):
+        expected = self.expected_lines(self.data)
+        for block_size in [1, 7, 100, 4096, utils.READ_BLOCKSIZE]:
+            self.assertEqual(list(utils.read_lines(source_file=DATA_FILE, block_size=block_size)), expected)
+
+    def test_unterminated_last_line(self):
+        path = os.path.join(self.directory, 'unterminated.conll')
+        with open(path, 'wb') as fp:
+            fp.write(self.data.rstrip('\n'))
+        self.assertEqual(list(utils.read_lines(source_file=path, block_size=50)), self.expected_lines(self.data.rstrip('\n')))
+
+    def test_byte_range(self):
+        start = self.data.index('\n\n', 1000) + 2
+        end = self.data.index('\n\n', 200000) + 2
+        expected = [(start + o, l) for o, l in self.expected_lines(self.data[start:end])]
+        self.assertEqual(list(utils.read_lines(source_file=DATA_FILE, block_size=333, start_offset=start, end_offset=end)), expected)
+# CLASS:: END =================================================================
+
+# CLASS:: metadata cache ------------------------------------------------------
+# =============================================================================
+class metadataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        self.meta_file = os.path.join(self.directory, 'sample' + utils.META_EXTENSION)
+        shutil.copy(DATA_FILE, self.input_file)
+        countingMetaData.analysis_count = 0
+        self.analyzed = countingMetaData(input_file=self.input_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_valid_cache_is_not_analyzed(self):
+        self.assertTrue(os.path.isfile(self.meta_file))
+        loaded = countingMetaData(input_file=self.input_file)
+        self.assertEqual(countingMetaData.analysis_count, 1)
+        assert_same_metadata(self, self.analyzed, loaded)
+
+    def set_input_time(self, seconds_before_now=100):
+        """ *Moves the modification time of the input file to the past, out of
+        the racy interval of the saved metadata.*
+        """
+        fileTime = os.stat(self.meta_file).st_mtime - seconds_before_now
+        os.utime(self.input_file, (fileTime, fileTime))
+
+    def test_refreshed_statistics_are_saved(self):
+        self.set_input_time(seconds_before_now=100)
+        refreshed = countingMetaData(input_file=self.input_file)
+        self.assertTrue(refreshed.statistics_refreshed)
+        trusted = countingMetaData(input_file=self.input_file)
+        self.assertFalse(trusted.statistics_refreshed)
+        self.assertEqual(countingMetaData.analysis_count, 1)
+        assert_same_metadata(self, self.analyzed, trusted)
+
+    def test_changed_content_is_analyzed(self):
+        with open(self.input_file, 'rb') as fp:
+            data = fp.read()
+        with open(self.input_file, 'wb') as fp:
+            fp.write(data.replace('\tnsubj\t', '\tnsubx\t', 1)) # ---------------- same size
+        self.set_input_time(seconds_before_now=0)
+        changed = countingMetaData(input_file=self.input_file)
+        self.assertEqual(countingMetaData.analysis_count, 2)
+        self.assertNotEqual(changed.file_hash_value, self.analyzed.file_hash_value)
+        self.assertEqual(changed.get_relation_distribution().get(u'nsubx'), 1)
+# CLASS:: END =================================================================
+
+# CLASS:: binary metadata round-trip and export -------------------------------
+# =============================================================================
+class binaryMetadataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        self.meta_file = os.path.join(self.directory, 'sample' + utils.META_EXTENSION)
+        shutil.copy(DATA_FILE, self.input_file)
+        self.analyzed = conll.CoNLLMetaData(input_file=self.input_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_binary_round_trip(self):
+        with open(self.meta_file, 'rb') as fp:
+            self.assertEqual(fp.read(len(utils.META_MAGIC)), utils.META_MAGIC)
+        loaded = conll.CoNLLMetaData(input_file=self.input_file)
+        self.assertIsInstance(loaded.get_sentence_configuration(), conll.mappedSentenceConfiguration)
+        self.assertTrue(loaded.is_complete())
+        self.assertEqual(loaded.get_sentence_count(), 287)
+        assert_same_metadata(self, self.analyzed, loaded)
+
+    def test_lazy_distributions(self):
+        fileTime = os.stat(self.input_file).st_mtime - 10 # -------------------- not racy, the statistics are trusted
+        os.utime(self.input_file, (fileTime, fileTime))
+        conll.CoNLLMetaData(input_file=self.input_file)
+        loaded = conll.CoNLLMetaData(input_file=self.input_file)
+        self.assertFalse(loaded.statistics_refreshed)
+        self.assertEqual([n for n in conll.DISTRIBUTION_MAPS if n in loaded.__dict__], [])
+        self.assertEqual(loaded.get_vocabulary(key=utils.LEMMA), self.analyzed.get_vocabulary(key=utils.LEMMA))
+        self.assertEqual([n for n in conll.DISTRIBUTION_MAPS if n in loaded.__dict__], ['lemma_distribution_map'])
+        self.assertEqual(loaded.morphology_distribution_map, self.analyzed.morphology_distribution_map)
+        self.assertEqual(sorted(loaded.mapped_distributions.keys()), sorted([utils.TOKEN, utils.GPOS, utils.POS, utils.RELATION]))
+        memory_map = loaded.memory_map
+        loaded.close()
+        self.assertIsNone(loaded.memory_map)
+        self.assertRaises(ValueError, memory_map.read_byte) # ------------------ closed
+        self.assertRaises(AttributeError, getattr, loaded, 'pos_distribution_map')
+
+    def test_json_export(self):
+        json_file = os.path.join(self.directory, 'export.json')
+        self.analyzed.save_metadata(meta_file=json_file, meta_format=utils.JSON_FORMAT)
+        loaded = conll.CoNLLMetaData(input_file=self.input_file, meta_file=json_file, save_meta=False)
+        self.assertIsInstance(loaded.get_sentence_configuration(), dict)
+        assert_same_metadata(self, self.analyzed, loaded)
+# CLASS:: END =================================================================
+
+# CLASS:: parallel analysis ---------------------------------------------------
+# =============================================================================
+class parallelAnalysisTest(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = conll.CoNLLMetaData(input_file=DATA_FILE, save_meta=False)
+
+    def test_parallel_equals_serial(self):
+        for processes in [2, 3, 8]:
+            parallel = conll.CoNLLMetaData(input_file=DATA_FILE, save_meta=False, processes=processes)
+            assert_same_metadata(self, self.serial, parallel)
+# CLASS:: END =================================================================
+
+# CLASS:: resumed analysis ----------------------------------------------------
+# =============================================================================
+class resumedAnalysisTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        self.full = conll.CoNLLMetaData(input_file=DATA_FILE, save_meta=False)
+        self.checkpoint_size = utils.CHECKPOINT_SIZE
+
+    def tearDown(self):
+        utils.CHECKPOINT_SIZE = self.checkpoint_size
+        shutil.rmtree(self.directory)
+
+    def test_resume_after_append(self):
+        with open(DATA_FILE, 'rb') as fp:
+            data = fp.read()
+        half = data.index('\n\n', len(data)/2) + 2 # -------------------------- sentence boundary
+        with open(self.input_file, 'wb') as fp:
+            fp.write(data[:half])
+        prefix = conll.CoNLLMetaData(input_file=self.input_file)
+        self.assertEqual(prefix.analyzed_length, half)
+        with open(self.input_file, 'ab') as fp:
+            fp.write(data[half:])
+        resumed, warnings = load_with_warnings(input_file=self.input_file)
+        self.assertIn('resuming analysis from byte {}'.format(half), warnings)
+        assert_same_metadata(self, self.full, resumed)
+        reloaded = conll.CoNLLMetaData(input_file=self.input_file)
+        assert_same_metadata(self, self.full, reloaded)
+
+    def test_resume_after_checkpoint(self):
+        shutil.copy(DATA_FILE, self.input_file)
+        utils.CHECKPOINT_SIZE = 100000
+        self.assertRaises(KeyboardInterrupt, load_with_warnings, metadata_class=interruptedMetaData, input_file=self.input_file)
+        resumed, warnings = load_with_warnings(input_file=self.input_file)
+        self.assertIn('resuming analysis from byte', warnings)
+        assert_same_metadata(self, self.full, resumed)
+
+    def test_checkpoint_intervals_grow(self):
+        shutil.copy(DATA_FILE, self.input_file)
+        utils.CHECKPOINT_SIZE = 10000
+        checkpointingMetaData.checkpoint_offsets = []
+        metadata, warnings = load_with_warnings(metadata_class=checkpointingMetaData, input_file=self.input_file)
+        offsets = checkpointingMetaData.checkpoint_offsets
+        self.assertTrue(5 <= len(offsets) <= 6) # ----------------------------- instead of one every 10000 bytes
+        self.assertGreaterEqual(offsets[0], 10000)
+        for previous, offset in zip(offsets, offsets[1:]):
+            self.assertGreaterEqual(offset, 2 * previous)
+        assert_same_metadata(self, self.full, metadata)
+# CLASS:: END =================================================================
+
+# CLASS:: hashing during the analysis -----------------------------------------
+# =============================================================================
+class fusedHashTest(unittest.TestCase):
+
+    def test_hash_of_the_analysis(self):
+        expected = utils.generate_hash(source_file=DATA_FILE)
+        for processes in [1, 3]:
+            self.assertEqual(conll.CoNLLMetaData(input_file=DATA_FILE, save_meta=False, processes=processes).file_hash_value, expected)
+
+    def test_hash_of_a_resumed_analysis(self):
+        directory = tempfile.mkdtemp()
+        try:
+            input_file = os.path.join(directory, 'sample.conll')
+            with open(DATA_FILE, 'rb') as fp:
+                data = fp.read()
+            with open(input_file, 'wb') as fp:
+                fp.write(data[:data.index('\n\n', 100000) + 2])
+            conll.CoNLLMetaData(input_file=input_file)
+            shutil.copy(DATA_FILE, input_file)
+            self.assertEqual(conll.CoNLLMetaData(input_file=input_file).file_hash_value, utils.generate_hash(source_file=DATA_FILE))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_changed_file_is_hashed_once(self):
+        directory = tempfile.mkdtemp()
+        updateHash = utils.update_hash
+        hashedBytes = []
+        def counting_update_hash(hasher=None, source_file=None, start_offset=0, end_offset=None):
+            hashedBytes.append((os.path.getsize(source_file) if end_offset == None else end_offset) - start_offset)
+            return updateHash(hasher=hasher, source_file=source_file, start_offset=start_offset, end_offset=end_offset)
+        try:
+            input_file = os.path.join(directory, 'sample.conll')
+            with open(DATA_FILE, 'rb') as fp:
+                data = fp.read()
+            for changed in [data.replace('\tnsubj\t', '\tnsubx\t', 1), data[:data.index('\n\n', 100000) + 2]]:
+                with open(input_file, 'wb') as fp:
+                    fp.write(data)
+                conll.CoNLLMetaData(input_file=input_file)
+                with open(input_file, 'wb') as fp:
+                    fp.write(changed)
+                del hashedBytes[:]
+                utils.update_hash = counting_update_hash
+                try:
+                    metadata, warnings = load_with_warnings(input_file=input_file)
+                finally:
+                    utils.update_hash = updateHash
+                self.assertIn('Failed loading metadata file', warnings)
+                self.assertEqual(sum(hashedBytes), len(data) if len(changed) == len(data) else 0) # -- the prefix check only
+                self.assertEqual(metadata.file_hash_value, utils.generate_hash(source_file=input_file))
+        finally:
+            shutil.rmtree(directory)
+# CLASS:: END =================================================================
+
+# CLASS:: interned vocabularies -----------------------------------------------
+# =============================================================================
+class vocabularyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        shutil.copy(DATA_FILE, self.input_file)
+        self.analyzed = conll.CoNLLMetaData(input_file=self.input_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_frequency_order(self):
+        for key in [utils.TOKEN, utils.LEMMA, utils.GPOS, utils.POS, utils.RELATION]:
+            vocabulary = self.analyzed.get_vocabulary(key=key)
+            distribution = self.analyzed.get_distribution(key=key)
+            self.assertEqual(vocabulary, utils.get_frequency_ordered_vocabulary(distribution_map=distribution))
+            self.assertEqual([distribution[w] for w in vocabulary], sorted(distribution.values(), reverse=True))
+
+    def test_vocabulary_index(self):
+        for key in conll.VOCABULARY_KEYS:
+            vocabulary = self.analyzed.get_vocabulary(key=key)
+            self.assertEqual(self.analyzed.get_vocabulary_index(key=key), {w:i for i, w in enumerate(vocabulary)})
+
+    def test_saved_vocabularies(self):
+        loaded = conll.CoNLLMetaData(input_file=self.input_file)
+        for key in conll.VOCABULARY_KEYS:
+            self.assertEqual(loaded.get_vocabulary(key=key), self.analyzed.get_vocabulary(key=key))
+# CLASS:: END =================================================================
+
+# CLASS:: sentence index ------------------------------------------------------
+# =============================================================================
+class sentenceIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        self.index_file = os.path.join(self.directory, 'sample' + utils.INDEX_EXTENSION)
+        shutil.copy(DATA_FILE, self.input_file)
+        self.metadata = conll.CoNLLMetaData(input_file=self.input_file, sentence_index=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def scan(self, input_file=None):
+        """ *Returns the sets of the (lowercased) values of the indexed
+        annotations of each sentence, by a plain scan of the file.*
+        """
+        with open(input_file, 'rb') as fp:
+            sentences = fp.read().decode('utf-8').rstrip(u'\n').split(u'\n\n')
+        columns = {utils.LEMMA: 2, utils.GPOS: 3, utils.POS: 4, utils.RELATION: 7}
+        return [{k:set([l.split(u'\t')[c].lower() for l in s.split(u'\n')]) for k, c in columns.items()} for s in sentences]
+
+    def test_queries_equal_a_scan(self):
+        sentences = self.scan(input_file=self.input_file)
+        for key in conll.INDEX_KEYS:
+            for value in self.metadata.get_vocabulary(key=key)[::7]:
+                self.assertEqual(list(self.metadata.get_postings(key=key, value=value)), [i+1 for i, s in enumerate(sentences) if value in s[key]])
+        queries = [([(utils.LEMMA, u'être'), (utils.RELATION, u'dobj')], None),
+                   ([(utils.GPOS, u'verb')], [(utils.RELATION, u'iobj'), (utils.RELATION, u'expl')]),
+                   (None, [(utils.LEMMA, u'chat'), (utils.POS, u'ri')]),
+                   ([(utils.LEMMA, u'unknownlemma')], None)]
+        for all_of, any_of in queries:
+            expected = [i+1 for i, s in enumerate(sentences) if all([v in s[k] for k, v in all_of or []]) and (any_of == None or any([v in s[k] for k, v in any_of]))]
+            self.assertEqual(list(self.metadata.find_sentences(all_of=all_of, any_of=any_of)), expected)
+
+    def test_saved_index_is_loaded(self):
+        self.assertTrue(os.path.isfile(self.index_file))
+        loaded, warnings = load_with_warnings(input_file=self.input_file, sentence_index=True)
+        self.assertNotIn('sentence index', warnings)
+        for key in conll.INDEX_KEYS:
+            for value in self.metadata.get_vocabulary(key=key)[::5]:
+                self.assertEqual(list(loaded.get_postings(key=key, value=value)), list(self.metadata.get_postings(key=key, value=value)))
+
+    def test_stale_index_is_rebuilt(self):
+        with open(self.input_file, 'rb') as fp:
+            data = fp.read()
+        with open(self.input_file, 'wb') as fp:
+            fp.write(data.replace('\tnsubj\t', '\tnsubx\t', 1)) # ---------------- same size
+        fileTime = os.stat(self.input_file).st_mtime + 10
+        os.utime(self.input_file, (fileTime, fileTime))
+        changed, warnings = load_with_warnings(input_file=self.input_file, sentence_index=True)
+        self.assertIn('Failed loading sentence index', warnings)
+        self.assertEqual(list(changed.find_sentences(all_of=[(utils.RELATION, u'nsubx')])), [1])
+        reloaded, warnings = load_with_warnings(input_file=self.input_file, sentence_index=True)
+        self.assertNotIn('sentence index', warnings)
+        self.assertEqual(list(reloaded.find_sentences(all_of=[(utils.RELATION, u'nsubx')])), [1])
+
+    def test_mapped_index_is_replaced(self):
+        loaded, warnings = load_with_warnings(input_file=self.input_file, sentence_index=True)
+        expected = list(loaded.find_sentences(all_of=[(utils.RELATION, u'nsubj')]))
+        inode = os.stat(self.index_file).st_ino
+        self.metadata.build_sentence_index(input_file=self.input_file, index_file=self.index_file)
+        self.assertNotEqual(os.stat(self.index_file).st_ino, inode) # ----------- not rewritten under the mapping
+        self.assertEqual(os.listdir(self.directory).count('sample' + utils.INDEX_EXTENSION + '.tmp'), 0)
+        self.assertEqual(list(loaded.find_sentences(all_of=[(utils.RELATION, u'nsubj')])), expected)
+        reloaded, warnings = load_with_warnings(input_file=self.input_file, sentence_index=True)
+        self.assertNotIn('sentence index', warnings)
+        self.assertEqual(list(reloaded.find_sentences(all_of=[(utils.RELATION, u'nsubj')])), expected)
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 21:02:18 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the CoNLL file reader against a plain parse of the sample corpus.
+Run from the src directory with: python -m unittest test_reader*
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+import cPickle as pickle
+from multiprocessing.pool import ThreadPool
+
+import libconll as conll
+import libutilities as utils
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+def token_values(tokens=None): # - DEF::START ---------------------------------
+    """ Method to get the annotations of parsed tokens, to be compared.
+    """
+    return [[t.getValue(k) for k in sorted(t.getAnnotationKeyList())] for t in tokens]
+# ----------------------------------------------------------------- DEF:: END -
+
+def parse_sample(): # - DEF::START --------------------------------------------
+    """ Method to parse the sample corpus without the reader, by splitting
+    it into sentences and lines.
+
+    :return: The tokens of each sentence, sentence 1 first.
+    :rtype: list[list[annotatedCoNLLToken]]
+    """
+    with open(DATA_FILE, 'rb') as fp:
+        data = fp.read()
+    return [[conll.annotatedCoNLLToken(token=l.decode('utf-8').split()) for l in s.split('\n')] for s in data.rstrip('\n').split('\n\n')]
+# ----------------------------------------------------------------- DEF:: END -
+
+def read_sentence(file_reader=None, sentence_id=None): # - DEF::START ----------
+    """ Method to read one sentence by moving the reader to it.
+    """
+    file_reader.set_current_sentence(sentence_id)
+    return file_reader.get_current_sentence()
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: sentence reads ------------------------------------------------------
+# =============================================================================
+class sentenceReadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.expected = [token_values(s) for s in parse_sample()]
+        self.reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+
+    def tearDown(self):
+        self.reader.close()
+
+    def test_random_reads(self):
+        sentence_ids = range(1, len(self.expected)+1)
+        random.Random(9).shuffle(sentence_ids)
+        for sid in sentence_ids:
+            self.assertEqual(token_values(read_sentence(self.reader, sid)), self.expected[sid-1])
+        self.assertRaises(ValueError, self.reader.set_current_sentence, len(self.expected)+1)
+
+    def test_navigation(self):
+        self.assertEqual(token_values(self.reader.get_current_sentence()), self.expected[0])
+        for sid in range(2, len(self.expected)+1):
+            self.assertEqual(token_values(self.reader.get_next_sentence()), self.expected[sid-1])
+        self.reader.set_current_sentence(10)
+        self.assertEqual(token_values(self.reader.get_previous_sentence()), self.expected[8])
+
+    def test_iteration(self):
+        found = [(sid, token_values(s)) for sid, s in self.reader]
+        self.assertEqual(found, list(enumerate(self.expected, 1)))
+# CLASS:: END =================================================================
+
+# CLASS:: LRU sentence cache --------------------------------------------------
+# =============================================================================
+class sentenceCacheTest(unittest.TestCase):
+
+    def test_eviction_by_count(self):
+        cache = conll.sentenceCache(max_sentences=3)
+        for sid in [1, 2, 3]:
+            cache.put(sid, ['s{}'.format(sid)], 10)
+        self.assertEqual(cache.get(1), ['s1']) # ------------------------------ 2 is now the least recently used
+        cache.put(4, ['s4'], 10)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get(2), None)
+        self.assertEqual([cache.get(sid) for sid in [1, 3, 4]], [['s1'], ['s3'], ['s4']])
+
+    def test_eviction_by_bytes(self):
+        cache = conll.sentenceCache(max_bytes=100)
+        cache.put(1, ['s1'], 40)
+        cache.put(2, ['s2'], 40)
+        cache.put(3, ['s3'], 30)
+        self.assertEqual(cache.get(1), None)
+        self.assertEqual(cache.get_byte_count(), 70)
+        cache.put(2, ['s2'], 60) # -------------------------------------------- a new size for a cached sentence
+        self.assertEqual(cache.get_byte_count(), 90)
+        self.assertEqual(len(cache), 2)
+
+    def test_large_sentence_is_not_cached(self):
+        cache = conll.sentenceCache(max_sentences=10, max_bytes=100)
+        cache.put(1, ['s1'], 50)
+        cache.put(2, ['s2'], 101)
+        self.assertEqual(cache.get(2), None)
+        self.assertEqual(cache.get(1), ['s1'])
+        self.assertEqual(cache.get_byte_count(), 50)
+
+    def test_hit_and_miss_counts(self):
+        cache = conll.sentenceCache(max_sentences=2)
+        cache.put(1, ['s1'], 10)
+        for sid in [1, 2, 1, 3]:
+            cache.get(sid)
+        self.assertEqual((cache.get_hit_count(), cache.get_miss_count()), (2, 2))
+
+    def test_cached_reader(self):
+        expected = [token_values(s) for s in parse_sample()]
+        reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False, cache_sentences=10)
+        for sid in [5, 6, 5, 7, 5, 200]:
+            self.assertEqual(token_values(read_sentence(reader, sid)), expected[sid-1])
+        self.assertEqual(reader.get_cache_statistics(), (2, 4))
+        reader.get_sentence(5).pop() # ---------------------------------------- a returned sentence is a copy
+        self.assertEqual(token_values(reader.get_sentence(5)), expected[4])
+        reader.close()
+# CLASS:: END =================================================================
+
+# CLASS:: batch reads ---------------------------------------------------------
+# =============================================================================
+class batchReadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.expected = [token_values(s) for s in parse_sample()]
+        self.reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+
+    def tearDown(self):
+        self.reader.close()
+
+    def test_batch_equals_single_reads(self):
+        randomizer = random.Random(11)
+        for size in [1, 5, 64, 300]:
+            sentence_ids = [randomizer.randint(1, len(self.expected)) for i in range(size)] # -- in any order, may repeat
+            found = self.reader.read_sentences(sentence_ids=sentence_ids)
+            self.assertEqual([token_values(s) for s in found], [self.expected[sid-1] for sid in sentence_ids])
+        self.assertEqual(self.reader.read_sentences(sentence_ids=[]), [])
+        self.assertRaises(KeyError, self.reader.read_sentences, [1, len(self.expected)+1])
+
+    def test_batch_does_not_move_the_current_sentence(self):
+        self.reader.set_current_sentence(3)
+        self.reader.read_sentences(sentence_ids=[1, 100, 250])
+        self.assertEqual(self.reader.get_current_sentence_id(), 3)
+        self.assertEqual(token_values(self.reader.get_current_sentence()), self.expected[2])
+# CLASS:: END =================================================================
+
+# CLASS:: prefetching iteration -----------------------------------------------
+# =============================================================================
+class prefetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        shutil.copy(DATA_FILE, self.input_file)
+        self.reader = conll.CoNLLFileReader(input_file=self.input_file, save_meta=False)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.directory)
+
+    def test_prefetch_equals_plain_iteration(self):
+        plain = [(sid, token_values(s)) for sid, s in self.reader.iterate_sentences()]
+        for prefetch in [1, 7, 1000]:
+            self.assertEqual([(sid, token_values(s)) for sid, s in self.reader.iterate_sentences(prefetch=prefetch)], plain)
+        self.assertEqual([sid for sid, s in self.reader.iterate_sentences(first_sentence=280, prefetch=3)], range(280, 288))
+
+    def test_worker_error_is_raised(self):
+        with open(self.input_file, 'r+b') as fp: # ---------------------------- the reads of the last sentences fail
+            fp.truncate(os.path.getsize(self.input_file) / 2)
+        self.assertRaises(IOError, list, self.reader.iterate_sentences(prefetch=4))
+
+    def test_abandoned_generator_joins_the_thread(self):
+        threads = threading.active_count()
+        sentences = self.reader.iterate_sentences(prefetch=2)
+        next(sentences)
+        self.assertEqual(threading.active_count(), threads + 1)
+        sentences.close()
+        self.assertEqual(threading.active_count(), threads)
+# CLASS:: END =================================================================
+
+# CLASS:: slotted tokens ------------------------------------------------------
+# =============================================================================
+class slottedTokenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.token = conll.annotatedCoNLLToken(token=u'3\tChats\tchat\tNOUN\tNC\tNOMBRE=PLURIEL\t2\tnsubj\t_\t_'.split('\t'))
+
+    def test_values(self):
+        self.assertFalse(hasattr(self.token, '__dict__'))
+        self.assertEqual(self.token.getValue(utils.TID), 3)
+        self.assertEqual(self.token.getValue(utils.TOKEN), u'chats')
+        self.assertEqual(self.token.getValue(utils.RELATION_HEAD), 2)
+        self.assertEqual(self.token.annotation_map[utils.RELATION], u'nsubj')
+        self.assertRaises(KeyError, self.token.getValue, utils.NOT_IN_USE)
+
+    def test_updated_value(self):
+        self.token.setValue(utils.RELATION, u'obj')
+        self.assertEqual(self.token.getValue(utils.RELATION), u'obj')
+        self.assertEqual(self.token.getValue(utils.LEMMA), u'chat')
+
+    def test_pickle(self):
+        self.token.setValue(utils.POS, u'NPP')
+        loaded = pickle.loads(pickle.dumps(self.token, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(loaded.annotation_map, self.token.annotation_map)
+# CLASS:: END =================================================================
+
+# CLASS:: encoded tokens ------------------------------------------------------
+# =============================================================================
+class encodedTokenTest(unittest.TestCase):
+
+    def test_encoded_sentences(self):
+        plain = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+        encoded = conll.CoNLLFileReader(input_file=DATA_FILE, metadata=plain.metadata, encoded=True)
+        vocabularies = {k:encoded.get_vocabulary(key=k) for k in [utils.TOKEN, utils.LEMMA, utils.GPOS, utils.POS, utils.RELATION]}
+        morphology = encoded.get_vocabulary(key=utils.MORPH)
+        for (sid, sentence), (eid, encodedSentence) in zip(plain, encoded):
+            self.assertEqual(sid, eid)
+            for tok, encodedTok in zip(sentence, encodedSentence):
+                for key, vocabulary in vocabularies.items():
+                    self.assertEqual(vocabulary[encodedTok.getValue(key)], tok.getValue(key))
+                self.assertEqual(encodedTok.getValue(utils.TID), tok.getValue(utils.TID))
+                self.assertEqual(encodedTok.getValue(utils.RELATION_HEAD), tok.getValue(utils.RELATION_HEAD))
+                features = [morphology[i] for i in encodedTok.getValue(utils.MORPH)]
+                self.assertEqual(features, [] if tok.getValue(utils.MORPH) == u'_' else tok.values[tok.key_index[utils.MORPH]].split(u'|'))
+        plain.close()
+        encoded.close()
+# CLASS:: END =================================================================
+
+# CLASS:: concurrent reads ----------------------------------------------------
+# =============================================================================
+class concurrentReadTest(unittest.TestCase):
+
+    def test_thread_pool_reads(self):
+        expected = [token_values(s) for s in parse_sample()]
+        sentence_ids = range(1, len(expected)+1) * 4
+        random.Random(16).shuffle(sentence_ids)
+        reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False, cache_sentences=50)
+        pool = ThreadPool(processes=8)
+        try:
+            found = pool.map(lambda sid: token_values(reader.get_sentence(sid)), sentence_ids, chunksize=1)
+            self.assertEqual(found, [expected[sid-1] for sid in sentence_ids])
+            batches = pool.map(reader.read_sentences, [sentence_ids[i:i+20] for i in range(0, len(sentence_ids), 20)])
+            self.assertEqual([token_values(s) for b in batches for s in b], [expected[sid-1] for sid in sentence_ids])
+        finally:
+            pool.close()
+            pool.join()
+            reader.close()
+
+    def test_plain_file_handle_pool(self):
+        positional = conll.positionalFile(source_file=DATA_FILE, max_handles=3)
+        with open(DATA_FILE, 'rb') as fp:
+            data = fp.read()
+        pool = ThreadPool(processes=6)
+        try:
+            handles = []
+            threads = [threading.Thread(target=lambda: handles.append(positional._positionalFile__acquire_handle())) for i in range(3)]
+            for thread in threads: # ------------------------------------------ 3 file objects held at once
+                thread.daemon = True
+                thread.start()
+                thread.join(10)
+            self.assertEqual(len(set([id(fp) for fp in handles])), 3)
+            for fp in handles:
+                positional._positionalFile__release_handle(fp)
+            ranges = [(offset, 500) for offset in range(0, len(data), 997)]
+            self.assertEqual(pool.map(lambda r: positional.read(*r), ranges, chunksize=1), [data[o:o+n] for o, n in ranges])
+            self.assertEqual(positional.handle_count, 3)
+        finally:
+            pool.close()
+            pool.join()
+            positional.close()
+        self.assertRaises(ValueError, positional.read, 0, 10)
+# CLASS:: END =================================================================
+
+# CLASS:: length buckets ------------------------------------------------------
+# =============================================================================
+class lengthBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lengths = [len(s) for s in parse_sample()]
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'sample.conll')
+        shutil.copy(DATA_FILE, self.input_file)
+        conll.CoNLLMetaData(input_file=self.input_file) # ---------------------- saved ... the lengths are read back
+        self.reader = conll.CoNLLFileReader(input_file=self.input_file)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.directory)
+
+    def test_sentence_lengths(self):
+        metadata = self.reader.metadata
+        self.assertEqual(list(metadata.get_sentence_lengths()), self.lengths)
+        self.assertEqual(metadata.get_sentences_by_length(min_length=30), [i+1 for i, n in enumerate(self.lengths) if n >= 30])
+        self.assertEqual(metadata.get_sentences_by_length(min_length=5, max_length=10), [i+1 for i, n in enumerate(self.lengths) if 5 <= n <= 10])
+
+    def test_buckets(self):
+        buckets = self.reader.metadata.get_length_buckets(bucket_width=4, max_length=40)
+        self.assertEqual(sorted([sid for lower, ids in buckets for sid in ids]), [i+1 for i, n in enumerate(self.lengths) if n <= 40])
+        for lower, ids in buckets:
+            self.assertEqual(lower % 4, 0)
+            self.assertTrue(all([lower <= self.lengths[sid-1] < lower + 4 for sid in ids]))
+
+    def test_bucket_iteration(self):
+        batches = list(self.reader.iterate_buckets(bucket_width=4, batch_size=8, seed=19))
+        self.assertEqual(sorted([sid for batch in batches for sid, s in batch]), range(1, len(self.lengths)+1))
+        for batch in batches:
+            self.assertLessEqual(len(batch), 8)
+            self.assertEqual(len(set([self.lengths[sid-1] // 4 for sid, s in batch])), 1)
+            self.assertTrue(all([len(s) == self.lengths[sid-1] for sid, s in batch]))
+        self.assertEqual([sid for sid, s in self.reader.iterate_buckets(bucket_width=4, seed=19)], [sid for batch in batches for sid, s in batch])
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 22:24:16 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the vector readers and of the window data. Run from the src
+directory with: python -m unittest test_vector*
+"""
+
+import os
+import unittest
+
+from numpy import zeros as npzeros
+from numpy import array as nparray
+from numpy import vstack as npvstack
+from numpy.testing import assert_array_equal
+
+import libconll as conll
+import libvector as vec
+import libdata as data
+import libutilities as utils
+import libexceptions as exp
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences, 7220 windows of 3 tokens)
+"""
+
+def to_dense(vector=None, dimension=None): # - DEF::START ---------------------
+    """ Method to get the dense vector of a sparse (indices, values) pair.
+    """
+    dense = npzeros(dimension)
+    dense[vector[0]] = vector[1]
+    return dense
+# ----------------------------------------------------------------- DEF:: END -
+
+# CLASS:: one hot vectors of a list -------------------------------------------
+# =============================================================================
+class listOneHotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = vec.listOneHotVectorReader(element_list=[u'b', u'a', u'c'])
+
+    def test_positions(self):
+        self.assertEqual(len(self.reader.get_null_vector()), 4)
+        self.assertEqual([self.reader.get_position(k) for k in [u'a', u'b', u'c']], [1, 0, 2])
+        self.assertEqual(self.reader.get_positions([u'c', u'c', u'a']), [2, 2, 1])
+        self.assertRaises(KeyError, self.reader.get_position, u'z')
+
+    def test_vectors(self):
+        keys = [u'c', u'a', u'c']
+        assert_array_equal(self.reader.get_vectors(keys), npvstack([self.reader.get_vector(k) for k in keys]))
+        assert_array_equal(self.reader.get_vector(u'a'), [0.0, 1.0, 0.0, 0.0])
+
+    def test_update(self):
+        self.reader.updateReader([u'a', u'z'])
+        self.assertEqual(self.reader.get_position(u'z'), 3)
+        self.assertEqual(self.reader.get_position(u'a'), 1)
+        self.assertRaises(exp.greaterValueError, self.reader.updateReader, [u'y'])
+
+    def test_vocabulary_ids(self):
+        reader = vec.listOneHotVectorReader(element_list=[u'b', u'a', u'c'], vocabulary=[u'a', u'b', u'c', u'd'])
+        self.assertEqual([reader.get_position(i) for i in [0, 1, 2]], [1, 0, 2])
+        self.assertRaises(KeyError, reader.get_position, 3)
+        self.assertRaises(KeyError, self.reader.get_position, 0) # ------------- no vocabulary
+        reader.updateReader([u'd'])
+        self.assertEqual(reader.get_position(3), 3)
+
+    def test_long_vocabulary_ids(self):
+        reader = vec.listOneHotVectorReader(element_list=[u'b', u'a', u'c'], vocabulary=[u'a', u'b', u'c'])
+        self.assertEqual(reader.get_positions([long(0), long(2), 1]), [1, 2, 0])
+        assert_array_equal(reader.get_vector(long(1)), reader.get_vector(u'b'))
+        self.assertRaises(KeyError, reader.get_position, long(3))
+# CLASS:: END =================================================================
+
+# CLASS:: sparse vectors ------------------------------------------------------
+# =============================================================================
+class sparseVectorTest(unittest.TestCase):
+
+    def test_concatenation(self):
+        vectors = [(nparray([1]), nparray([1.0])), vec.get_empty_sparse_vector(), (nparray([0, 2]), nparray([2.0, 3.0]))]
+        indices, values = vec.concatenate_sparse_vectors(vectors, [3, 2, 4])
+        assert_array_equal(indices, [1, 5, 7])
+        assert_array_equal(values, [1.0, 2.0, 3.0])
+
+    def test_sparse_matrix(self):
+        rows = [(nparray([0, 3]), nparray([1.0, 2.0])), vec.get_empty_sparse_vector(), (nparray([1]), nparray([4.0]))]
+        matrix = vec.sparseMatrix(rows, 4)
+        self.assertEqual(matrix.get_shape(), (3, 4))
+        assert_array_equal(matrix.to_dense(), [[1.0, 0.0, 0.0, 2.0], [0.0, 0.0, 0.0, 0.0], [0.0, 4.0, 0.0, 0.0]])
+        assert_array_equal(matrix.to_dense(1, 3), [[0.0, 0.0, 0.0, 0.0], [0.0, 4.0, 0.0, 0.0]])
+        assert_array_equal(matrix.get_row(2)[0], [1])
+
+    def test_sparse_windows_equal_dense_windows(self):
+        reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+        try:
+            def configuration():
+                config = {utils.GPOS: vec.listOneHotVectorReader(reader.get_key_elements(key=utils.GPOS)),
+                          utils.POS:  vec.listOneHotVectorReader(reader.get_key_elements(key=utils.POS))}
+                config[utils.MORPH] = vec.classMembersOneHotVectorReader(reader.get_key_elements(key=utils.MORPH))
+                return config
+            dense = data.slidingWindowVectorData(file_reader=reader, vector_config=configuration(), window_width=3)
+            sparse = data.slidingWindowVectorData(file_reader=reader, vector_config=configuration(), window_width=3, sparse=True)
+        finally:
+            reader.close()
+        self.assertEqual(len(dense.input_data_matrix), 7220)
+        self.assertEqual(sorted(sparse.input_data_matrix.keys()), sorted(dense.input_data_matrix.keys()))
+        self.assertEqual((sparse.get_input_dimension(), sparse.get_output_dimension()), (dense.get_input_dimension(), dense.get_output_dimension()))
+        for window, vector in dense.input_data_matrix.items():
+            assert_array_equal(to_dense(sparse.input_data_matrix[window], sparse.get_input_dimension()), vector)
+            assert_array_equal(to_dense(sparse.output_data_matrix[window], sparse.get_output_dimension()), dense.output_data_matrix[window])
+        dataset = sparse.get_dataset(train=0.8, test=0.2)
+        self.assertEqual(sum([matrix.get_shape()[0] for inputs, outputs in dataset.values() for matrix in [inputs]]), 7220)
+        for inputs, outputs in dataset.values():
+            self.assertIsInstance(inputs, vec.sparseMatrix)
+            self.assertEqual(inputs.get_shape(), (len(outputs), sparse.get_input_dimension()))
+            self.assertEqual(outputs.get_shape(), (len(inputs), sparse.get_output_dimension()))
+# CLASS:: END =================================================================
+
+# CLASS:: multi hot vectors of the morphological features ---------------------
+# =============================================================================
+class morphologyVectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+        self.vector_reader = vec.classMembersOneHotVectorReader(self.reader.get_key_elements(key=utils.MORPH), vocabulary=self.reader.get_vocabulary(key=utils.MORPH))
+        self.dimension = len(self.vector_reader.get_null_vector())
+        with open(DATA_FILE, 'rb') as fp:
+            self.features = [[l.split('\t')[5].decode('utf-8') for l in s.split('\n')] for s in fp.read().rstrip('\n').split('\n\n')[:40]]
+
+    def tearDown(self):
+        self.reader.close()
+
+    def test_keys_give_the_same_vectors(self):
+        encoded = conll.CoNLLFileReader(input_file=DATA_FILE, metadata=self.reader.metadata, encoded=True)
+        try:
+            for sid, features in enumerate(self.features, 1):
+                expected = npzeros((len(features), self.dimension))
+                for row, feature in enumerate(features):
+                    for e in feature.split(u'|') if feature != u'_' else []:
+                        expected[row, self.vector_reader.get_positions({e.split(u'=', 1)[0]: e.split(u'=', 1)[1]})[0]] = 1.0
+                assert_array_equal(self.vector_reader.get_vectors(features), expected)
+                assert_array_equal(self.vector_reader.get_vectors([f.lower() for f in features]), expected)
+                assert_array_equal(self.vector_reader.get_vectors([t.getValue(utils.MORPH) for t in encoded.get_sentence(sid)]), expected)
+                assert_array_equal(npvstack([self.vector_reader.get_vector(f) for f in features]), expected)
+                assert_array_equal(npvstack([to_dense(v, self.dimension) for v in self.vector_reader.get_sparse_vectors(features)]), expected)
+        finally:
+            encoded.close()
+
+    def test_unknown_value(self):
+        self.assertRaises(KeyError, self.vector_reader.get_vector, u'NOMBRE=DUEL')
+        self.assertEqual(self.vector_reader.get_positions(u'_'), ())
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()
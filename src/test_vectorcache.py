@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+- Created on Sat Oct 17 22:57:32 2026
+- Deskin - Orange Labs - Lannion - France
+
+*Tests of the on-disk token vector cache against the computed vectors. Run
+from the src directory with: python -m unittest test_vectorcache*
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from numpy.testing import assert_array_equal
+
+import libconll as conll
+import libvector as vec
+import libvectorcache as vcache
+import libutilities as utils
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data.clean')
+""" The sample corpus (287 sentences)
+"""
+
+# CLASS:: token vector cache --------------------------------------------------
+# =============================================================================
+class vectorCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.reader = conll.CoNLLFileReader(input_file=DATA_FILE, save_meta=False)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.directory)
+
+    def vectorize(self, file_reader=None, sparse=False, cache_dir=None):
+        """ *Returns the vectorized file (POS and GPOS one hot vectors) and the
+        warnings.*
+        """
+        fileVector = vec.CoNLLFileVector(file_reader=file_reader or self.reader, sparse=sparse, cache_dir=cache_dir)
+        fileVector.set_one_hot_reader(key=utils.GPOS)
+        fileVector.set_one_hot_reader(key=utils.POS)
+        stderr, sys.stderr = sys.stderr, StringIO()
+        try:
+            fileVector.vectorize()
+            return fileVector, sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+
+    def get_key(self, file_vector=None):
+        """ *Returns the cache key of the configuration of a vectorized file.*
+        """
+        return vcache.get_cache_key(metadata=file_vector.file_reader.metadata, vector_configuration=file_vector.vector_configuration, sparse=file_vector.sparse)
+
+    def assert_same_vectors(self, cached=None, computed=None, sparse=False):
+        for sid, tokens in computed.sentence_map.items():
+            for tid, vector in tokens.items():
+                if sparse:
+                    assert_array_equal(cached.get_vector(sid, tid)[0], vector[0])
+                    assert_array_equal(cached.get_vector(sid, tid)[1], vector[1])
+                else:
+                    assert_array_equal(cached.get_vector(sid, tid), vector)
+        self.assertEqual(sorted(cached.generate_vector(sentence_id=12).keys()), sorted(computed.sentence_map[12].keys()))
+
+    def test_cache_is_reused(self):
+        computed, warnings = self.vectorize()
+        first, warnings = self.vectorize(cache_dir=self.cache_dir)
+        self.assertEqual(warnings, '')
+        self.assertEqual(os.listdir(self.cache_dir), [self.get_key(first)])
+        cached, warnings = self.vectorize(cache_dir=self.cache_dir)
+        self.assertEqual(warnings, '')
+        self.assertEqual(cached.sentence_map, {})
+        self.assertEqual(self.get_key(cached), self.get_key(first))
+        self.assertEqual(cached.get_vector_dimension(), computed.get_vector_dimension())
+        self.assert_same_vectors(cached=cached, computed=computed)
+
+    def test_sparse_cache(self):
+        computed, warnings = self.vectorize(sparse=True)
+        self.vectorize(sparse=True, cache_dir=self.cache_dir)
+        cached, warnings = self.vectorize(sparse=True, cache_dir=self.cache_dir)
+        self.assertEqual(cached.sentence_map, {})
+        self.assertTrue(any([f.endswith('.npz') for f in os.listdir(os.path.join(self.cache_dir, self.get_key(cached)))]))
+        self.assert_same_vectors(cached=cached, computed=computed, sparse=True)
+        dense, warnings = self.vectorize(cache_dir=self.cache_dir)
+        self.assertNotEqual(self.get_key(dense), self.get_key(cached))
+
+    def test_corrupt_cache(self):
+        computed, warnings = self.vectorize()
+        first, warnings = self.vectorize(cache_dir=self.cache_dir)
+        with open(os.path.join(self.cache_dir, self.get_key(first), 'token_ids.npy'), 'wb') as fp:
+            fp.write('corrupted')
+        cached, warnings = self.vectorize(cache_dir=self.cache_dir)
+        self.assertIn('Failed opening the token vector cache', warnings)
+        self.assertEqual(len(cached.sentence_map), len(computed.sentence_map))
+        self.assert_same_vectors(cached=cached, computed=computed)
+
+    def test_changed_corpus_has_another_key(self):
+        first, warnings = self.vectorize(cache_dir=self.cache_dir)
+        inputFile = os.path.join(self.directory, 'part.conll')
+        with open(DATA_FILE, 'rb') as fp:
+            with open(inputFile, 'wb') as out:
+                out.write('\n\n'.join(fp.read().split('\n\n')[:100]) + '\n\n')
+        reader = conll.CoNLLFileReader(input_file=inputFile, save_meta=False)
+        try:
+            other, warnings = self.vectorize(file_reader=reader, cache_dir=self.cache_dir)
+        finally:
+            reader.close()
+        self.assertNotEqual(self.get_key(other), self.get_key(first))
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), sorted([self.get_key(first), self.get_key(other)]))
+        self.assertEqual(len(other.sentence_map), 100)
+
+    def test_updated_reader_has_another_key(self):
+        cached, warnings = self.vectorize(cache_dir=self.cache_dir)
+        cached, warnings = self.vectorize(cache_dir=self.cache_dir)
+        firstKey = cached.cache_key
+        cached.update_reader(key=utils.POS, update_elements=[u'nouvelle-pos'])
+        sentence = cached.generate_vector(sentence_id=3)
+        self.assertNotEqual(cached.cache_key, firstKey)
+        self.assertEqual(cached.sentence_map, {})
+        self.assertEqual(len(sentence.values()[0]), cached.vector_configuration.get(utils.GPOS).get_dimension() + cached.vector_configuration.get(utils.POS).get_dimension())
+        self.assertEqual(vcache.get_cache_key(metadata=self.reader.metadata, vector_configuration=cached.vector_configuration), cached.cache_key)
+
+    def test_key_is_computed_once(self):
+        self.vectorize(cache_dir=self.cache_dir)
+        calls = []
+        def get_cache_key(**kwargs):
+            calls.append(kwargs)
+            return get_key(**kwargs)
+        get_key, vcache.get_cache_key = vcache.get_cache_key, get_cache_key
+        try:
+            cached, warnings = self.vectorize(cache_dir=self.cache_dir)
+            for sid in range(1, 21):
+                cached.generate_vector(sentence_id=sid)
+                cached.get_vector(sid, 1)
+            self.assertEqual(len(calls), 1)
+            cached.set_one_hot_reader(key=utils.GPOS)
+            cached.get_vector(1, 1)
+            self.assertEqual(len(calls), 2)
+            cached.update_reader(key=utils.GPOS, update_elements=[u'nouvelle-gpos'])
+            cached.generate_vector(sentence_id=1)
+            cached.generate_vector(sentence_id=2)
+            self.assertEqual(len(calls), 3)
+        finally:
+            vcache.get_cache_key = get_key
+# CLASS:: END =================================================================
+
+if __name__ == '__main__':
+    unittest.main()